@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+# Allow direct execution
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import argparse
+import json
+import time
+
+from yt_dlp.utils import js_to_json
+
+
+def _nuxt_item(i):
+    return (f'{{id:{i},title:"Video {i}",duration:{i * 7},published:true,tags:["a","b"],'
+            f'thumb:{{url:"https:\\u002F\\u002Fexample.com\\u002F{i}.jpg",w:640,h:360}},meta:null,extra:void 0}}')
+
+
+# Generated stand-ins for the kinds of pages js_to_json is mostly used on
+SAMPLE_PAGES = {
+    'nuxt': '(function(a,b){return {data:[{items:[%s]}],state:{a:a,b:b}}}(1,2))' % ','.join(map(_nuxt_item, range(5000))),
+    'json': json.dumps({'items': [
+        {'id': i, 'title': f'Video {i}', 'tags': ['a', 'b'], 'thumb': {'url': f'https://example.com/{i}.jpg', 'w': 640}}
+        for i in range(5000)]}),
+    'jwplayer': '{%s}' % ','.join(
+        f"file{i}: 'https://example.com/{i}.m3u8', label{i}: '720p', default{i}: false" for i in range(3000)),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark js_to_json')
+    parser.add_argument(
+        'files', nargs='*', metavar='FILE',
+        help='Files with the JS objects to convert (default: generated sample pages)')
+    parser.add_argument(
+        '-n', '--repeat', type=int, default=5, metavar='N',
+        help='Number of runs per input; the fastest is reported (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pages = SAMPLE_PAGES
+    if args.files:
+        pages = {}
+        for filename in args.files:
+            with open(filename, encoding='utf-8') as f:
+                pages[os.path.basename(filename)] = f.read()
+
+    for name, code in pages.items():
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            js_to_json(code)
+            best = min(best, time.perf_counter() - start)
+        print(f'{name:<30} {len(code) / 1024:10.1f} KiB {best * 1000:10.1f} ms '
+              f'{len(code) / best / 1024 ** 2:8.1f} MiB/s')
+
+
+if __name__ == '__main__':
+    main()
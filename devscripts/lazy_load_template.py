@@ -1,6 +1,9 @@
+import collections.abc
 import importlib
+import marshal
 import random
 import re
+import threading
 
 from ..utils import (
     age_restricted,
@@ -15,6 +18,74 @@
 _WARNED = False
 
 
+class LazyExtractorLookup(collections.abc.Mapping):
+    """Mapping of extractor names to lazy extractor classes, which are created when first accessed
+
+    @param data     Marshalled table of (name, module, base names, attributes, info) of
+                    the extractors and their base classes, in creation order. `info` is
+                    None for base classes, which are not part of the mapping
+    @param methods  (function that returns the class methods of the named class,
+                    names of the other extractors that the methods use)
+
+    The classes are also added to the globals of this module, where the methods look them up.
+    A class is only returned once it and the extractors that its methods use are complete,
+    so that it can be used from several threads
+    """
+
+    def __init__(self, data, methods):
+        self._table = {row[0]: row for row in marshal.loads(data)}
+        self._names = tuple(name for name, *_, info in self._table.values() if info is not None)
+        self._methods = methods
+        self._classes = {'LazyLoadExtractor': LazyLoadExtractor, 'LazyLoadSearchExtractor': LazyLoadSearchExtractor}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        return self._create(name)
+
+    def __contains__(self, name):
+        return self._table.get(name, (None, ))[-1] is not None
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def _create(self, name):
+        cls = self._classes.get(name)
+        if cls is None:
+            with self._lock:
+                created = {}
+                cls = self._build(name, created)
+                self._classes.update(created)
+        return cls
+
+    def _build(self, name, created):
+        cls = self._classes.get(name) or created.get(name)
+        if cls is None:
+            _, module, bases, attrs, _ = self._table[name]
+            cls = LazyLoadMetaClass(
+                name, tuple(self._build(base, created) for base in bases), {'_module': module, **attrs})
+            get_methods, used_ies = self._methods.get(name, (None, ()))
+            if get_methods:
+                for key, value in get_methods(cls).items():
+                    setattr(cls, key, value)
+            globals()[name] = created[name] = cls
+            # The methods look up these in the globals when they are called
+            for used_ie in used_ies:
+                self._build(used_ie, created)
+        return cls
+
+    def info(self, name):
+        """The ie_key, IE_NAME, _ENABLED and url_keys of the extractor, without creating its class"""
+        return self._table[name][-1]
+
+    def is_created(self, cls):
+        return self._classes.get(cls.__name__) is cls
+
+
 class LazyLoadMetaClass(type):
     def __getattr__(cls, name):
         global _WARNED
@@ -7,10 +7,14 @@
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+import itertools
+import marshal
+import types
 from inspect import getsource
 
 from devscripts.utils import get_filename_args, read_file, write_file
 from yt_dlp.extractor import import_extractors
+from yt_dlp.extractor._dispatch import url_keys
 from yt_dlp.extractor.common import InfoExtractor, SearchInfoExtractor
 from yt_dlp.globals import extractors
 
@@ -28,9 +32,11 @@
     'is_suitable',  # Used for --age-limit
     'supports_login', 'is_single_video',  # Accessed in CLI only with instance
 ]
-IE_TEMPLATE = '''
-class {name}({bases}):
-    _module = {module!r}
+METHODS_TEMPLATE = '''
+def _{name}_methods(__class__):
+{methods}
+
+    return {{{names}}}
 '''
 MODULE_TEMPLATE = read_file('devscripts/lazy_load_template.py')
 
@@ -62,20 +68,50 @@ def extra_ie_code(ie, base=None):
             yield f'    {var} = {val!r}'
     yield ''
 
-    for name in CLASS_METHODS:
-        f = getattr(ie, name)
-        if not base or f.__func__ != getattr(base, name).__func__:
-            yield getsource(f)
+    yield from ie_methods(ie, base).values()
 
 
-def build_ies(ies, bases, attr_base):
-    names = []
-    for ie in sort_ies(ies, bases):
-        yield build_lazy_ie(ie, ie.__name__, attr_base)
-        if ie in ies:
-            names.append(ie.__name__)
+def ie_methods(ie, base=None):
+    return {
+        name: getsource(getattr(ie, name))
+        for name in CLASS_METHODS
+        if not base or getattr(ie, name).__func__ != getattr(base, name).__func__
+    }
 
-    yield '\n_CLASS_LOOKUP = {%s}' % ', '.join(f'{name!r}: {name}' for name in names)
+
+def build_ies(ies, bases, attr_base):
+    """Yield the code that describes the lazy extractors
+
+    Instead of defining the ~2000 classes at import, they are described by a marshalled table,
+    from which LazyExtractorLookup creates each class when it is first accessed.
+    Class methods that differ from the base are defined in functions that take the class
+    as `__class__`, so that `super()` works in them as it would in the class body.
+    The other extractors that they use are created along with the class
+    """
+    ies_in_order = list(sort_ies(ies, bases))
+    names, public_ies = {ie.__name__ for ie in ies_in_order}, set(ies)
+    table, methods_lookup = [], []
+    for ie in ies_in_order:
+        table.append(build_lazy_ie(ie, ie.__name__, attr_base, public=ie in public_ies))
+        methods = ie_methods(ie, attr_base)
+        if methods:
+            used_ies = sorted(names.intersection(itertools.chain.from_iterable(
+                code_names(getattr(ie, name).__func__.__code__) for name in methods)) - {ie.__name__})
+            methods_lookup.append(f'{ie.__name__!r}: (_{ie.__name__}_methods, {tuple(used_ies)!r})')
+            yield METHODS_TEMPLATE.format(
+                name=ie.__name__, methods='\n'.join(methods.values()).rstrip(),
+                names=', '.join(f'{name!r}: {name}' for name in methods))
+
+    # marshal format version 4 is readable by all supported Python versions
+    yield '\n_CLASS_LOOKUP = LazyExtractorLookup(%r, {%s})' % (
+        marshal.dumps(tuple(table), 4), ', '.join(methods_lookup))
+
+
+def code_names(code):
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from code_names(const)
 
 
 def sort_ies(ies, ignored_bases):
@@ -101,14 +137,24 @@ def sort_ies(ies, ignored_bases):
     yield ies[-1]
 
 
-def build_lazy_ie(ie, name, attr_base):
-    bases = ', '.join({
+def build_lazy_ie(ie, name, attr_base, public):
+    """@returns the row of the LazyExtractorLookup table for the extractor"""
+    bases = tuple({
         'InfoExtractor': 'LazyLoadExtractor',
         'SearchInfoExtractor': 'LazyLoadSearchExtractor',
     }.get(base.__name__, base.__name__) for base in ie.__bases__)
 
-    s = IE_TEMPLATE.format(name=name, module=ie.__module__, bases=bases)
-    return s + '\n'.join(extra_ie_code(ie, attr_base))
+    attrs = {var: getattr(ie, var) for var in STATIC_CLASS_PROPERTIES if getattr(ie, var) != getattr(attr_base, var)}
+    info = None
+    if public:
+        # Needed before the class is created: to select the extractors and match URLs with them
+        info = {
+            'ie_key': ie.ie_key(),
+            'IE_NAME': ie.IE_NAME,
+            '_ENABLED': ie._ENABLED,
+            'url_keys': url_keys(ie),
+        }
+    return name, ie.__module__, bases, attrs, info
 
 
 if __name__ == '__main__':
@@ -2,7 +2,8 @@
 
 import pytest
 
-from yt_dlp.networking import RequestHandler
+from yt_dlp.networking import RequestHandler, _load_request_handlers
+from yt_dlp.networking.asynchronous import _ASYNC_REQUEST_HANDLERS, _load_async_request_handlers
 from yt_dlp.networking.common import _REQUEST_HANDLERS
 from yt_dlp.utils._utils import _YDLLogger as FakeLogger
 
@@ -12,10 +13,14 @@ def handler(request):
     RH_KEY = getattr(request, 'param', None)
     if not RH_KEY:
         return
+    _load_request_handlers()
+    _load_async_request_handlers()
     if inspect.isclass(RH_KEY) and issubclass(RH_KEY, RequestHandler):
         handler = RH_KEY
     elif RH_KEY in _REQUEST_HANDLERS:
         handler = _REQUEST_HANDLERS[RH_KEY]
+    elif RH_KEY in _ASYNC_REQUEST_HANDLERS:
+        handler = _ASYNC_REQUEST_HANDLERS[RH_KEY]
     else:
         pytest.skip(f'{RH_KEY} request handler is not available')
 
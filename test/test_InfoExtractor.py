@@ -9,17 +9,22 @@
 
 
 import http.server
+import re
 import threading
+from unittest.mock import patch
 
 from test.helper import FakeYDL, expect_dict, expect_value, http_server_port
 from yt_dlp.compat import compat_etree_fromstring
 from yt_dlp.extractor import YoutubeIE, get_info_extractor
 from yt_dlp.extractor.common import InfoExtractor
 from yt_dlp.utils import (
+    NO_DEFAULT,
     ExtractorError,
     RegexNotFoundError,
     encode_data_uri,
+    js_to_json,
     strip_jsonp,
+    unescapeHTML,
 )
 
 TEAPOT_RESPONSE_STATUS = 418
@@ -84,6 +89,23 @@ def test_html_search_regex(self):
         search = lambda re, *args: self.ie._html_search_regex(re, html, *args)
         self.assertEqual(search(r'<p id="foo">(.+?)</p>', 'foo'), 'Watch this video')
 
+    def test_search_regex_cache(self):
+        from yt_dlp.extractor.common import _compile_regex_cached
+
+        before = _compile_regex_cached.cache_info()
+        for _ in range(3):
+            self.assertEqual(self.ie._search_regex(r'cache-test-(\d+)', 'cache-test-42', 'number'), '42')
+            self.assertEqual(self.ie._search_regex(
+                [r'cache-test-([a-z]+)', r'cache-test-(\d+)'], 'cache-test-42', 'number'), '42')
+        after = _compile_regex_cached.cache_info()
+        self.assertEqual(after.misses - before.misses, 2)
+        self.assertEqual(after.hits - before.hits, 7)
+
+        pattern = re.compile(r'cache-test-(\d+)')
+        self.assertEqual(self.ie._search_regex(pattern, 'cache-test-42', 'number'), '42')
+        with self.assertRaises(ValueError):
+            self.ie._search_regex(pattern, 'cache-test-42', 'number', flags=re.I)
+
     def test_opengraph(self):
         ie = self.ie
         html = '''
@@ -350,6 +372,23 @@ def test_search_json_ld_realworld(self):
                 expected_dict,
             )
 
+    def test_search_json(self):
+        search = lambda html, **kwargs: self.ie._search_json(r'data\s*=', html, 'data', None, **kwargs)
+        with patch.object(InfoExtractor, '_decode_json_in_place', staticmethod(lambda *_: NO_DEFAULT)):
+            cases = [
+                ('<script>data = {"a": [1, {"b": "}"}]};</script><script>x = {"c": 1}</script>', {}),
+                ('<script>data = {"a": "x"} </script>', {'end_pattern': r'</script>'}),
+                ('<script>data = {a: [1, \'}\', `]`], /* } */ b: undefined}; f({})</script>', {
+                    'transform_source': js_to_json}),
+                ('<script>data = {"a": "x"} </script>', {'end_pattern': ';', 'default': None}),
+                ('<script>data = {a: 1</script>', {'transform_source': js_to_json, 'default': None}),
+                ('<script>data = {&quot;a&quot;: 1}</script>', {'transform_source': unescapeHTML}),
+            ]
+            expected = [search(html, **kwargs) for html, kwargs in cases]
+        self.assertEqual([search(html, **kwargs) for html, kwargs in cases], expected)
+        self.assertEqual(expected, [
+            {'a': [1, {'b': '}'}]}, {'a': 'x'}, {'a': [1, '}', ']'], 'b': None}, None, None, {'a': 1}])
+
     def test_download_json(self):
         uri = encode_data_uri(b'{"foo": "blah"}', 'application/json')
         self.assertEqual(self.ie._download_json(uri, None), {'foo': 'blah'})
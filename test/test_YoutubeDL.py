@@ -14,6 +14,7 @@
 import contextlib
 import copy
 import json
+import tempfile
 
 from test.helper import FakeYDL, assertRegexpMatches, try_rm
 from yt_dlp import YoutubeDL
@@ -23,9 +24,11 @@
     ExtractorError,
     LazyList,
     OnDemandPagedList,
+    PostProcessingError,
     int_or_none,
     match_filter_func,
 )
+from yt_dlp.utils._utils import _YDLLogger as FakeLogger
 from yt_dlp.utils.traversal import traverse_obj
 
 TEST_URL = 'http://localhost/sample.mp4'
@@ -60,6 +63,30 @@ def _make_result(formats, **kwargs):
     return res
 
 
+class _JournalYDL(YoutubeDL):
+    """Downloads to `tmpdir`, resuming the job journaled there"""
+
+    def __init__(self, tmpdir):
+        super().__init__({
+            'resume_job': os.path.join(tmpdir, 'job.jsonl'),
+            'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
+            'ignoreerrors': 'only_download',  # The CLI default
+            'fixup': 'never',
+            'quiet': True,
+            'logger': FakeLogger(),
+        }, auto_init=False)
+        self.downloaded = []
+
+    def dl(self, name, info, subtitle=False, test=False):
+        if os.path.exists(name):
+            # As FileDownloader does for a file that was already downloaded
+            return True, False
+        with open(name, 'w') as f:
+            f.write('EXAMPLE')
+        self.downloaded.append(info['id'])
+        return True, True
+
+
 class TestFormatSelection(unittest.TestCase):
     def test_prefer_free_formats(self):
         # Same resolution => download webm
@@ -857,6 +884,15 @@ def gen():
         test('%(title3)s', ('foo/bar\\test', 'foo⧸bar⧹test'))
         test('folder/%(title3)s', ('folder/foo/bar\\test', f'folder{os.path.sep}foo⧸bar⧹test'))
 
+    def test_compiled_outtmpl_reuse(self):
+        ydl = FakeYDL()
+        tmpl = '%(title)s - %(x,id)s - %(height+1)d.%(ext)s'
+        self.assertIs(ydl._compile_outtmpl(tmpl), ydl._compile_outtmpl(tmpl))
+        self.assertEqual(
+            ydl.evaluate_outtmpl(tmpl, {'title': 'a', 'id': '1', 'height': 1, 'ext': 'mp4'}), 'a - 1 - 2.mp4')
+        self.assertEqual(
+            ydl.evaluate_outtmpl(tmpl, {'title': 'b', 'x': '2', 'ext': 'webm'}), 'b - 2 - NA.webm')
+
     def test_format_note(self):
         ydl = YoutubeDL()
         self.assertEqual(ydl._format_note({}), '')
@@ -1099,6 +1135,157 @@ def test_selection(params, expected_ids, evaluate_all=False):
         test_selection({'playlist_items': '-15::2'}, INDICES[1::2], True)
         test_selection({'playlist_items': '-15::15'}, [], True)
 
+    def test_resume_job(self):
+        def run(journal_fn, **params):
+            with YDL({'resume_job': journal_fn, **params}) as ydl:
+                ydl.process_ie_result({
+                    '_type': 'playlist',
+                    'id': 'test',
+                    'extractor': 'test:playlist',
+                    'extractor_key': 'test:playlist',
+                    'webpage_url': 'http://example.com',
+                    'entries': [{'id': str(i), 'title': str(i), 'url': TEST_URL} for i in range(1, 6)],
+                })
+            return [info['id'] for info in ydl.downloaded_info_dicts]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_fn = os.path.join(tmpdir, 'job.jsonl')
+            self.assertEqual(run(journal_fn, playlistend=2), ['1', '2'])
+            with open(journal_fn, 'a', encoding='utf-8') as f:
+                f.write('{"type": "entry", "playl')  # Partially written line
+            self.assertEqual(run(journal_fn), ['3', '4', '5'])
+            self.assertEqual(run(journal_fn), [])
+
+    def test_resume_job_pending(self):
+        processed = []
+
+        class FailingPP(PostProcessor):
+            def run(self, info):
+                if info['id'] == '2' and fail_pp:
+                    raise PostProcessingError('Failed')
+                processed.append(info['id'])
+                return [], info
+
+        def run(tmpdir):
+            processed.clear()
+            with _JournalYDL(tmpdir) as ydl:
+                ydl.add_post_processor(FailingPP())
+                ydl.process_ie_result({
+                    '_type': 'playlist',
+                    'id': 'test',
+                    'extractor': 'test:playlist',
+                    'extractor_key': 'test:playlist',
+                    'webpage_url': 'http://example.com',
+                    'entries': [{
+                        'id': str(i), 'title': str(i), 'url': TEST_URL, 'ext': 'mp4',
+                        'extractor': 'test', 'extractor_key': 'Test',
+                    } for i in range(1, 4)],
+                })
+            return processed, ydl.downloaded
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fail_pp = True
+            self.assertEqual(run(tmpdir), (['1', '3'], ['1', '2', '3']))
+            # The video that was downloaded but not post-processed is processed again, without downloading it
+            fail_pp = False
+            self.assertEqual(run(tmpdir), (['2'], []))
+            self.assertEqual(run(tmpdir), ([], []))
+
+    def test_resume_job_urls(self):
+        class TestIE(InfoExtractor):
+            _VALID_URL = r'test:(?P<id>\w+)'
+
+            def _real_extract(self, url):
+                video_id = self._match_id(url)
+                if video_id == 'fail':
+                    raise ExtractorError('Failed', expected=True)
+                return {'id': video_id, 'title': video_id, 'url': TEST_URL, 'ext': 'mp4'}
+
+        def run(tmpdir):
+            with _JournalYDL(tmpdir) as ydl:
+                ydl.add_info_extractor(TestIE(ydl))
+                retcode = ydl.download(['test:ok1', 'test:fail', 'test:ok2'])
+            return retcode, ydl.downloaded
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # URLs that succeed after one that failed are still completed
+            self.assertEqual(run(tmpdir), (1, ['ok1', 'ok2']))
+            self.assertEqual(run(tmpdir), (1, []))
+
+    def test_resume_job_no_archive_id(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with _JournalYDL(tmpdir) as ydl:
+                ydl.process_ie_result({'id': '1', 'title': '1', 'url': TEST_URL, 'ext': 'mp4'})
+            self.assertEqual(ydl.downloaded, ['1'])
+            self.assertFalse(os.path.exists(os.path.join(tmpdir, 'job.jsonl')))
+
+    def test_params_overlay(self):
+        ydl = YDL({'format': 'worst', 'simulate': True})
+        base_jar = ydl.cookiejar
+
+        def selected_format(**params):
+            with ydl.params_overlay(params):
+                ydl.process_ie_result(_make_result([
+                    {'format_id': str(i), 'url': TEST_URL, 'preference': i} for i in range(3)]))
+            return ydl.downloaded_info_dicts.pop()['format_id']
+
+        self.assertEqual(selected_format(), '0')
+        self.assertEqual(selected_format(format='best'), '2')
+        self.assertEqual(selected_format(format='1'), '1')
+        self.assertEqual(selected_format(), '0')
+
+        with ydl.params_overlay({'playlistrandom': True, 'outtmpl': '%(title)s.%(ext)s'}):
+            self.assertTrue(ydl.params['playlistrandom'])
+            self.assertEqual(ydl.params['outtmpl']['default'], '%(title)s.%(ext)s')
+            with ydl.params_overlay({'playlistrandom': False}):
+                self.assertFalse(ydl.params['playlistrandom'])
+            self.assertTrue(ydl.params['playlistrandom'])
+            ydl.params['restrictfilenames'] = True
+        self.assertNotIn('playlistrandom', ydl.params)
+        self.assertNotIn('restrictfilenames', ydl.params)
+        self.assertEqual(ydl.params['outtmpl']['default'], '%(id)s.%(ext)s')
+
+        with self.assertRaisesRegex(ValueError, r'proxy'):
+            with ydl.params_overlay({'quiet': True, 'proxy': 'http://127.0.0.1:3128'}):
+                pass
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cookiefile = os.path.join(tmpdir, 'cookies.txt')
+            with open(cookiefile, 'w', encoding='utf-8') as f:
+                f.write('# Netscape HTTP Cookie File\n.example.com\tTRUE\t/\tFALSE\t0\tname\tvalue\n')
+            with ydl.params_overlay({'cookiefile': cookiefile}):
+                self.assertIsNot(ydl.cookiejar, base_jar)
+                self.assertEqual(ydl.cookiejar.get_cookie_header('https://example.com/'), 'name=value')
+            self.assertIs(ydl.cookiejar, base_jar)
+            self.assertIsNone(ydl.cookiejar.get_cookie_header('https://example.com/'))
+
+    def test_thread_safe(self):
+        import threading
+
+        ydl = YDL({'format': 'worst', 'simulate': True, 'thread_safe': True})
+        formats = [{'format_id': str(i), 'url': TEST_URL, 'preference': i} for i in range(3)]
+        barrier = threading.Barrier(3)
+        results = {}
+
+        def run(format_spec):
+            with ydl.params_overlay({'format': format_spec}):
+                barrier.wait()
+                ydl.process_ie_result(_make_result(formats, id=format_spec))
+                results[format_spec] = ydl._num_videos, ydl.get_info_extractor('Generic')
+
+        threads = [threading.Thread(target=run, args=(spec,)) for spec in ('0', '1', '2')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual({info['id']: info['format_id'] for info in ydl.downloaded_info_dicts}, {
+            '0': '0', '1': '1', '2': '2'})
+        self.assertEqual([num_videos for num_videos, _ in results.values()], [1, 1, 1])
+        self.assertEqual(len({id(ie) for _, ie in results.values()}), 3)
+        self.assertEqual(ydl.params['format'], 'worst')
+        self.assertEqual(ydl._num_videos, 0)
+
     def test_do_not_override_ie_key_in_url_transparent(self):
         ydl = YDL()
 
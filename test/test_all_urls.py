@@ -11,7 +11,9 @@
 import collections
 
 from test.helper import gettestcases
-from yt_dlp.extractor import FacebookIE, YoutubeIE, gen_extractors
+from yt_dlp.extractor import FacebookIE, YoutubeIE, gen_extractor_classes, gen_extractors
+from yt_dlp.extractor._dispatch import ExtractorIndex, url_keys
+from yt_dlp.extractor.common import InfoExtractor
 
 
 class TestAllURLsMatching(unittest.TestCase):
@@ -82,6 +84,29 @@ def test_no_duplicates(self):
                         ie.suitable(url),
                         f'{type(ie).__name__} should not match URL {url!r} . That URL belongs to {tc["name"]}.')
 
+    def test_extractor_index(self):
+        index = ExtractorIndex({ie.ie_key(): ie for ie in gen_extractor_classes()})
+        for tc in gettestcases(include_onlymatching=True):
+            url = tc['url']
+            candidates = index.candidates(url)
+            self.assertIn(tc['name'], candidates, f'Extractor index does not find {tc["name"]} for URL {url!r}')
+            self.assertEqual(candidates[-1], 'Generic')
+
+    def test_url_keys(self):
+        def keys(valid_url):
+            return url_keys(type('TestIE', (InfoExtractor,), {'_VALID_URL': valid_url}))
+
+        self.assertEqual(keys(r'https?://(?:www\.)?example\.com/(?P<id>\d+)'), ('example',))
+        self.assertEqual(keys(r'https?://(?:[^/]+\.)?example\.com/'), ('example',))
+        self.assertEqual(keys(r'https?://[^/]*example\.com/'), ('com',))
+        self.assertEqual(keys(r'https?://example(?P<n>\d)\.com/'), ('com',))
+        self.assertEqual(keys(r'(?i)https?://(?:Example|sample)\.org/'), ('example', 'sample'))
+        self.assertEqual(keys((r'https?://a\.example\.org/', r'https?://sample\.org/')), ('example', 'sample'))
+        self.assertEqual(keys(False), ())
+        self.assertIsNone(keys(r'https?://[^/]+/(?P<id>\d+)'))
+        self.assertIsNone(keys(r'examplesearch(?P<prefix>|\d+):(?P<query>.+)'))
+        self.assertIsNone(url_keys(YoutubeIE))
+
     def test_keywords(self):
         self.assertMatch(':ytsubs', ['youtube:subscriptions'])
         self.assertMatch(':ytsubscriptions', ['youtube:subscriptions'])
@@ -9,12 +9,14 @@
 
 
 import contextlib
+import re
 import subprocess
 
 from yt_dlp.utils import Popen
 
 rootDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LAZY_EXTRACTORS = 'yt_dlp/extractor/lazy_extractors.py'
+IMPORT_TIME_BUDGET = 1.5  # seconds, for `import yt_dlp` without bytecode cache on slow runners
 
 
 class TestExecution(unittest.TestCase):
@@ -39,6 +41,30 @@ def test_import(self):
     def test_module_exec(self):
         self.run_yt_dlp(exe=(sys.executable, '-m', 'yt_dlp'))
 
+    def test_import_time(self):
+        # These are only imported when they are used
+        lazy_modules = {
+            'yt_dlp.aes', 'yt_dlp.jsinterp', 'yt_dlp.webvtt',
+            'yt_dlp.downloader.external', 'yt_dlp.downloader.fragment',
+            'yt_dlp.downloader.http', 'yt_dlp.downloader.websocket',
+            'yt_dlp.extractor.adobepass',
+            'yt_dlp.networking._curlcffi', 'yt_dlp.networking._requests', 'yt_dlp.networking._websockets',
+            'yt_dlp.networking._aiohttp', 'yt_dlp.networking.asynchronous', 'aiohttp',
+            'yt_dlp.postprocessor.modify_chapters', 'yt_dlp.postprocessor.sponsorblock',
+        }
+        _, stderr, returncode = Popen.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import yt_dlp'],
+            cwd=rootDir, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual(returncode, 0, stderr)
+
+        cumulative_times = {
+            mobj.group('module'): int(mobj.group('cumulative'))
+            for mobj in re.finditer(r'(?m)^import time:\s*\d+ \|\s*(?P<cumulative>\d+) \| +(?P<module>\S+)$', stderr)}
+        if 'yt_dlp' not in cumulative_times:
+            self.skipTest('-X importtime is not supported')
+        self.assertFalse(lazy_modules & cumulative_times.keys())
+        self.assertLess(cumulative_times['yt_dlp'] / 1_000_000, IMPORT_TIME_BUDGET)
+
     def test_cmdline_umlauts(self):
         _, stderr = self.run_yt_dlp(opts=('ä', '--version'))
         self.assertFalse(stderr)
@@ -55,6 +81,18 @@ def test_lazy_extractors(self):
                 stderr = ''
             self.assertFalse(stderr)
 
+            # Only the extractors that are tried for the URL should be created
+            stdout, _ = self.run_yt_dlp(exe=(sys.executable, '-c', '; '.join((
+                'from yt_dlp import YoutubeDL',
+                'from yt_dlp.extractor.lazy_extractors import _CLASS_LOOKUP',
+                'print(YoutubeDL()._find_suitable_ie("https://vimeo.com/56015672")[0])',
+                'print(len(_CLASS_LOOKUP._classes), len(_CLASS_LOOKUP))',
+            ))), opts=())
+            ie_key, counts = stdout.splitlines()
+            created, total = map(int, counts.split())
+            self.assertEqual(ie_key, 'Vimeo')
+            self.assertLess(created, total / 4)
+
             subprocess.check_call([sys.executable, 'test/test_all_urls.py'], cwd=rootDir, stdout=subprocess.DEVNULL)
         finally:
             with contextlib.suppress(OSError):
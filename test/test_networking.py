@@ -11,6 +11,8 @@
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import asyncio
+import concurrent.futures
 import gzip
 import http.client
 import http.cookiejar
@@ -19,6 +21,7 @@
 import logging
 import pathlib
 import random
+import socket
 import ssl
 import tempfile
 import threading
@@ -36,7 +39,7 @@
     verify_address_availability,
 )
 from yt_dlp.cookies import YoutubeDLCookieJar
-from yt_dlp.dependencies import brotli, curl_cffi, requests, urllib3
+from yt_dlp.dependencies import brotli, curl_cffi, requests, urllib3, zstd
 from yt_dlp.networking import (
     HEADRequest,
     PATCHRequest,
@@ -46,7 +49,15 @@
     RequestHandler,
     Response,
 )
-from yt_dlp.networking._urllib import UrllibRH
+from yt_dlp.networking._content_decoding import DECODE_CHUNK_SIZE, ContentDecoder
+from yt_dlp.networking._urllib import HTTPConnectionPool, UrllibRH
+from yt_dlp.networking.asynchronous import (
+    AsyncRequestDirector,
+    AsyncRequestHandler,
+    AsyncResponse,
+    SyncResponseAdapter,
+)
+from yt_dlp.networking.http_cache import HTTPCache
 from yt_dlp.networking.exceptions import (
     CertificateVerifyError,
     HTTPError,
@@ -69,6 +80,17 @@
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
+def zstd_compress(data):
+    if hasattr(zstd, 'ZstdCompressor') and hasattr(zstd.ZstdCompressor, 'compressobj'):  # zstandard
+        return zstd.ZstdCompressor().compress(data)
+    return zstd.compress(data)
+
+
+def raw_deflate_compress(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
 class HTTPTestRequestHandler(http.server.BaseHTTPRequestHandler):
     protocol_version = 'HTTP/1.1'
     default_request_version = 'HTTP/1.1'
@@ -222,6 +244,8 @@ def do_GET(self):
             for encoding in filter(None, (e.strip() for e in encodings.split(','))):
                 if encoding == 'br' and brotli:
                     payload = brotli.compress(payload)
+                elif encoding == 'zstd' and zstd:
+                    payload = zstd_compress(payload)
                 elif encoding == 'gzip':
                     payload = gzip.compress(payload, mtime=0)
                 elif encoding == 'deflate':
@@ -263,6 +287,13 @@ def do_GET(self):
             self.end_headers()
             self.wfile.write(payload)
             self.finish()
+        elif self.path == '/source_port':
+            payload = str(self.client_address[1]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
         elif self.path == '/get_cookie':
             self.send_response(200)
             self.send_header('Set-Cookie', 'test=ytdlp; path=/')
@@ -635,6 +666,19 @@ def test_brotli(self, handler):
             # Should auto-close and mark the response adaptor as closed
             assert res.closed
 
+    @pytest.mark.skip_handler('CurlCFFI', 'not applicable to curl-cffi')
+    @pytest.mark.skipif(not zstd, reason='zstd support is not installed')
+    def test_zstd(self, handler):
+        with handler() as rh:
+            res = validate_and_send(
+                rh, Request(
+                    f'http://127.0.0.1:{self.http_port}/content-encoding',
+                    headers={'ytdl-encoding': 'zstd'}))
+            assert res.headers.get('Content-Encoding') == 'zstd'
+            assert res.read() == b'<html><video src="/vid.mp4" /></html>'
+            # Should auto-close and mark the response adaptor as closed
+            assert res.closed
+
     def test_deflate(self, handler):
         with handler() as rh:
             res = validate_and_send(
@@ -669,6 +713,20 @@ def test_multiple_encodings(self, handler):
                 # Should auto-close and mark the response adaptor as closed
                 assert res.closed
 
+    @pytest.mark.skip_handler('CurlCFFI', 'curl-cffi decodes the content itself')
+    def test_content_decoder_byte_counts(self, handler):
+        with handler() as rh:
+            res = validate_and_send(
+                rh, Request(
+                    f'http://127.0.0.1:{self.http_port}/content-encoding',
+                    headers={'ytdl-encoding': 'gzip'}))
+            decoder = res.extensions['content_decoder']
+            assert res.read(10) == b'<html><vid'
+            assert decoder.bytes_decoded == 10
+            assert res.read() == b'eo src="/vid.mp4" /></html>'
+            assert decoder.bytes_read == int(res.headers['Content-Length'])
+            assert decoder.bytes_decoded == 37
+
     @pytest.mark.skip_handler('CurlCFFI', 'not supported by curl-cffi')
     def test_unsupported_encoding(self, handler):
         with handler() as rh:
@@ -695,6 +753,30 @@ def test_read(self, handler):
             # Should auto-close and mark the response adaptor as closed
             assert res.closed
 
+    def test_readinto(self, handler):
+        with handler() as rh:
+            res = validate_and_send(
+                rh, Request(f'http://127.0.0.1:{self.http_port}/headers'))
+            buffer = bytearray(4)
+            assert res.readinto(buffer) == 4
+            assert buffer == b'Host'
+            assert not res.closed
+            data = bytearray()
+            while n := res.readinto(buffer):
+                data += buffer[:n]
+            assert data.decode().endswith('\n\n')
+            assert res.readinto(buffer) == 0
+            assert res.closed
+
+    def test_readinto_encoded(self, handler):
+        with handler() as rh:
+            res = validate_and_send(
+                rh, Request(
+                    f'http://127.0.0.1:{self.http_port}/content-encoding',
+                    headers={'ytdl-encoding': 'gzip'}))
+            buffer = bytearray(1024)
+            assert buffer[:res.readinto(buffer)] == b'<html><video src="/vid.mp4" /></html>'
+
     def test_request_disable_proxy(self, handler):
         for proxy_proto in handler._SUPPORTED_PROXY_SCHEMES or ['http']:
             # Given the handler is configured with a proxy
@@ -931,6 +1013,36 @@ def test_http_response_auto_close(self, handler):
             assert res.fp.fp is None
             assert res.closed
 
+    def test_keep_alive(self, handler, monkeypatch):
+        with handler() as rh:
+            def source_port(read=True):
+                with validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/source_port')) as res:
+                    return res.read() if read else res.read(1)
+
+            port = source_port()
+            assert source_port() == port
+            assert source_port(read=False) == port[:1]
+            # The connection is not reused if the response was closed before it was fully read
+            new_port = source_port()
+            assert new_port != port
+            assert source_port() == new_port
+
+            monkeypatch.setattr(HTTPConnectionPool, 'IDLE_TIMEOUT', 0)
+            assert source_port() != new_port
+
+    @pytest.mark.parametrize('check_dropped', [True, False])
+    def test_keep_alive_closed_by_server(self, handler, monkeypatch, check_dropped):
+        if not check_dropped:
+            # The request is retried on a new connection when the reused one turns out to be closed
+            monkeypatch.setattr('yt_dlp.networking._urllib._is_connection_dropped', lambda sock: False)
+        with handler() as rh:
+            # The server closes the connection after the response
+            with validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/source_address')) as res:
+                assert res.read() == b'127.0.0.1'
+            time.sleep(0.1)
+            with validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/source_port')) as res:
+                assert res.read().isdigit()
+
     def test_data_uri_partial_read_then_full_read(self, handler):
         with handler() as rh:
             res = validate_and_send(rh, Request('data:text/plain,hello%20world'))
@@ -1264,6 +1376,30 @@ def close(self):
         assert res4.closed
         assert res4._buffer == b''
 
+        # should read into the given buffer
+        res5 = CurlCFFIResponseReader(FakeResponse())
+        buffer = bytearray(4)
+        assert res5.readinto(buffer) == 4
+        assert buffer == b'foob'
+        assert res5.bytes_read == 6
+        assert res5._buffer == b'ar'
+        assert res5.read(1) == b'a'
+        assert res5.readinto(buffer) == 2
+        assert buffer[:2] == b'rz'
+        assert res5._buffer == b''
+        assert res5.closed
+
+        # should read all chunks into a larger buffer and close on an exception
+        res6 = CurlCFFIResponseReader(FakeResponse(raise_error=True))
+        buffer = bytearray(6)
+        assert res6.readinto(buffer) == 6
+        assert buffer == b'foobar'
+        assert not res6.closed
+        with pytest.raises(Exception, match='test'):
+            res6.readinto(buffer)
+        assert res6._buffer == b''
+        assert res6.closed
+
     def test_http_response_auto_close(self, handler):
         with handler() as rh:
             res = validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_200'))
@@ -1273,6 +1409,363 @@ def test_http_response_auto_close(self, handler):
             assert res.closed
 
 
+class H2TestServer:
+    """Minimal HTTP/2 server for testing, serving each connection in its own thread"""
+
+    def __init__(self, alpn_protocols=('h2',)):
+        self.sslctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.sslctx.load_cert_chain(os.path.join(TEST_DIR, 'testcert.pem'), None)
+        self.sslctx.set_alpn_protocols(list(alpn_protocols))
+        self.socket = socket.create_server(('127.0.0.1', 0))
+        self.port = self.socket.getsockname()[1]
+        self.connections = 0
+        self.streams = 0
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            sock, _ = self.socket.accept()
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(sock,), daemon=True).start()
+
+    def _respond(self, conn, stream_id, headers, body):
+        path = headers[':path']
+        if path == '/headers':
+            status, res_headers, res_body = 200, [], '\n'.join(f'{k}: {v}' for k, v in headers.items()).encode()
+        elif path == '/echo':
+            status, res_headers, res_body = 200, [], body
+        elif path.startswith('/gen_'):
+            status, res_headers, res_body = int(path[5:]), [], b'<html></html>'
+        elif path.startswith('/bytes_'):
+            res_body = bytes(random.getrandbits(8) for _ in range(int(path[7:])))
+            status, res_headers = 200, [('content-length', str(len(res_body)))]
+        elif path == '/redirect':
+            status, res_headers, res_body = 301, [('location', '/headers')], b''
+        elif path == '/redirect_loop':
+            status, res_headers, res_body = 301, [('location', '/redirect_loop')], b''
+        elif path == '/set_cookie':
+            status, res_headers, res_body = 200, [('set-cookie', 'test=ytdlp; path=/')], b''
+        elif path == '/gzip':
+            res_body = gzip.compress(b'<html><video src="/vid.mp4" /></html>' * 1000)
+            status, res_headers = 200, [('content-encoding', 'gzip'), ('content-length', str(len(res_body)))]
+        else:
+            status, res_headers, res_body = 404, [], b''
+        conn.send_headers(stream_id, [(':status', str(status)), *res_headers])
+        return memoryview(res_body)
+
+    def _handle(self, sock):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        with self.sslctx.wrap_socket(sock, server_side=True) as sock:
+            conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+            conn.initiate_connection()
+            requests, bodies, pending = {}, {}, {}
+            while True:
+                sock.sendall(conn.data_to_send())
+                try:
+                    data = sock.recv(65536)
+                except OSError:
+                    return
+                if not data or conn.state_machine.state == h2.connection.ConnectionState.CLOSED:
+                    return
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        requests[event.stream_id] = dict(event.headers)
+                        bodies[event.stream_id] = b''
+                        self.streams += 1
+                    elif isinstance(event, h2.events.DataReceived):
+                        bodies[event.stream_id] += event.data
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        pending[event.stream_id] = self._respond(
+                            conn, event.stream_id, requests[event.stream_id], bodies[event.stream_id])
+                for stream_id, body in list(pending.items()):
+                    while body and conn.local_flow_control_window(stream_id):
+                        size = min(len(body), conn.max_outbound_frame_size, conn.local_flow_control_window(stream_id))
+                        conn.send_data(stream_id, body[:size].tobytes(), end_stream=size == len(body))
+                        body = body[size:]
+                    pending[stream_id] = body
+                    if not body:
+                        del pending[stream_id]
+
+
+@pytest.mark.parametrize('handler', ['H2'], indirect=True)
+class TestH2RequestHandler(TestRequestHandlerBase):
+    @classmethod
+    def setup_class(cls):
+        super().setup_class()
+        cls.h2_server = H2TestServer()
+        cls.h2_url = f'https://127.0.0.1:{cls.h2_server.port}'
+
+    def test_request(self, handler):
+        with handler(verify=False) as rh:
+            res = validate_and_send(rh, Request(f'{self.h2_url}/headers', headers={'X-Test': 'test'}))
+            assert res.status == 200
+            data = res.read().decode()
+            assert ':method: GET' in data
+            assert f':authority: 127.0.0.1:{self.h2_server.port}' in data
+            assert 'x-test: test' in data
+            assert 'accept-encoding: gzip, deflate' in data
+            assert res.closed
+
+    def test_request_body(self, handler):
+        data = bytes(random.getrandbits(8) for _ in range(200_000))
+        with handler(verify=False) as rh:
+            res = validate_and_send(rh, Request(f'{self.h2_url}/echo', data=data))
+            assert res.read() == data
+
+    def test_readinto(self, handler):
+        with handler(verify=False) as rh:
+            res = validate_and_send(rh, Request(f'{self.h2_url}/bytes_1000'))
+            buffer = bytearray(600)
+            assert res.readinto(buffer) == 600
+            assert res.readinto(buffer) == 400
+            assert res.readinto(buffer) == 0
+            assert res.closed
+
+    def test_multiplexed(self, handler):
+        server = H2TestServer()
+        with handler(verify=False) as rh:
+            def fetch(size):
+                res = validate_and_send(rh, Request(f'https://127.0.0.1:{server.port}/bytes_{size}'))
+                return len(res.read())
+
+            sizes = [random.randint(1, 300_000) for _ in range(30)]
+            with concurrent.futures.ThreadPoolExecutor(10) as pool:
+                assert list(pool.map(fetch, sizes)) == sizes
+        assert server.connections == 1
+        assert server.streams == len(sizes)
+
+    def test_abandoned_response(self, handler):
+        # Unread data of a closed response must not use up the connection's flow control window
+        server = H2TestServer()
+        with handler(verify=False) as rh:
+            for _ in range(10):
+                validate_and_send(rh, Request(f'https://127.0.0.1:{server.port}/bytes_3000000')).close()
+            res = validate_and_send(rh, Request(f'https://127.0.0.1:{server.port}/bytes_3000000'))
+            assert len(res.read()) == 3_000_000
+        assert server.connections == 1
+
+    def test_redirect(self, handler):
+        with handler(verify=False) as rh:
+            res = validate_and_send(rh, Request(f'{self.h2_url}/redirect'))
+            assert res.url == f'{self.h2_url}/headers'
+            assert ':path: /headers' in res.read().decode()
+
+            with pytest.raises(HTTPError) as exc_info:
+                validate_and_send(rh, Request(f'{self.h2_url}/redirect_loop'))
+            assert exc_info.value.redirect_loop
+
+    def test_http_error(self, handler):
+        with handler(verify=False) as rh:
+            with pytest.raises(HTTPError) as exc_info:
+                validate_and_send(rh, Request(f'{self.h2_url}/gen_404'))
+            assert exc_info.value.status == 404
+
+    def test_cookies(self, handler):
+        cookiejar = YoutubeDLCookieJar()
+        with handler(verify=False, cookiejar=cookiejar) as rh:
+            validate_and_send(rh, Request(f'{self.h2_url}/set_cookie')).close()
+            assert cookiejar.get_cookie_header(f'{self.h2_url}/') == 'test=ytdlp'
+            data = validate_and_send(rh, Request(f'{self.h2_url}/headers')).read().decode()
+            assert 'cookie: test=ytdlp' in data
+
+    def test_http1_server(self, handler):
+        with handler(verify=False) as rh:
+            for _ in range(2):
+                with pytest.raises(UnsupportedRequest):
+                    validate_and_send(rh, Request(f'https://127.0.0.1:{self.https_port}/headers'))
+
+    def test_director_fallback(self, handler):
+        # The next handler is used if the server turns out to not support HTTP/2
+        director = RequestDirector(logger=FakeLogger())
+        director.add_handler(handler(verify=False))
+        director.add_handler(UrllibRH(logger=FakeLogger(), verify=False))
+        director.preferences.add(lambda rh, _: 100 if rh.RH_KEY == handler.RH_KEY else 0)
+        try:
+            res = director.send(Request(f'https://127.0.0.1:{self.https_port}/headers'))
+            assert res.status == 200
+            res.close()
+        finally:
+            director.close()
+
+    def test_content_encoding(self, handler):
+        with handler(verify=False) as rh:
+            res = validate_and_send(rh, Request(f'{self.h2_url}/gzip'))
+            assert res.read() == b'<html><video src="/vid.mp4" /></html>' * 1000
+            assert res.extensions['content_decoder'].bytes_decoded == 37000
+            assert res.closed
+
+
+async def async_validate_and_send(rh, req):
+    rh.validate(req)
+    return await rh.send(req)
+
+
+@pytest.mark.parametrize('handler', ['Aiohttp'], indirect=True)
+class TestAiohttpRequestHandler(TestRequestHandlerBase):
+
+    def run(self, handler, func, **handler_kwargs):
+        async def run():
+            async with handler(**handler_kwargs) as rh:
+                return await func(rh)
+        return asyncio.run(run())
+
+    def test_request(self, handler):
+        async def func(rh):
+            res = await async_validate_and_send(
+                rh, Request(f'http://127.0.0.1:{self.http_port}/headers', headers={'X-Test': 'test'}))
+            assert isinstance(res, AsyncResponse)
+            assert res.status == 200
+            data = (await res.read()).decode()
+            assert 'X-Test: test' in data
+            assert 'Accept-Encoding: gzip, deflate' in data
+            assert 'User-Agent' not in data
+            assert res.closed
+
+        self.run(handler, func)
+
+    def test_verify_cert(self, handler):
+        async def func(rh):
+            with pytest.raises(CertificateVerifyError):
+                await async_validate_and_send(rh, Request(f'https://127.0.0.1:{self.https_port}/headers'))
+
+        self.run(handler, func)
+
+    def test_no_verify_cert(self, handler):
+        async def func(rh):
+            async with await async_validate_and_send(
+                    rh, Request(f'https://127.0.0.1:{self.https_port}/headers')) as res:
+                assert res.status == 200
+
+        self.run(handler, func, verify=False)
+
+    def test_read_partial(self, handler):
+        async def func(rh):
+            res = await async_validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/video.html'))
+            assert await res.read(10) == b'<html><vid'
+            assert await res.read() == b'eo src="/vid.mp4" /></html>'
+            assert res.closed
+            assert await res.read() == b''
+
+        self.run(handler, func)
+
+    def test_request_body(self, handler):
+        async def func(rh):
+            res = await async_validate_and_send(
+                rh, Request(f'http://127.0.0.1:{self.http_port}/method', data=b'test'))
+            assert res.get_header('Method') == 'POST'
+            assert (await res.read()).startswith(b'test')
+
+        self.run(handler, func)
+
+    @pytest.mark.parametrize('redirect_status,method,expected', [
+        (301, 'POST', 'GET'),
+        (303, 'POST', 'GET'),
+        (307, 'POST', 'POST'),
+        (308, 'HEAD', 'HEAD'),
+    ])
+    def test_redirect(self, handler, redirect_status, method, expected):
+        async def func(rh):
+            res = await async_validate_and_send(rh, Request(
+                f'http://127.0.0.1:{self.http_port}/redirect_{redirect_status}', method=method,
+                data=b'testdata' if method == 'POST' else None))
+            assert res.url == f'http://127.0.0.1:{self.http_port}/method'
+            assert res.get_header('Method') == expected
+            data = await res.read()
+            assert data.startswith(b'testdata') == (expected == 'POST')
+
+        self.run(handler, func)
+
+    def test_redirect_non_ascii(self, handler):
+        async def func(rh):
+            async with await async_validate_and_send(
+                    rh, Request(f'http://127.0.0.1:{self.http_port}/302-non-ascii-redirect')) as res:
+                assert res.status == 200
+                assert res.url == f'http://127.0.0.1:{self.http_port}/%E4%B8%AD%E6%96%87.html'
+
+        self.run(handler, func)
+
+    def test_redirect_loop(self, handler):
+        async def func(rh):
+            with pytest.raises(HTTPError) as exc_info:
+                await async_validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/redirect_loop'))
+            assert exc_info.value.redirect_loop
+            exc_info.value.close()
+
+        self.run(handler, func)
+
+    def test_http_error(self, handler):
+        async def func(rh):
+            with pytest.raises(HTTPError) as exc_info:
+                await async_validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/gen_404'))
+            assert exc_info.value.status == 404
+            assert await exc_info.value.response.read() == b'<html></html>'
+
+        self.run(handler, func)
+
+    def test_cookies(self, handler):
+        cookiejar = YoutubeDLCookieJar()
+
+        async def func(rh):
+            (await async_validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/get_cookie'))).close()
+            assert cookiejar.get_cookie_header(f'http://127.0.0.1:{self.http_port}/') == 'test=ytdlp'
+            res = await async_validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/headers'))
+            assert 'Cookie: test=ytdlp' in (await res.read()).decode()
+
+        self.run(handler, func, cookiejar=cookiejar)
+
+    @pytest.mark.parametrize('encoding', ['gzip', 'deflate', 'br'])
+    def test_content_encoding(self, handler, encoding):
+        if encoding == 'br' and not brotli:
+            pytest.skip('brotli support is not installed')
+
+        async def func(rh):
+            res = await async_validate_and_send(rh, Request(
+                f'http://127.0.0.1:{self.http_port}/content-encoding', headers={'ytdl-encoding': encoding}))
+            assert await res.read() == b'<html><video src="/vid.mp4" /></html>'
+
+        self.run(handler, func)
+
+    def test_incomplete_read(self, handler):
+        async def func(rh):
+            res = await async_validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/incompleteread'))
+            with pytest.raises(TransportError):
+                await res.read()
+
+        self.run(handler, func)
+
+    def test_timeout(self, handler):
+        async def func(rh):
+            with pytest.raises(TransportError):
+                await async_validate_and_send(rh, Request(f'http://127.0.0.1:{self.http_port}/timeout_1'))
+            async with await async_validate_and_send(
+                    rh, Request(f'http://127.0.0.1:{self.http_port}/timeout_1', extensions={'timeout': 4})) as res:
+                assert res.status == 200
+
+        self.run(handler, func, timeout=0.5)
+
+    def test_concurrent(self, handler):
+        async def func(rh):
+            async def fetch():
+                async with await async_validate_and_send(
+                        rh, Request(f'http://127.0.0.1:{self.http_port}/timeout_1')) as res:
+                    return res.status
+
+            start = time.monotonic()
+            assert await asyncio.gather(*(fetch() for _ in range(5))) == [200] * 5
+            assert time.monotonic() - start < 4
+
+        self.run(handler, func)
+
+    def test_unsupported_data(self, handler):
+        with handler() as rh:
+            with pytest.raises(UnsupportedRequest):
+                rh.validate(Request(f'http://127.0.0.1:{self.http_port}/method', data=iter([b'test'])))
+
+
 def run_validation(handler, error, req, **handler_kwargs):
     with handler(**handler_kwargs) as rh:
         if error:
@@ -1321,6 +1814,10 @@ class HTTPSupportedRH(ValidationRH):
             ('http', False, {}),
             ('https', False, {}),
         ]),
+        ('H2', [
+            ('http', UnsupportedRequest, {}),
+            ('https', False, {}),
+        ]),
         (NoCheckRH, [('http', False, {})]),
         (ValidationRH, [('http', UnsupportedRequest, {})]),
     ]
@@ -1352,6 +1849,11 @@ class HTTPSupportedRH(ValidationRH):
             ('socks5', False),
             ('socks5h', False),
         ]),
+        ('H2', 'https', [
+            ('http', UnsupportedRequest),
+            ('https', UnsupportedRequest),
+            ('socks5', UnsupportedRequest),
+        ]),
         ('Websockets', 'ws', [
             ('http', UnsupportedRequest),
             ('https', UnsupportedRequest),
@@ -1380,6 +1882,10 @@ class HTTPSupportedRH(ValidationRH):
             ('all', 'http', False),
             ('unrelated', 'http', False),
         ]),
+        ('H2', 'https', [
+            ('all', 'http', UnsupportedRequest),
+            ('unrelated', 'http', False),
+        ]),
         ('Websockets', 'ws', [
             ('all', 'socks5', False),
             ('unrelated', 'socks5', False),
@@ -1401,6 +1907,8 @@ class HTTPSupportedRH(ValidationRH):
             ({'legacy_ssl': True}, False),
             ({'legacy_ssl': 'notabool'}, AssertionError),
             ({'keep_header_casing': True}, UnsupportedRequest),
+            ({'multiplex': True}, False),
+            ({'multiplex': 'notabool'}, AssertionError),
         ]),
         ('Requests', 'http', [
             ({'cookiejar': 'notacookiejar'}, AssertionError),
@@ -1414,6 +1922,7 @@ class HTTPSupportedRH(ValidationRH):
             ({'keep_header_casing': False}, False),
             ({'keep_header_casing': True}, False),
             ({'keep_header_casing': 'notabool'}, AssertionError),
+            ({'multiplex': True}, False),
         ]),
         ('CurlCFFI', 'http', [
             ({'cookiejar': 'notacookiejar'}, AssertionError),
@@ -1430,6 +1939,22 @@ class HTTPSupportedRH(ValidationRH):
             ({'legacy_ssl': False}, False),
             ({'legacy_ssl': True}, False),
             ({'legacy_ssl': 'notabool'}, AssertionError),
+            ({'multiplex': True}, False),
+        ]),
+        ('H2', 'https', [
+            ({'cookiejar': YoutubeDLCookieJar()}, False),
+            ({'timeout': 1}, False),
+            ({'unsupported': 'value'}, UnsupportedRequest),
+            ({'legacy_ssl': True}, False),
+            ({'keep_header_casing': True}, UnsupportedRequest),
+            ({'multiplex': True}, False),
+            ({'multiplex': 'notabool'}, AssertionError),
+            ({'impersonate': ImpersonateTarget('chrome', None, None, None)}, UnsupportedRequest),
+        ]),
+        (HTTPSupportedRH, 'http', [
+            ({'unsupported': 'value'}, UnsupportedRequest),
+            ({'multiplex': True}, False),
+            ({'multiplex': 'notabool'}, AssertionError),
         ]),
         (NoCheckRH, 'http', [
             ({'cookiejar': 'notacookiejar'}, False),
@@ -1441,6 +1966,7 @@ class HTTPSupportedRH(ValidationRH):
             ({'legacy_ssl': False}, False),
             ({'legacy_ssl': True}, False),
             ({'legacy_ssl': 'notabool'}, AssertionError),
+            ({'multiplex': True}, False),
         ]),
     ]
 
@@ -1617,6 +2143,21 @@ def _send(self, request: Request):
         with pytest.raises(NoSupportingHandlers):
             director.send(Request('any://'))
 
+    def test_unsupported_on_send(self):
+        class LateUnsupportedRH(FakeRH):
+            def _send(self, request: Request):
+                raise UnsupportedRequest('found out while sending')
+
+        director = RequestDirector(logger=FakeLogger())
+        director.add_handler(LateUnsupportedRH(logger=FakeLogger()))
+        with pytest.raises(NoSupportingHandlers, match=r'found out while sending'):
+            director.send(Request('any://'))
+
+        # The next handler should be tried
+        director.add_handler(FakeRH(logger=FakeLogger()))
+        director.preferences.add(lambda rh, _: 100 if rh.RH_KEY == LateUnsupportedRH.RH_KEY else 0)
+        assert isinstance(director.send(Request('http://')), FakeResponse)
+
     def test_unexpected_error(self):
         director = RequestDirector(logger=FakeLogger())
 
@@ -1672,6 +2213,414 @@ def mock_close(*args, **kwargs):
 
 
 # XXX: do we want to move this to test_YoutubeDL.py?
+class HedgeTestRH(RequestHandler):
+    _SUPPORTED_URL_SCHEMES = ('http',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delays = []
+        self.requests = []
+        self.responses = {}
+        self._lock = threading.Lock()
+
+    def _send(self, request: Request):
+        with self._lock:
+            index = len(self.requests)
+            self.requests.append(request)
+        delay = self.delays[index] if index < len(self.delays) else 0
+        if isinstance(delay, Exception):
+            raise delay
+        if isinstance(delay, tuple):
+            # An error after a delay
+            time.sleep(delay[0])
+            raise delay[1]
+        time.sleep(delay)
+        self.responses[index] = Response(io.BytesIO(str(index).encode()), url=request.url, headers={})
+        return self.responses[index]
+
+
+class TestRequestHedging:
+    @pytest.fixture
+    def director(self):
+        director = RequestDirector(logger=FakeLogger(), hedge_delay=0.1)
+        director.add_handler(HedgeTestRH(logger=FakeLogger()))
+        yield director
+        director.close()
+
+    def test_fast(self, director):
+        rh = director.handlers['HedgeTest']
+        assert director.send(Request('http://test/', extensions={'hedge': True})).read() == b'0'
+        assert len(rh.requests) == 1
+        assert 'hedge' not in rh.requests[0].extensions
+
+    def test_slow(self, director):
+        rh = director.handlers['HedgeTest']
+        rh.delays = [1, 0]
+        start = time.monotonic()
+        res = director.send(Request('http://test/', data=b'data', extensions={'hedge': True}))
+        assert res.read() == b'1'
+        assert time.monotonic() - start < 0.9
+        assert [request.data for request in rh.requests] == [b'data', b'data']
+        # The slow response is closed once it arrives
+        time.sleep(1.5)
+        assert rh.responses[0].closed
+        assert not res.closed
+
+    def test_not_hedged(self, director):
+        rh = director.handlers['HedgeTest']
+        rh.delays = [0.3, 0.3, 0.3]
+        assert director.send(Request('http://test/')).read() == b'0'
+        assert director.send(Request('http://test/', data=io.BytesIO(b'data'), extensions={'hedge': True}))
+        assert len(rh.requests) == 2
+        director.hedge_delay = None
+        assert director.send(Request('http://test/', extensions={'hedge': True})).read() == b'2'
+        assert len(rh.requests) == 3
+
+    def test_errors(self, director):
+        rh = director.handlers['HedgeTest']
+        rh.delays = [TransportError('fast error')]
+        with pytest.raises(TransportError, match='fast error'):
+            director.send(Request('http://test/', extensions={'hedge': True}))
+        assert len(rh.requests) == 1
+
+        # A failed request should not prevent the other from succeeding
+        rh.requests.clear()
+        rh.delays = [0.3, TransportError('hedge error')]
+        assert director.send(Request('http://test/', extensions={'hedge': True})).read() == b'0'
+
+    def test_http_errors_closed(self, director):
+        rh = director.handlers['HedgeTest']
+
+        def http_error(status):
+            return HTTPError(Response(io.BytesIO(b'error'), url='http://test/', headers={}, status=status))
+
+        # The response of an error that is not raised is closed
+        hedge_error = http_error(500)
+        rh.delays = [0.3, hedge_error]
+        assert director.send(Request('http://test/', extensions={'hedge': True})).read() == b'0'
+        assert hedge_error.response.closed
+
+        # Only the error that arrives first is raised if both requests fail
+        rh.requests.clear()
+        director.hedge_ratio = 1
+        first_error, hedge_error = http_error(404), http_error(500)
+        rh.delays = [(0.3, first_error), hedge_error]
+        with pytest.raises(HTTPError) as exc_info:
+            director.send(Request('http://test/', extensions={'hedge': True}))
+        assert exc_info.value is hedge_error
+        assert not hedge_error.response.closed
+        assert first_error.response.closed
+        assert len(rh.requests) == 2
+
+    def test_latency(self, director):
+        rh = director.handlers['HedgeTest']
+        rh.delays = [1, 0.05]
+        director.send(Request('http://test/', extensions={'hedge': True})).close()
+        # The latency of the duplicate request does not include the hedge delay
+        assert director._hedge_latencies[-1] < director.hedge_delay
+
+    def test_ratio(self, director):
+        rh = director.handlers['HedgeTest']
+        director.hedge_ratio = 0.5
+        rh.delays = [0.2] * 10
+        for _ in range(4):
+            director.send(Request('http://test/', extensions={'hedge': True}))
+        # One hedge is always allowed, then up to half of the requests
+        assert len(rh.requests) == 6
+
+    def test_auto_delay(self, director):
+        director.hedge_delay = 'auto'
+        assert director._get_hedge_delay() == director._HEDGE_FALLBACK_DELAY
+        director._hedge_latencies.extend([0.1] * 90 + [1] * 10)
+        assert director._get_hedge_delay() == 1
+        # Only recent latencies are used
+        director._hedge_latencies.extend([0.1] * 100)
+        assert director._get_hedge_delay() == 0.1
+
+
+class CacheTestRH(RequestHandler):
+    _SUPPORTED_URL_SCHEMES = ('http',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+        self.responses = {}
+
+    def _send(self, request: Request):
+        self.requests.append(request)
+        headers, body = self.responses[request.url]
+        if headers.get('ETag') and request.headers.get('If-None-Match') == headers['ETag']:
+            raise HTTPError(Response(io.BytesIO(b''), url=request.url, headers=headers, status=304))
+        return Response(io.BytesIO(body), url=request.url, headers=headers)
+
+
+class TestHTTPCache:
+    @pytest.fixture
+    def director(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            director = RequestDirector(logger=FakeLogger(), cache=HTTPCache(cache_dir, max_size=1000))
+            director.add_handler(CacheTestRH(logger=FakeLogger()))
+            yield director
+            director.close()
+
+    @staticmethod
+    def _fetch(director, url, **kwargs):
+        with director.send(Request(url, **kwargs)) as res:
+            return res.read(), res.extensions.get('http_cache')
+
+    def test_fresh(self, director):
+        rh = director.handlers['CacheTest']
+        rh.responses['http://test/'] = {'Cache-Control': 'max-age=60'}, b'fresh'
+        assert self._fetch(director, 'http://test/') == (b'fresh', None)
+        assert self._fetch(director, 'http://test/') == (b'fresh', 'hit')
+        assert len(rh.requests) == 1
+
+    def test_revalidate(self, director):
+        rh = director.handlers['CacheTest']
+        rh.responses['http://test/'] = {'ETag': '"1"', 'Content-Type': 'text/plain'}, b'stale'
+        assert self._fetch(director, 'http://test/') == (b'stale', None)
+        assert self._fetch(director, 'http://test/') == (b'stale', 'revalidated')
+        assert rh.requests[1].headers['If-None-Match'] == '"1"'
+
+        res = director.send(Request('http://test/'))
+        assert res.headers['Content-Type'] == 'text/plain'
+        assert res.headers['Content-Length'] == '5'
+        res.close()
+
+        # The stored response is replaced once it has changed
+        rh.responses['http://test/'] = {'ETag': '"2"'}, b'changed'
+        assert self._fetch(director, 'http://test/') == (b'changed', None)
+        assert self._fetch(director, 'http://test/') == (b'changed', 'revalidated')
+
+    def test_not_stored(self, director):
+        rh = director.handlers['CacheTest']
+        rh.responses['http://test/no-store'] = {'ETag': '"1"', 'Cache-Control': 'no-store'}, b'data'
+        rh.responses['http://test/no-validator'] = {}, b'data'
+        rh.responses['http://test/partial'] = {'ETag': '"1"'}, b'data'
+        rh.responses['http://test/large'] = {'ETag': '"1"'}, b'x' * 101
+        for url in ('http://test/no-store', 'http://test/no-validator', 'http://test/large'):
+            assert self._fetch(director, url) == (rh.responses[url][1], None)
+            assert self._fetch(director, url) == (rh.responses[url][1], None)
+
+        # Responses that were not fully read are not stored
+        director.send(Request('http://test/partial')).close()
+        assert self._fetch(director, 'http://test/partial') == (b'data', None)
+
+        # Requests that are not cacheable
+        rh.responses['http://test/'] = {'Cache-Control': 'max-age=60'}, b'data'
+        self._fetch(director, 'http://test/')
+        assert self._fetch(director, 'http://test/', headers={'Range': 'bytes=0-'}) == (b'data', None)
+        assert self._fetch(director, 'http://test/', extensions={'http_cache': False}) == (b'data', None)
+        assert 'http_cache' not in rh.requests[-1].extensions
+        assert self._fetch(director, 'http://test/', headers={'Cache-Control': 'no-cache'})[1] is None
+
+    def test_handler_headers(self, director):
+        rh = director.handlers['CacheTest']
+        rh.responses['http://test/'] = {'Cache-Control': 'max-age=60'}, b'data'
+        rh.headers = HTTPHeaderDict({'Authorization': 'Bearer token'})
+        assert self._fetch(director, 'http://test/') == (b'data', None)
+        assert self._fetch(director, 'http://test/') == (b'data', None)
+        assert not os.listdir(director.cache.directory)
+
+        # Vary is matched against the headers of the handler
+        rh.headers = HTTPHeaderDict({'User-Agent': 'a'})
+        rh.responses['http://test/vary'] = {'Cache-Control': 'max-age=60', 'Vary': 'User-Agent'}, b'data'
+        assert self._fetch(director, 'http://test/vary') == (b'data', None)
+        assert self._fetch(director, 'http://test/vary') == (b'data', 'hit')
+        rh.headers = HTTPHeaderDict({'User-Agent': 'b'})
+        assert self._fetch(director, 'http://test/vary') == (b'data', None)
+
+    def test_cookies(self, director):
+        rh = director.handlers['CacheTest']
+        url = 'http://test.local/'
+        rh.responses[url] = {'Cache-Control': 'max-age=60'}, b'logged out'
+        assert self._fetch(director, url) == (b'logged out', None)
+        assert self._fetch(director, url) == (b'logged out', 'hit')
+
+        # Requests with cookies from the cookiejar are neither served from nor stored in the cache
+        rh.cookiejar.set_cookie(http.cookiejar.Cookie(
+            0, 'session', 'secret', None, False, 'test.local', False, False, '/', True,
+            False, None, False, None, None, {}))
+        rh.responses[url] = {'Cache-Control': 'max-age=60'}, b'logged in'
+        assert self._fetch(director, url) == (b'logged in', None)
+        assert self._fetch(director, url) == (b'logged in', None)
+
+        # Unless enabled, in which case they are only served for the same cookies
+        director.cache.cookies = True
+        assert self._fetch(director, url) == (b'logged in', None)
+        assert self._fetch(director, url) == (b'logged in', 'hit')
+        rh.cookiejar.clear()
+        assert self._fetch(director, url) == (b'logged out', 'hit')
+
+    def test_policies(self, director):
+        rh = director.handlers['CacheTest']
+        director.cache.policies = {'bypass.test': 'bypass', 'revalidate.test': 'revalidate'}
+        rh.responses['http://sub.bypass.test/'] = {'Cache-Control': 'max-age=60'}, b'data'
+        rh.responses['http://revalidate.test/'] = {'Cache-Control': 'max-age=60', 'ETag': '"1"'}, b'data'
+        self._fetch(director, 'http://sub.bypass.test/')
+        assert self._fetch(director, 'http://sub.bypass.test/') == (b'data', None)
+        self._fetch(director, 'http://revalidate.test/')
+        assert self._fetch(director, 'http://revalidate.test/') == (b'data', 'revalidated')
+
+    def test_eviction(self, director):
+        rh = director.handlers['CacheTest']
+        for i in range(5):
+            rh.responses[f'http://test/{i}'] = {'Cache-Control': 'max-age=60'}, b'x' * 100
+            self._fetch(director, f'http://test/{i}')
+            # Ensure distinct access times
+            time.sleep(0.01)
+        assert sum(
+            os.path.getsize(os.path.join(director.cache.directory, name))
+            for name in os.listdir(director.cache.directory)) <= 1000
+        assert self._fetch(director, 'http://test/4')[1] == 'hit'
+        assert self._fetch(director, 'http://test/0')[1] is None
+
+
+class FakeAsyncRH(AsyncRequestHandler):
+    _SUPPORTED_URL_SCHEMES = ('async',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = []
+        self.closed = False
+
+    class Response(AsyncResponse):
+        def __init__(self, url, data):
+            super().__init__(url=url, headers={})
+            self._data = data
+
+        async def _read(self, amt):
+            await asyncio.sleep(0)
+            data, self._data = self._data, b''
+            return data
+
+    async def _send(self, request: Request):
+        self.requests.append(request)
+        await asyncio.sleep(float(request.headers.get('X-Delay', 0)))
+        if request.url.endswith('/unsupported'):
+            raise UnsupportedRequest('unsupported')
+        return self.Response(request.url, b'async')
+
+    async def aclose(self):
+        self.closed = True
+        await super().aclose()
+
+
+class TestAsyncRequestDirector(TestRequestHandlerBase):
+
+    @staticmethod
+    def build_director(*handlers):
+        director = AsyncRequestDirector(logger=FakeLogger())
+        for handler in handlers:
+            director.add_handler(handler)
+        return director
+
+    def test_async_handler(self):
+        async def func():
+            rh = FakeAsyncRH(logger=FakeLogger())
+            async with self.build_director(rh) as director:
+                res = await director.send(Request('async://test', extensions={'hedge': True, 'http_cache': False}))
+                assert await res.read() == b'async'
+                assert rh.requests[0].extensions == {}
+            assert rh.closed
+
+        asyncio.run(func())
+
+    def test_concurrent(self):
+        async def func():
+            async with self.build_director(FakeAsyncRH(logger=FakeLogger())) as director:
+                async def fetch(i):
+                    res = await director.send(Request(f'async://test/{i}', headers={'X-Delay': '0.5'}))
+                    return res.url
+
+                start = time.monotonic()
+                urls = await asyncio.gather(*(fetch(i) for i in range(10)))
+                assert urls == [f'async://test/{i}' for i in range(10)]
+                assert time.monotonic() - start < 2
+
+        asyncio.run(func())
+
+    def test_sync_handler(self):
+        async def func():
+            rh = FakeRH(logger=FakeLogger())
+            async with self.build_director(rh) as director:
+                res = await director.send(Request('http://test'))
+                assert isinstance(res, SyncResponseAdapter)
+                assert res.response.request.url == 'http://test'
+                assert await res.read() == b''
+
+        asyncio.run(func())
+
+    def test_sync_handler_http(self):
+        async def func():
+            async with self.build_director(UrllibRH(logger=FakeLogger())) as director:
+                res = await director.send(Request(f'http://127.0.0.1:{self.http_port}/video.html'))
+                assert res.status == 200
+                assert await res.read(10) == b'<html><vid'
+                assert await res.read() == b'eo src="/vid.mp4" /></html>'
+                assert res.closed
+
+                with pytest.raises(HTTPError) as exc_info:
+                    await director.send(Request(f'http://127.0.0.1:{self.http_port}/gen_404'))
+                assert isinstance(exc_info.value.response, SyncResponseAdapter)
+                assert await exc_info.value.response.read() == b'<html></html>'
+
+        asyncio.run(func())
+
+    def test_preferences(self):
+        async def func():
+            async_rh = FakeAsyncRH(logger=FakeLogger())
+            sync_rh = FakeRH(logger=FakeLogger())
+            async with self.build_director(async_rh, sync_rh) as director:
+                director.preferences.add(lambda rh, _: 100 if rh is async_rh else 0)
+                assert await (await director.send(Request('async://test'))).read() == b'async'
+                director.preferences.add(lambda rh, _: 200 if rh is sync_rh else 0)
+                assert isinstance(await director.send(Request('async://test')), SyncResponseAdapter)
+
+        asyncio.run(func())
+
+    def test_unsupported_fallback(self):
+        async def func():
+            async_rh = FakeAsyncRH(logger=FakeLogger())
+            async with self.build_director(async_rh, FakeRH(logger=FakeLogger())) as director:
+                director.preferences.add(lambda rh, _: 100 if rh is async_rh else 0)
+                res = await director.send(Request('async://test/unsupported'))
+                assert isinstance(res, SyncResponseAdapter)
+                assert len(async_rh.requests) == 1
+
+        asyncio.run(func())
+
+    def test_errors(self):
+        async def func():
+            async with self.build_director(FakeAsyncRH(logger=FakeLogger())) as director:
+                with pytest.raises(NoSupportingHandlers):
+                    await director.send(Request('async://test/unsupported'))
+                with pytest.raises(NoSupportingHandlers):
+                    await director.send(Request('http://test'))
+
+            async with self.build_director() as director:
+                with pytest.raises(RequestError):
+                    await director.send(Request('async://test'))
+
+            async with self.build_director(FakeRH(logger=FakeLogger())) as director:
+                with pytest.raises(SSLError) as exc_info:
+                    await director.send(Request('ssl://something'))
+                assert exc_info.value.handler is director.handlers['Fake']
+
+        asyncio.run(func())
+
+    def test_build_from_ydl(self):
+        async def func():
+            with FakeYDL({'http_headers': {'X-Test': 'test'}}) as ydl:
+                director = ydl.build_async_request_director([FakeAsyncRH])
+                async with director:
+                    rh = director.handlers['FakeAsync']
+                    assert rh.headers['X-Test'] == 'test'
+                    assert rh.cookiejar is ydl.cookiejar
+
+        asyncio.run(func())
+
+
 class TestYoutubeDLNetworking:
 
     @staticmethod
@@ -2107,6 +3056,17 @@ def test_headers(self):
         assert res.headers.get_all('test') == ['test', 'test2']
         assert 'Content-Encoding' in res.headers
 
+    def test_readinto(self):
+        res = Response(io.BytesIO(b'test data'), url='test://', headers={})
+        buffer = bytearray(4)
+        assert res.readinto(buffer) == 4
+        assert buffer == b'test'
+        assert res.readinto(memoryview(buffer)[:2]) == 2
+        assert buffer == b' dst'
+        assert res.readinto(buffer) == 3
+        assert buffer[:3] == b'ata'
+        assert res.readinto(buffer) == 0
+
     def test_get_header(self):
         headers = Message()
         headers.add_header('Set-Cookie', 'cookie1')
@@ -2152,6 +3112,69 @@ def test_close(self):
         assert fp.close.call_count == 1
 
 
+class TestContentDecoder:
+    PAYLOAD = b'<html><video src="/vid.mp4" /></html>'
+
+    @pytest.mark.parametrize('encoding,compress', [
+        ('gzip', gzip.compress),
+        ('deflate', zlib.compress),
+        ('deflate', raw_deflate_compress),
+        pytest.param('br', lambda data: brotli.compress(data), marks=pytest.mark.skipif(
+            not brotli, reason='brotli support is not installed')),
+        pytest.param('zstd', zstd_compress, marks=pytest.mark.skipif(
+            not zstd, reason='zstd support is not installed')),
+    ])
+    def test_decode(self, encoding, compress):
+        data = compress(self.PAYLOAD * 1000)
+        decoder = ContentDecoder(io.BytesIO(data), [encoding])
+        assert decoder.read(10) == self.PAYLOAD[:10]
+        assert decoder.read() == (self.PAYLOAD * 1000)[10:]
+        assert decoder.closed
+        assert decoder.bytes_read == len(data)
+        assert decoder.bytes_decoded == len(self.PAYLOAD) * 1000
+
+    def test_bounded_reads(self):
+        # A highly compressed body should not be read or decoded all at once
+        data = gzip.compress(bytes(64 * 1024 * 1024))
+        decoder = ContentDecoder(io.BytesIO(data), ['gzip'])
+        assert decoder.read(10) == bytes(10)
+        assert decoder.bytes_read <= DECODE_CHUNK_SIZE
+        assert len(decoder._buffer) <= DECODE_CHUNK_SIZE
+
+    def test_multiple_encodings(self):
+        data = zlib.compress(gzip.compress(self.PAYLOAD))
+        decoder = ContentDecoder(io.BytesIO(data), ['gzip', 'deflate'])
+        assert decoder.read() == self.PAYLOAD
+
+    @pytest.mark.skipif(not zstd, reason='zstd support is not installed')
+    def test_zstd_multiple_frames(self):
+        data = zstd_compress(self.PAYLOAD) + zstd_compress(self.PAYLOAD)
+        assert ContentDecoder(io.BytesIO(data), ['zstd']).read() == self.PAYLOAD * 2
+
+    def test_empty(self):
+        assert ContentDecoder(io.BytesIO(b''), ['gzip']).read() == b''
+
+    @pytest.mark.skipif(not zstd, reason='zstd support is not installed')
+    def test_truncated(self):
+        data = zstd_compress(self.PAYLOAD * 1000)
+        with pytest.raises(zstd.ZstdError):
+            ContentDecoder(io.BytesIO(data[:-10]), ['zstd']).read()
+
+    @pytest.mark.parametrize('encoding,compress', [
+        ('gzip', gzip.compress),
+        ('deflate', zlib.compress),
+        ('deflate', raw_deflate_compress),
+    ])
+    def test_truncated_zlib(self, encoding, compress):
+        data = compress(self.PAYLOAD * 1000)
+        with pytest.raises(zlib.error):
+            ContentDecoder(io.BytesIO(data[:-20]), [encoding]).read()
+        decoder = ContentDecoder(io.BytesIO(data[:-20]), [encoding])
+        with pytest.raises(zlib.error):
+            while decoder.read(1024):
+                pass
+
+
 class TestImpersonateTarget:
     @pytest.mark.parametrize('target_str,expected', [
         ('abc', ImpersonateTarget('abc', None, None, None)),
@@ -10,14 +10,20 @@
 
 import io
 import random
+import socket
 import ssl
+import threading
+import time
 
 from yt_dlp.cookies import YoutubeDLCookieJar
 from yt_dlp.dependencies import certifi
 from yt_dlp.networking import Response
+from yt_dlp.networking import _helper
 from yt_dlp.networking._helper import (
     InstanceStoreMixin,
     add_accept_encoding_header,
+    cached_getaddrinfo,
+    create_connection,
     get_redirect_method,
     make_socks_proxy_opts,
     ssl_load_certs,
@@ -132,6 +138,87 @@ def test_add_accept_encoding_header(self, headers, supported_encodings, expected
         assert headers == HTTPHeaderDict(expected)
 
 
+class TestCreateConnection:
+    IPV4 = (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 80))
+    IPV4_2 = (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.2', 80))
+    IPV6 = (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::1', 80, 0, 0))
+    IPV6_2 = (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::2', 80, 0, 0))
+
+    @pytest.fixture(autouse=True)
+    def getaddrinfo(self, monkeypatch):
+        calls = []
+
+        def getaddrinfo(host, port, *args):
+            calls.append((host, port))
+            return [self.IPV6, self.IPV4, self.IPV6_2, self.IPV4_2]
+
+        monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+        monkeypatch.setattr(_helper, '_dns_cache', _helper._dns_cache.__class__())
+        return calls
+
+    def test_dns_cache(self, getaddrinfo, monkeypatch):
+        assert cached_getaddrinfo('example.com', 80) == [self.IPV6, self.IPV4, self.IPV6_2, self.IPV4_2]
+        cached_getaddrinfo('example.com', 80)
+        assert getaddrinfo == [('example.com', 80)]
+        cached_getaddrinfo('example.com', 443)
+        assert getaddrinfo == [('example.com', 80), ('example.com', 443)]
+
+        monkeypatch.setattr(_helper, 'DNS_CACHE_TTL', 0)
+        cached_getaddrinfo('example.net', 80)
+        cached_getaddrinfo('example.net', 80)
+        assert getaddrinfo[2:] == [('example.net', 80), ('example.net', 80)]
+
+    def test_interleaved_attempts(self, getaddrinfo, monkeypatch):
+        monkeypatch.setattr(_helper, 'CONNECTION_ATTEMPT_DELAY', 0)
+        attempts = []
+
+        def create_socket(ip_addr, timeout, source_address):
+            attempts.append(ip_addr)
+            raise OSError(f'unreachable: {ip_addr[4][0]}')
+
+        with pytest.raises(OSError, match='unreachable'):
+            create_connection(('example.com', 80), _create_socket_func=create_socket)
+        assert attempts == [self.IPV6, self.IPV4, self.IPV6_2, self.IPV4_2]
+        # The addresses are resolved again after the connection has failed
+        create_connection(('example.com', 80), _create_socket_func=lambda *_: 'sock')
+        assert len(getaddrinfo) == 2
+
+        attempts.clear()
+        with pytest.raises(OSError, match='unreachable'):
+            create_connection(('example.com', 80), source_address=('0.0.0.0', 0), _create_socket_func=create_socket)
+        assert attempts == [self.IPV4, self.IPV4_2]
+
+    def test_unreachable_address(self, monkeypatch):
+        monkeypatch.setattr(_helper, 'CONNECTION_ATTEMPT_DELAY', 0.05)
+        unblock = threading.Event()
+        closed = []
+
+        class FakeSocket:
+            def __init__(self, ip_addr):
+                self.ip_addr = ip_addr
+
+            def close(self):
+                closed.append(self.ip_addr)
+
+        def create_socket(ip_addr, timeout, source_address):
+            if ip_addr[0] == socket.AF_INET6:
+                # Black-holed until the IPv4 connection has been made
+                unblock.wait()
+            return FakeSocket(ip_addr)
+
+        start = time.monotonic()
+        sock = create_connection(('example.com', 80), timeout=10, _create_socket_func=create_socket)
+        assert sock.ip_addr == self.IPV4
+        assert time.monotonic() - start < 1
+        unblock.set()
+        # The socket of an attempt that connects later is closed
+        for _ in range(100):
+            if closed:
+                break
+            time.sleep(0.01)
+        assert closed == [self.IPV6]
+
+
 class TestInstanceStoreMixin:
 
     class FakeInstanceStoreMixin(InstanceStoreMixin):
@@ -166,6 +253,37 @@ def test_mixin(self):
         mixin._clear_instances()
         assert mixin._get_instance(t=1234) != m
 
+        class Unhashable:
+            __hash__ = None
+
+            def __init__(self, value):
+                self.value = value
+
+            def __eq__(self, other):
+                return self.value == other.value
+
+        assert mixin._get_instance(u=Unhashable(1)) == mixin._get_instance(u=Unhashable(1))
+        assert mixin._get_instance(u=Unhashable(1)) != mixin._get_instance(u=Unhashable(2))
+
+    def test_mixin_eviction(self, monkeypatch):
+        evicted = []
+        mixin = self.FakeInstanceStoreMixin()
+        monkeypatch.setattr(mixin, '_MAX_INSTANCES', 2)
+        monkeypatch.setattr(mixin, '_close_instance', evicted.append)
+
+        a, b = mixin._get_instance(t=1), mixin._get_instance(t=2)
+        assert mixin._get_instance(t=1) == a
+        c = mixin._get_instance(t=3)
+        # The least recently used instance is evicted
+        assert evicted == [b]
+        assert mixin._get_instance(t=1) == a
+        assert mixin._get_instance(t=3) == c
+
+        monkeypatch.setattr(mixin, '_INSTANCE_IDLE_TIMEOUT', 0)
+        d = mixin._get_instance(t=4)
+        assert evicted == [b, a, c]
+        assert mixin._get_instance(t=4) == d
+
 
 class TestNetworkingExceptions:
 
@@ -1,7 +1,9 @@
+import dataclasses
 import importlib
 import os
 import shutil
 import sys
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -22,6 +24,7 @@
 from yt_dlp.globals import (
     extractors,
     postprocessors,
+    plugin_cache_dir,
     plugin_dirs,
     plugin_ies,
     plugin_pps,
@@ -49,6 +52,7 @@ def reset_plugins():
     plugin_ies.value = {}
     plugin_pps.value = {}
     plugin_dirs.value = ['default']
+    plugin_cache_dir.value = None
     plugin_specs.value = {}
     all_plugins_loaded.value = False
     # Clearing override plugins is probably difficult
@@ -233,6 +237,37 @@ def test_append_plugin_dirs(self):
         self.assertIn(f'{PACKAGE_NAME}.extractor.package', sys.modules.keys())
         self.assertIn('PackagePluginIE', plugin_ies.value)
 
+    def test_plugin_manifest(self):
+        plugin_spec = dataclasses.replace(EXTRACTOR_PLUGIN_SPEC, class_info=lambda ie: ie._VALID_URL)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            plugin_cache_dir.value = cache_dir
+            plugins_ie = load_plugins(plugin_spec)
+            self.assertIn('NormalPluginIE', plugins_ie.keys())
+            self.assertIn(f'{PACKAGE_NAME}.extractor.normal', sys.modules.keys())
+            self.assertTrue(os.path.exists(os.path.join(cache_dir, 'extractor.json')))
+            scanned_classes = list(plugins_ie.keys())
+
+            # Unchanged plugins are registered from the manifest
+            reset_plugins()
+            plugin_cache_dir.value = cache_dir
+            plugins_ie = load_plugins(plugin_spec)
+            self.assertEqual(list(plugins_ie.keys()), scanned_classes)
+            self.assertIn('InAllPluginIE', plugin_ies.value)
+            self.assertEqual(plugins_ie.info('NormalPluginIE'), 'normalpluginie')
+            # Override plugins are imported, the other modules only when their classes are accessed
+            self.assertIn(f'{PACKAGE_NAME}.extractor.override', sys.modules.keys())
+            self.assertNotIn(f'{PACKAGE_NAME}.extractor.normal', sys.modules.keys())
+            self.assertEqual(extractors.value['NormalPluginIE'].__module__, f'{PACKAGE_NAME}.extractor.normal')
+            self.assertIn(f'{PACKAGE_NAME}.extractor.normal', sys.modules.keys())
+
+            # Changed plugin locations are scanned again
+            reset_plugins()
+            plugin_cache_dir.value = cache_dir
+            plugin_dirs.value.append(str(TEST_DATA_DIR / 'plugin_packages'))
+            plugins_ie = load_plugins(plugin_spec)
+            self.assertIn('PackagePluginIE', plugins_ie.keys())
+            self.assertIn(f'{PACKAGE_NAME}.extractor.normal', sys.modules.keys())
+
     def test_get_plugin_spec(self):
         register_plugin_spec(EXTRACTOR_PLUGIN_SPEC)
         register_plugin_spec(POSTPROCESSOR_PLUGIN_SPEC)
@@ -26,6 +26,7 @@
 )
 from yt_dlp.utils import (
     Config,
+    CopyOnWriteDict,
     DateRange,
     ExtractorError,
     InAdvancePagedList,
@@ -134,7 +135,9 @@
     xpath_text,
     xpath_with_ns,
 )
-from yt_dlp.utils._utils import _UnsafeExtensionError
+from yt_dlp.utils import _profiling
+from yt_dlp.utils._profiling import Profiler, register_counters
+from yt_dlp.utils._utils import _HTMLTagIndex, _UnsafeExtensionError
 from yt_dlp.utils.networking import (
     HTTPHeaderDict,
     escape_rfc3986,
@@ -1296,6 +1299,12 @@ def test_js_to_json_edgecases(self):
         on = js_to_json('[0.077, 7.06, 29.064, 169.0072]')
         self.assertEqual(json.loads(on), [0.077, 7.06, 29.064, 169.0072])
 
+    def test_js_to_json_unchanged_tokens(self):
+        self.assertEqual(js_to_json('{"a": [1, 0, 2.5e10, true, null], "b": "c\\"d"}'), '{"a": [1, 0, 2.5e10, true, null], "b": "c\\"d"}')
+        self.assertEqual(js_to_json('{"a": "\\x41\\\'", 10: 0x10, "b": 010,}'), '{"a": "\\u0041\'", "10": 16, "b": 8}')
+        self.assertEqual(js_to_json('{"a": 1 / 2, "b": nullish, "c": true1}'), '{"a": 1 / 2, "b": "nullish", "c": "true1"}')
+        self.assertEqual(js_to_json('[1, 2 /* x */, 3 // y\n]'), '[1, 2 , 3 ]')
+
     def test_js_to_json_malformed(self):
         self.assertEqual(js_to_json('42a1'), '42"a1"')
         self.assertEqual(js_to_json('42a-1'), '42"a"-1')
@@ -1601,6 +1610,10 @@ def test_match_str(self):
         self.assertTrue(match_str('!x', {'id': 'foo'}, True))
         self.assertFalse(match_str('x', {'id': 'foo'}, False))
 
+        # Parts after a failing condition are not compiled
+        self.assertFalse(match_str('x & @invalid', {}))
+        self.assertRaises(ValueError, match_str, 'x & @invalid', {'x': 1})
+
     def test_parse_dfxp_time_expr(self):
         self.assertEqual(parse_dfxp_time_expr(None), None)
         self.assertEqual(parse_dfxp_time_expr(''), None)
@@ -1897,6 +1910,30 @@ def test_get_elements_text_and_html_by_attribute(self):
         self.assertEqual(list(get_elements_text_and_html_by_attribute(
             'class', 'foo', '<a class="foo">nice</a><span class="foo">nice</span>', tag='a')), [('nice', '<a class="foo">nice</a>')])
 
+    def test_get_elements_by_attribute_indexed(self):
+        html = ''.join((
+            '<p title="a id=y" id=x>x</p>',
+            *(f'<div class="item i{i}" id=el{i}><span data-n="{i}">{i}</span></div>' for i in range(1000)),
+            '<b id=el1x>y</b>',
+        ))
+        self.assertGreater(len(html), _HTMLTagIndex.MIN_SIZE)
+
+        def lookups():
+            return [
+                get_element_by_attribute('id', 'el999', html), get_element_html_by_attribute('data-n', '5', html),
+                get_element_by_attribute('id', 'el1', html), get_element_by_attribute('id', 'x', html),
+                get_elements_by_class('i42', html), len(get_elements_html_by_class('item', html)),
+                get_elements_by_attribute('id', r'el1\d', html, escape_value=False),
+                get_elements_by_attribute('data-n', '5', html, tag='div'),
+            ]
+
+        indexed = lookups()
+        self.assertEqual(lookups(), indexed)
+        with unittest.mock.patch.object(_HTMLTagIndex, 'MIN_SIZE', len(html) + 1):
+            self.assertEqual(lookups(), indexed)
+        self.assertEqual(indexed[:4], [
+            '<span data-n="999">999</span>', '<span data-n="5">5</span>', '<span data-n="1">1</span>', 'x'])
+
     GET_ELEMENT_BY_TAG_TEST_STRING = '''
     random text lorem ipsum</p>
     <div>
@@ -2002,6 +2039,48 @@ def test(ll, idx, val, cache):
         ll = reversed(ll)
         test(ll, -15, 14, range(15))
 
+    def test_CopyOnWriteDict(self):
+        formats = [{'format_id': '1'}]
+        base = {'id': 'x', 'formats': formats, '__hidden': 1}
+        cow = CopyOnWriteDict(base, hidden=('__hidden', '__missing'))
+        self.assertEqual(dict(cow), {'id': 'x', 'formats': formats})
+        self.assertIs(cow['formats'], formats)
+        self.assertNotIn('__hidden', cow)
+        self.assertIsNone(cow.get('__hidden'))
+
+        cow['id'] = 'y'
+        cow['title'] = 't'
+        del cow['formats']
+        self.assertEqual(dict(cow), {'id': 'y', 'title': 't'})
+        self.assertEqual(len(cow), 2)
+        self.assertRaises(KeyError, cow.__delitem__, 'formats')
+        self.assertEqual(base, {'id': 'x', 'formats': formats, '__hidden': 1})
+
+        cow_copy = cow.copy()
+        cow_copy['formats'] = []
+        self.assertNotIn('formats', cow)
+        self.assertEqual(cow_copy['formats'], [])
+        self.assertEqual(repr(cow), repr({'id': 'y', 'title': 't'}))
+
+    def test_Profiler(self):
+        profiler = Profiler()
+        register_counters('test', lambda: {'hits': 1})
+        self.addCleanup(_profiling._counters.pop, 'test')
+        profiler.add(('main', ), 3.0, 2.0)
+        profiler.add(('main', 'extract'), 1.0, 0.5)
+        profiler.add(('main', 'extract', 'extract'), 0.5, 0.25)
+        profiler.add(('main', 'download'), 1.5, 0.5, calls=2)
+        with profiler.phase('main'):
+            pass
+
+        report = profiler.report()
+        self.assertEqual(report['phases']['main']['calls'], 2)
+        self.assertEqual(report['phases']['extract'], {'calls': 1, 'wall': 1.0, 'cpu': 0.5})
+        self.assertEqual(report['phases']['download'], {'calls': 2, 'wall': 1.5, 'cpu': 0.5})
+        self.assertEqual(report['counters']['test'], {'hits': 1})
+        self.assertEqual(profiler.folded_stacks().splitlines()[1:], [
+            'main;download 1500000', 'main;extract 500000', 'main;extract;extract 500000'])
+
     def test_format_bytes(self):
         self.assertEqual(format_bytes(0), '0.00B')
         self.assertEqual(format_bytes(1000), '1000.00B')
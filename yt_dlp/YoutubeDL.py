@@ -19,24 +19,25 @@
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import tokenize
 import traceback
 import unicodedata
 
-from .cache import Cache
+from .cache import Cache, get_cache_root
 from .compat import urllib  # isort: split
 from .compat import urllib_req_to_req
 from .cookies import CookieLoadError, LenientSimpleCookie, load_cookies
-from .downloader import FFmpegFD, get_suitable_downloader, shorten_protocol_name
-from .downloader.rtmp import rtmpdump_version
-from .extractor import gen_extractor_classes, get_info_extractor, import_extractors
+from .downloader import get_suitable_downloader, shorten_protocol_name
+from .extractor import get_info_extractor, import_extractors
+from .extractor._dispatch import ExtractorDict, ExtractorIndex, extractor_info
 from .extractor.common import UnsupportedURLIE
-from .extractor.openload import PhantomJSwrapper
 from .globals import (
     IN_CLI,
     LAZY_EXTRACTORS,
     WINDOWS_VT_MODE,
+    extractors,
     plugin_ies,
     plugin_ies_overrides,
     plugin_pps,
@@ -45,8 +46,9 @@
     supported_js_runtimes,
     supported_remote_components,
 )
+from .journal import JobJournal
 from .minicurses import format_text
-from .networking import HEADRequest, Request, RequestDirector
+from .networking import HEADRequest, Request, RequestDirector, _load_request_handlers
 from .networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
 from .networking.exceptions import (
     HTTPError,
@@ -55,6 +57,7 @@
     SSLError,
     network_exceptions,
 )
+from .networking.http_cache import HTTPCache
 from .networking.impersonate import ImpersonateRequestHandler, ImpersonateTarget
 from .plugins import directories as plugin_directories, load_all_plugins
 from .postprocessor import (
@@ -92,6 +95,7 @@
     STR_FORMAT_RE_TMPL,
     STR_FORMAT_TYPES,
     ContentTooShortError,
+    CopyOnWriteDict,
     DateRange,
     DownloadCancelled,
     DownloadError,
@@ -170,6 +174,7 @@
     write_json_file,
     write_string,
 )
+from .utils._profiling import profile_phase
 from .utils._utils import _UnsafeExtensionError, _YDLLogger, _ProgressState
 from .utils.networking import (
     HTTPHeaderDict,
@@ -197,6 +202,44 @@ def wrapper(self, *args, **kwargs):
     return wrapper
 
 
+def _synchronized_cached_property(func):
+    """cached_property that is computed only once, even when it is first accessed from several threads"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self):
+        with self._lock:
+            if name in self.__dict__:
+                return self.__dict__[name]
+            return func(self)
+
+    return functools.cached_property(wrapper)
+
+
+class _CallState:
+    """The state of the calls made to a YoutubeDL object, which is kept per thread in thread-safe mode"""
+
+    def __init__(self, params, format_selector=None):
+        self.params = params
+        self.format_selector = format_selector
+        self.cookiejar_override = None
+        self.ies_instances = {}
+        self.download_retcode = 0
+        self.num_downloads = 0
+        self.num_videos = 0
+        self.playlist_level = 0
+        self.playlist_urls = set()
+
+    def for_thread(self):
+        return _CallState(self.params, self.format_selector)
+
+    @staticmethod
+    def attribute(name):
+        return property(
+            lambda ydl: getattr(ydl._call_state, name),
+            lambda ydl, value: setattr(ydl._call_state, name, value))
+
+
 class YoutubeDL:
     """YoutubeDL class.
 
@@ -329,6 +372,12 @@ class YoutubeDL:
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    http_cache:        Whether to cache HTTP responses in the filesystem cache,
+                       revalidating them with conditional requests.
+                       Media downloads are not cached
+    http_cache_max_size: Maximum size of the HTTP cache in bytes
+    http_cache_policies: A dictionary of hostname to HTTP cache policy for the
+                       host and its subdomains. See networking.http_cache.HTTPCache
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -345,8 +394,15 @@ class YoutubeDL:
                        Videos already present in the file are not downloaded again.
     break_on_existing: Stop the download process after attempting to download a
                        file that is in the archive.
+    resume_job:        Name of a journal file recording the progress of the run.
+                       If it exists, URLs, playlist entries and videos that were
+                       completed by a previous run with this file are skipped
     break_per_url:     Whether break_on_reject and break_on_existing
                        should act on each input URL as opposed to for the entire queue
+    thread_safe:       Allow the object to be used from several threads at once (API only).
+                       Each thread gets its own extractor instances, params_overlay,
+                       download counters (eg: for max_downloads) and return code,
+                       while the request handlers, cookies and cache are shared
     cookiefile:        File name or text stream from where cookies should be read and dumped to
     cookiesfrombrowser:  A tuple containing the name of the browser, the profile
                        name/path from where cookies are loaded, the name of the keyring,
@@ -367,6 +423,9 @@ class YoutubeDL:
     geo_verification_proxy:  URL of the proxy to use for IP address verification
                        on geo-restricted sites.
     socket_timeout:    Time to wait for unresponsive hosts, in seconds
+    hedge_delay:       Seconds to wait for a response to latency-sensitive requests
+                       (such as YouTube API calls) before sending a duplicate request,
+                       or "auto" to use recent latencies. None to disable (default)
     bidi_workaround:   Work around buggy terminals without bidirectional text
                        support, using fridibi
     debug_printtraffic:Print out sent and received HTTP traffic
@@ -626,6 +685,29 @@ class YoutubeDL:
         'video': {*MEDIA_EXTENSIONS.common_video, '3gp'},
         'storyboards': set(MEDIA_EXTENSIONS.storyboards),
     }
+    # These are consumed when the object (or its request handlers and extractors)
+    # is set up, and so cannot be changed with params_overlay
+    _init_only_params = {
+        'allowed_extractors', 'bidi_workaround', 'color', 'no_color', 'compat_opts', 'logger', 'logtostderr',
+        'download_archive', 'resume_job', 'http_headers', 'js_runtimes', 'remote_components',
+        'postprocessors', 'post_hooks', 'progress_hooks', 'postprocessor_hooks',
+        'username', 'password', 'usenetrc', 'netrc_location', 'netrc_cmd',
+        'proxy', 'source_address', 'socket_timeout', 'nocheckcertificate', 'legacyserverconnect',
+        'debug_printtraffic', 'enable_file_urls', 'impersonate',
+        'http_cache', 'http_cache_max_size', 'http_cache_policies', 'hedge_delay',
+        'client_certificate', 'client_certificate_key', 'client_certificate_password',
+        'thread_safe',
+    }
+
+    # Per-call state; see _CallState
+    params = _CallState.attribute('params')
+    format_selector = _CallState.attribute('format_selector')
+    _cookiejar_override = _CallState.attribute('cookiejar_override')
+    _download_retcode = _CallState.attribute('download_retcode')
+    _num_downloads = _CallState.attribute('num_downloads')
+    _num_videos = _CallState.attribute('num_videos')
+    _playlist_level = _CallState.attribute('playlist_level')
+    _playlist_urls = _CallState.attribute('playlist_urls')
 
     def __init__(self, params=None, auto_init=True):
         """Create a FileDownloader object with the given options.
@@ -634,9 +716,12 @@ def __init__(self, params=None, auto_init=True):
         """
         if params is None:
             params = {}
-        self.params = params
-        self._ies = {}
+        self._lock = threading.RLock()
+        self._thread_call_states = None
+        self._shared_call_state = _CallState(params)
+        self._ies = ExtractorDict()
         self._ies_instances = {}
+        self._ie_index = None
         self._pps = {k: [] for k in POSTPROCESS_WHEN}
         self._printed_messages = set()
         self._first_webpage_request = True
@@ -644,11 +729,6 @@ def __init__(self, params=None, auto_init=True):
         self._close_hooks = []
         self._progress_hooks = []
         self._postprocessor_hooks = []
-        self._download_retcode = 0
-        self._num_downloads = 0
-        self._num_videos = 0
-        self._playlist_level = 0
-        self._playlist_urls = set()
         self.cache = Cache(self)
         self.__header_cookies = []
 
@@ -810,10 +890,7 @@ def check_deprecated(param, option, suggestion):
         self._parse_outtmpl()
 
         # Creating format selector here allows us to catch syntax errors before the extraction
-        self.format_selector = (
-            self.params.get('format') if self.params.get('format') in (None, '-')
-            else self.params['format'] if callable(self.params['format'])
-            else self.build_format_selector(self.params['format']))
+        self.format_selector = self._build_format_selector_from_params()
 
         hooks = {
             'post_hooks': self.add_post_hook,
@@ -856,6 +933,24 @@ def preload_download_archive(fn):
 
         self.archive = preload_download_archive(self.params.get('download_archive'))
 
+        if self.params.get('thread_safe'):
+            self._thread_call_states = threading.local()
+
+    @property
+    def _call_state(self):
+        if self._thread_call_states is None:
+            return self._shared_call_state
+        try:
+            return self._thread_call_states.state
+        except AttributeError:
+            state = self._thread_call_states.state = self._shared_call_state.for_thread()
+            return state
+
+    @_synchronized_cached_property
+    def _journal(self):
+        journal_fn = self.params.get('resume_job')
+        return JobJournal(self, journal_fn) if journal_fn else None
+
     def _clean_js_runtimes(self, runtimes):
         if not (
             isinstance(runtimes, dict)
@@ -905,6 +1000,7 @@ def add_info_extractor(self, ie):
         """Add an InfoExtractor object to the end of the list."""
         ie_key = ie.ie_key()
         self._ies[ie_key] = ie
+        self._ie_index = None
         if not isinstance(ie, type):
             self._ies_instances[ie_key] = ie
             ie.set_downloader(self)
@@ -916,27 +1012,45 @@ def get_info_extractor(self, ie_key):
         it to the extractor list.
         """
         ie = self._ies_instances.get(ie_key)
+        if ie is None and self._thread_call_states is not None:
+            ie = self._call_state.ies_instances.get(ie_key)
         if ie is None:
             ie = get_info_extractor(ie_key)()
-            self.add_info_extractor(ie)
+            if self._thread_call_states is None:
+                self.add_info_extractor(ie)
+            else:
+                # Extractors keep state during extraction, so each thread gets its own instances
+                ie.set_downloader(self)
+                self._call_state.ies_instances[ie_key] = ie
         return ie
 
     def add_default_info_extractors(self):
         """
         Add the InfoExtractors returned by gen_extractors to the end of the list
         """
-        all_ies = {ie.IE_NAME.lower(): ie for ie in gen_extractor_classes()}
-        all_ies['end'] = UnsupportedURLIE()
+        import_extractors()
+        # The lazy extractors are only created when they are used
+        lookup = extractors.value
+        all_ies = {}
+        for name in lookup:
+            info = extractor_info(lookup, name)
+            all_ies[info['IE_NAME'].lower()] = (name, info)
+        all_ies['end'] = (None, {'_ENABLED': True})
         try:
             ie_names = orderedSet_from_options(
                 self.params.get('allowed_extractors', ['default']), {
                     'all': list(all_ies),
-                    'default': [name for name, ie in all_ies.items() if ie._ENABLED],
+                    'default': [ie_name for ie_name, (_, info) in all_ies.items() if info['_ENABLED']],
                 }, use_regex=True)
         except re.error as e:
             raise ValueError(f'Wrong regex for allowed_extractors: {e.pattern}')
-        for name in ie_names:
-            self.add_info_extractor(all_ies[name])
+        for ie_name in ie_names:
+            name, info = all_ies[ie_name]
+            if name is None:
+                self.add_info_extractor(UnsupportedURLIE())
+            else:
+                self._ies.add_from_lookup(info['ie_key'], lookup, name)
+        self._ie_index = None
         self.write_debug(f'Loaded {len(ie_names)} extractors')
 
     def add_post_processor(self, pp, when='post_process'):
@@ -983,7 +1097,8 @@ def _write_string(self, message, out=None, only_once=False):
             if message in self._printed_messages:
                 return
             self._printed_messages.add(message)
-        write_string(message, out=out, encoding=self.params.get('encoding'))
+        with self._lock:
+            write_string(message, out=out, encoding=self.params.get('encoding'))
 
     def to_stdout(self, message, skip_eol=False, quiet=None):
         """Print message to stdout"""
@@ -1047,6 +1162,49 @@ def __enter__(self):
         self.to_console_title(progress_state=_ProgressState.INDETERMINATE)
         return self
 
+    def _build_format_selector_from_params(self):
+        format_spec = self.params.get('format')
+        return (
+            format_spec if format_spec in (None, '-') or callable(format_spec)
+            else self.build_format_selector(format_spec))
+
+    @contextlib.contextmanager
+    def params_overlay(self, params):
+        """Temporarily apply per-call options on top of the existing params
+
+        This allows a single long-lived object to be reused for many independent calls,
+        sharing its extractor instances, request handlers and cache. Eg:
+
+            with ydl.params_overlay({'format': 'bestaudio', 'cookiefile': 'user1.txt'}):
+                info = ydl.extract_info(url, download=False)
+
+        Changes made to the params while the overlay is active are discarded on exit.
+        If "cookiefile"/"cookiesfrombrowser" are given, a separate cookiejar is used
+        for the requests made within the overlay. The options that are only read when
+        the object is created (see _init_only_params) cannot be overlaid.
+        Overlays can be nested. In thread-safe mode, they only apply to the current thread.
+        """
+        invalid = sorted(self._init_only_params.intersection(params))
+        if invalid:
+            raise ValueError(f'These params cannot be changed after initialization: {", ".join(invalid)}')
+
+        old_params, old_format_selector = self.params, self.format_selector
+        old_cookiejar_override = self._cookiejar_override
+        self.params = collections.ChainMap(dict(params), old_params)
+        try:
+            if 'outtmpl' in params or 'restrictfilenames' in params:
+                self._parse_outtmpl()
+            if 'format' in params:
+                self.format_selector = self._build_format_selector_from_params()
+            if params.keys() & {'cookiefile', 'cookiesfrombrowser'}:
+                self._cookiejar_override = self._load_cookiejar()
+            yield self
+        finally:
+            if self._cookiejar_override is not old_cookiejar_override:
+                self.save_cookies()
+            self.params, self.format_selector = old_params, old_format_selector
+            self._cookiejar_override = old_cookiejar_override
+
     def save_cookies(self):
         if self.params.get('cookiefile') is not None:
             self.cookiejar.save()
@@ -1058,9 +1216,13 @@ def __exit__(self, *args):
 
     def close(self):
         self.save_cookies()
-        if '_request_director' in self.__dict__:
-            self._request_director.close()
-            del self._request_director
+        with self._lock:
+            director = self.__dict__.pop('_request_director', None)
+            journal = self.__dict__.pop('_journal', None)
+        if director is not None:
+            director.close()
+        if journal is not None:
+            journal.close()
 
         for close_hook in self._close_hooks:
             close_hook()
@@ -1234,6 +1396,7 @@ def _outtmpl_expandpath(outtmpl):
         return expand_path(outtmpl).replace(sep, '')
 
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def escape_outtmpl(outtmpl):
         """ Escape any remaining strings like %s, %abc% etc. """
         return re.sub(
@@ -1255,38 +1418,26 @@ def validate_outtmpl(cls, outtmpl):
             return err
 
     @staticmethod
-    def _copy_infodict(info_dict):
+    def _copy_infodict(info_dict, *, copy_on_write=False):
+        """ Copy the info_dict, dropping internal keys
+        @param copy_on_write  Return a CopyOnWriteDict sharing the original's data.
+                              Only for short-lived internal use, since it is not a dict
+        """
+        if copy_on_write:
+            return CopyOnWriteDict(info_dict, hidden=('__postprocessors', '__pending_error'))
         info_dict = dict(info_dict)
         info_dict.pop('__postprocessors', None)
         info_dict.pop('__pending_error', None)
         return info_dict
 
-    def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False, *, _exec=False):
-        """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
-        @param sanitize    Whether to sanitize the output as a filename
-        """
-
-        info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
-
-        info_dict = self._copy_infodict(info_dict)
-        info_dict['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
-            formatSeconds(info_dict['duration'], '-' if sanitize else ':')
-            if info_dict.get('duration', None) is not None
-            else None)
-        info_dict['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
-        info_dict['video_autonumber'] = self._num_videos
-        if info_dict.get('resolution') is None:
-            info_dict['resolution'] = self.format_resolution(info_dict, default=None)
-
-        # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
-        # of %(field)s to %(field)0Nd for backward compatibility
-        field_size_compat_map = {
-            'playlist_index': number_of_digits(info_dict.get('__last_playlist_index') or 0),
-            'playlist_autonumber': number_of_digits(info_dict.get('n_entries') or 0),
-            'autonumber': self.params.get('autonumber_size') or 5,
-        }
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _compile_outtmpl(outtmpl):
+        """ Parse an output template into a sequence that can be evaluated repeatedly by prepare_outtmpl
 
-        TMPL_DICT = {}
+        Literal text is kept as `str`. Each field is a `dict` holding its format
+        and the chain of alternate fields, with the traversal paths precomputed
+        """
         EXTERNAL_FORMAT_RE = re.compile(STR_FORMAT_RE_TMPL.format('[^)]*', f'[{STR_FORMAT_TYPES}ljhqBUDS]'))
         MATH_FUNCTIONS = {
             '+': float.__add__,
@@ -1312,9 +1463,6 @@ def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False, *, _exec=False):
                 (?:&(?P<replacement>.*?))?
                 (?:\|(?P<default>.*?))?
             )$''')
-        SAFE_EXEC_CONVERSIONS = 'difq'
-        UNSAFE_DEFAULT_CHARS = '"\' \n\t;&|^$%*<>{}()[]`#\\'
-        EXEC_ADVISORY_MSG = 'See  https://github.com/yt-dlp/yt-dlp/security/advisories/GHSA-69qj-pvh9-c5wg  for details'
 
         def _from_user_input(field):
             if field == ':':
@@ -1325,7 +1473,7 @@ def _from_user_input(field):
                 return int(field)
             return field
 
-        def _traverse_infodict(fields):
+        def _field_path(fields):
             fields = [f for x in re.split(r'\.({.+?})\.?', fields)
                       for f in ([x] if x.startswith('{') else x.split('.'))]
             for i in (0, -1):
@@ -1339,41 +1487,118 @@ def _traverse_infodict(fields):
                 assert f.endswith('}'), f'No closing brace for {f} in {fields}'
                 fields[i] = {k: list(map(_from_user_input, k.split('.'))) for k in f[1:-1].split(',')}
 
-            return traverse_obj(info_dict, fields, traverse_string=True)
+            return fields
+
+        def _parse_maths(offset_key):
+            maths, operator = [], None
+            while offset_key:
+                item = re.match(MATH_FIELD_RE if operator else MATH_OPERATORS_RE, offset_key).group(0)
+                if not item:
+                    break
+                offset_key = offset_key[len(item):]
+                if operator is None:
+                    operator = MATH_FUNCTIONS[item]
+                    continue
+                item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
+                offset = float_or_none(item)
+                maths.append((operator, multiplier, offset, _field_path(item) if offset is None else None))
+                operator = None
+            return maths
 
-        def get_value(mdict):
+        def _parse_fields(key):
+            mobj = re.match(INTERNAL_FORMAT_RE, key)
+            while mobj:
+                mobj = mobj.groupdict()
+                path = _field_path(mobj['fields'])
+                yield {
+                    'fields': mobj['fields'],
+                    'path': path,
+                    # Top-level keys (the vast majority of fields) can skip traverse_obj
+                    'simple_key': path[0] if len(path) == 1 and isinstance(path[0], str) else None,
+                    'negate': bool(mobj['negate']),
+                    'maths': _parse_maths(mobj['maths']),
+                    'strf_format': mobj['strf_format'] and mobj['strf_format'].replace('\\,', ','),
+                    'replacement': mobj['replacement'],
+                    'default': mobj['default'],
+                }
+                mobj = mobj['alternate'] and re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
+
+        compiled, last_end = [], 0
+        for mobj in EXTERNAL_FORMAT_RE.finditer(outtmpl):
+            literal = outtmpl[last_end:mobj.start()]
+            last_end = mobj.end()
+            if not mobj.group('has_key'):
+                compiled.append(literal + mobj.group(0))
+                continue
+            if literal:
+                compiled.append(literal)
+            key = mobj.group('key')
+            compiled.append({
+                'key': '{}\0{}'.format(key.replace('%', '%\0'), mobj.group('format')),
+                'prefix': mobj.group('prefix'),
+                'format': mobj.group('format'),
+                'conversion': mobj.group('conversion') or '',
+                'fields': tuple(_parse_fields(key)),
+            })
+        compiled.append(outtmpl[last_end:])
+        return tuple(compiled)
+
+    def prepare_outtmpl(self, outtmpl, info_dict, sanitize=False, *, _exec=False):
+        """ Make the outtmpl and info_dict suitable for substitution: ydl.escape_outtmpl(outtmpl) % info_dict
+        @param sanitize    Whether to sanitize the output as a filename
+        """
+
+        info_dict.setdefault('epoch', int(time.time()))  # keep epoch consistent once set
+
+        info_dict = self._copy_infodict(info_dict, copy_on_write=True)
+        info_dict['duration_string'] = (  # %(duration>%H-%M-%S)s is wrong if duration > 24hrs
+            formatSeconds(info_dict['duration'], '-' if sanitize else ':')
+            if info_dict.get('duration', None) is not None
+            else None)
+        info_dict['autonumber'] = int(self.params.get('autonumber_start', 1) - 1 + self._num_downloads)
+        info_dict['video_autonumber'] = self._num_videos
+        if info_dict.get('resolution') is None:
+            info_dict['resolution'] = self.format_resolution(info_dict, default=None)
+
+        # For fields playlist_index, playlist_autonumber and autonumber convert all occurrences
+        # of %(field)s to %(field)0Nd for backward compatibility
+        field_size_compat_map = {
+            'playlist_index': number_of_digits(info_dict.get('__last_playlist_index') or 0),
+            'playlist_autonumber': number_of_digits(info_dict.get('n_entries') or 0),
+            'autonumber': self.params.get('autonumber_size') or 5,
+        }
+
+        TMPL_DICT = {}
+        SAFE_EXEC_CONVERSIONS = 'difq'
+        UNSAFE_DEFAULT_CHARS = '"\' \n\t;&|^$%*<>{}()[]`#\\'
+        EXEC_ADVISORY_MSG = 'See  https://github.com/yt-dlp/yt-dlp/security/advisories/GHSA-69qj-pvh9-c5wg  for details'
+
+        def get_value(field):
             # Object traversal
-            value = _traverse_infodict(mdict['fields'])
+            if field['simple_key'] is not None:
+                value = info_dict.get(field['simple_key'])
+                if value == {}:
+                    value = None
+            else:
+                value = traverse_obj(info_dict, field['path'], traverse_string=True)
             # Negative
-            if mdict['negate']:
+            if field['negate']:
                 value = float_or_none(value)
                 if value is not None:
                     value *= -1
             # Do maths
-            offset_key = mdict['maths']
-            if offset_key:
+            if field['maths']:
                 value = float_or_none(value)
-                operator = None
-                while offset_key:
-                    item = re.match(
-                        MATH_FIELD_RE if operator else MATH_OPERATORS_RE,
-                        offset_key).group(0)
-                    offset_key = offset_key[len(item):]
-                    if operator is None:
-                        operator = MATH_FUNCTIONS[item]
-                        continue
-                    item, multiplier = (item[1:], -1) if item[0] == '-' else (item, 1)
-                    offset = float_or_none(item)
-                    if offset is None:
-                        offset = float_or_none(_traverse_infodict(item))
+                for operator, multiplier, offset, offset_path in field['maths']:
+                    if offset_path is not None:
+                        offset = float_or_none(traverse_obj(info_dict, offset_path, traverse_string=True))
                     try:
                         value = operator(value, multiplier * offset)
                     except (TypeError, ZeroDivisionError):
                         return None
-                    operator = None
             # Datetime formatting
-            if mdict['strf_format']:
-                value = strftime_or_none(value, mdict['strf_format'].replace('\\,', ','))
+            if field['strf_format']:
+                value = strftime_or_none(value, field['strf_format'])
 
             # XXX: Workaround for https://github.com/yt-dlp/yt-dlp/issues/4485
             if sanitize and value == '':
@@ -1403,6 +1628,8 @@ def sanitize(key, value):
         def _dumpjson_default(obj):
             if isinstance(obj, (set, LazyList)):
                 return list(obj)
+            elif isinstance(obj, collections.abc.Mapping):
+                return dict(obj)
             return repr(obj)
 
         class _ReplacementFormatter(string.Formatter):
@@ -1413,20 +1640,13 @@ def get_field(self, field_name, args, kwargs):
 
         replacement_formatter = _ReplacementFormatter()
 
-        def create_key(outer_mobj):
-            if not outer_mobj.group('has_key'):
-                return outer_mobj.group(0)
-            key = outer_mobj.group('key')
-            mobj = re.match(INTERNAL_FORMAT_RE, key)
+        def create_key(tmpl_field):
             value, replacement, default, last_field = None, None, na, ''
-            while mobj:
-                mobj = mobj.groupdict()
-                default = mobj['default'] if mobj['default'] is not None else default
-                value = get_value(mobj)
-                last_field, replacement = mobj['fields'], mobj['replacement']
-                if value is None and mobj['alternate']:
-                    mobj = re.match(INTERNAL_FORMAT_RE, mobj['remaining'][1:])
-                else:
+            for field in tmpl_field['fields']:
+                default = field['default'] if field['default'] is not None else default
+                value = get_value(field)
+                last_field, replacement = field['fields'], field['replacement']
+                if value is not None:
                     break
 
             if None not in (value, replacement):
@@ -1435,7 +1655,7 @@ def create_key(outer_mobj):
                 except ValueError:
                     value, default = None, na
 
-            fmt = outer_mobj.group('format')
+            fmt = tmpl_field['format']
             if fmt == 's' and last_field in field_size_compat_map and isinstance(value, int):
                 fmt = f'0{field_size_compat_map[last_field]:d}d'
 
@@ -1458,7 +1678,7 @@ def create_key(outer_mobj):
                             f'Conversions are not applied to --exec command template defaults, '
                             f'e.g. %(...|DEFAULT;)q. {EXEC_ADVISORY_MSG}')
 
-            flags = outer_mobj.group('conversion') or ''
+            flags = tmpl_field['conversion']
             str_fmt = f'{fmt[:-1]}s'
             if value is None:
                 value, fmt = default, 's'
@@ -1508,11 +1728,12 @@ def create_key(outer_mobj):
                 if fmt[-1] in 'csra':
                     value = sanitize(last_field, value)
 
-            key = '{}\0{}'.format(key.replace('%', '%\0'), outer_mobj.group('format'))
-            TMPL_DICT[key] = value
-            return '{prefix}%({key}){fmt}'.format(key=key, fmt=fmt, prefix=outer_mobj.group('prefix'))
+            TMPL_DICT[tmpl_field['key']] = value
+            return '{prefix}%({key}){fmt}'.format(key=tmpl_field['key'], fmt=fmt, prefix=tmpl_field['prefix'])
 
-        return EXTERNAL_FORMAT_RE.sub(create_key, outtmpl), TMPL_DICT
+        return ''.join(
+            part if isinstance(part, str) else create_key(part)
+            for part in self._compile_outtmpl(outtmpl)), TMPL_DICT
 
     def evaluate_outtmpl(self, outtmpl, info_dict, *args, **kwargs):
         outtmpl, info_dict = self.prepare_outtmpl(outtmpl, info_dict, *args, **kwargs)
@@ -1649,6 +1870,12 @@ def check_filter():
                 format_field(info_dict, 'title', f'{self._format_screen("%s", self.Styles.EMPHASIS)} '),
                 'has already been recorded in the archive'))
             break_opt, break_err = 'break_on_existing', ExistingVideoReached
+        elif self._journal and self._journal.is_done(self._make_archive_id(info_dict)):
+            reason = ''.join((
+                format_field(info_dict, 'id', f'{self._format_screen("%s", self.Styles.ID)}: '),
+                format_field(info_dict, 'title', f'{self._format_screen("%s", self.Styles.EMPHASIS)} '),
+                'has already been completed by this job'))
+            break_opt, break_err = None, None
         else:
             try:
                 reason = check_filter()
@@ -1693,15 +1920,10 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
         if not ie_key and force_generic_extractor:
             ie_key = 'Generic'
 
-        if ie_key:
-            ies = {ie_key: self._ies[ie_key]} if ie_key in self._ies else {}
-        else:
-            ies = self._ies
-
-        for key, ie in ies.items():
-            if not ie.suitable(url):
-                continue
+        with profile_phase('match_extractor'):
+            key, ie = self._find_suitable_ie(url, ie_key)
 
+        if ie is not None:
             if not ie.working():
                 self.report_warning('The program functionality for this site has been marked as broken, '
                                     'and will probably not work.')
@@ -1712,13 +1934,23 @@ def extract_info(self, url, download=True, ie_key=None, extra_info=None,
                                'has already been recorded in the archive')
                 if self.params.get('break_on_existing', False):
                     raise ExistingVideoReached
-                break
+                return
             return self.__extract_info(url, self.get_info_extractor(key), download, extra_info, process)
         else:
             extractors_restricted = self.params.get('allowed_extractors') not in (None, ['default'])
             self.report_error(f'No suitable extractor{format_field(ie_key, None, " (%s)")} found for URL {url}',
                               tb=False if extractors_restricted else None)
 
+    def _find_suitable_ie(self, url, ie_key=None):
+        """@returns (ie_key, extractor) of the first suitable extractor for the URL, or (None, None)"""
+        if ie_key:
+            candidates = [ie_key] if ie_key in self._ies else []
+        else:
+            if self._ie_index is None:
+                self._ie_index = ExtractorIndex(self._ies)
+            candidates = self._ie_index.candidates(url)
+        return next(((key, self._ies[key]) for key in candidates if self._ies[key].suitable(url)), (None, None))
+
     def _handle_extraction_exceptions(func):
         @functools.wraps(func)
         def wrapper(self, *args, **kwargs):
@@ -1859,7 +2091,8 @@ def __extract_info(self, url, ie, download, extra_info, process):
         self._apply_header_cookies(url)
 
         try:
-            ie_result = ie.extract(url)
+            with profile_phase(f'extract:{ie.IE_NAME}'):
+                ie_result = ie.extract(url)
         except UserNotLive as e:
             if process:
                 if self.params.get('wait_for_video'):
@@ -2136,11 +2369,16 @@ def __process_playlist(self, ie_result, download):
 
         failures = 0
         max_failures = self.params.get('skip_playlist_after_errors') or float('inf')
+        journal_key = self._journal and (self._make_archive_id(ie_result) or ie_result.get('webpage_url'))
         for i, (playlist_index, entry) in enumerate(entries):
             if lazy:
                 resolved_entries.append((playlist_index, entry))
             if not entry:
                 continue
+            if journal_key and self._journal.is_entry_done(journal_key, playlist_index):
+                self.write_debug(f'Skipping item {i + 1}, since it has already been processed by this job')
+                resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                continue
 
             entry['__x_forwarded_for_ip'] = ie_result.get('__x_forwarded_for_ip')
             if not lazy and 'playlist-index' in self.params['compat_opts']:
@@ -2156,6 +2394,8 @@ def __process_playlist(self, ie_result, download):
             if self._match_entry(entry_copy, incomplete=True) is not None:
                 # For compatabilty with youtube-dl. See https://github.com/yt-dlp/yt-dlp/issues/4369
                 resolved_entries[i] = (playlist_index, NO_DEFAULT)
+                if journal_key:
+                    self._journal.record_entry(journal_key, playlist_index)
                 continue
 
             self.to_screen(
@@ -2174,6 +2414,9 @@ def __process_playlist(self, ie_result, download):
                 break
             if keep_resolved_entries:
                 resolved_entries[i] = (playlist_index, entry_result)
+            # Entries whose video failed post-processing are processed again when resuming
+            if journal_key and entry_result and not self._journal.is_pending(self._make_archive_id(entry_result)):
+                self._journal.record_entry(journal_key, playlist_index)
 
         # Update with processed data
         ie_result['entries'] = [e for _, e in resolved_entries if e is not NO_DEFAULT]
@@ -3081,7 +3324,8 @@ def is_wellformed(f):
                 self.write_debug(f'Default format spec: {req_format}')
                 format_selector = self.build_format_selector(req_format)
 
-            formats_to_download = self._select_formats(formats, format_selector)
+            with profile_phase('format_selection'):
+                formats_to_download = self._select_formats(formats, format_selector)
             if interactive_format_selection and not formats_to_download:
                 self.report_error('Requested format is not available', tb=False, is_error=False)
                 continue
@@ -3142,6 +3386,8 @@ def to_screen(*msg):
             assert write_archive.issubset({True, False, 'ignore'})
             if True in write_archive and False not in write_archive:
                 self.record_download_archive(info_dict)
+                if self._journal and (video_id := self._make_archive_id(info_dict)):
+                    self._journal.record_done(video_id)
 
             info_dict['requested_downloads'] = downloaded_formats
             info_dict = self.run_all_pps('after_video', info_dict)
@@ -3215,17 +3461,19 @@ def process_subtitles(self, video_id, normal_subtitles, automatic_captions):
     def _forceprint(self, key, info_dict):
         if info_dict is None:
             return
-        info_copy = info_dict.copy()
+        info_copy = CopyOnWriteDict(info_dict)
         info_copy.setdefault('filename', self.prepare_filename(info_dict))
         if info_dict.get('requested_formats') is not None:
             # For RTMP URLs, also include the playpath
             info_copy['urls'] = '\n'.join(f['url'] + f.get('play_path', '') for f in info_dict['requested_formats'])
         elif info_dict.get('url'):
             info_copy['urls'] = info_dict['url'] + info_dict.get('play_path', '')
-        info_copy['formats_table'] = self.render_formats_table(info_dict)
-        info_copy['thumbnails_table'] = self.render_thumbnails_table(info_dict)
-        info_copy['subtitles_table'] = self.render_subtitles_table(info_dict.get('id'), info_dict.get('subtitles'))
-        info_copy['automatic_captions_table'] = self.render_subtitles_table(info_dict.get('id'), info_dict.get('automatic_captions'))
+        if self.params['forceprint'].get(key) or self.params['print_to_file'].get(key):
+            # Rendering the tables is expensive for videos with many formats
+            info_copy['formats_table'] = self.render_formats_table(info_dict)
+            info_copy['thumbnails_table'] = self.render_thumbnails_table(info_dict)
+            info_copy['subtitles_table'] = self.render_subtitles_table(info_dict.get('id'), info_dict.get('subtitles'))
+            info_copy['automatic_captions_table'] = self.render_subtitles_table(info_dict.get('id'), info_dict.get('automatic_captions'))
 
         def format_tmpl(tmpl):
             mobj = re.fullmatch(r'([\w.:,]|-\d|(?P<dict>{([\w.:,]|-\d)+}))+=?', tmpl)
@@ -3316,7 +3564,8 @@ def dl(self, name, info, subtitle=False, test=False):
         new_info = self._copy_infodict(info)
         if new_info.get('http_headers') is None:
             new_info['http_headers'] = self._calc_headers(new_info)
-        return fd.download(name, new_info, subtitle)
+        with profile_phase('download'):
+            return fd.download(name, new_info, subtitle)
 
     def existing_file(self, filepaths, *, default_overwrite=True):
         existing_files = list(filter(os.path.exists, orderedSet(filepaths)))
@@ -3331,6 +3580,7 @@ def existing_file(self, filepaths, *, default_overwrite=True):
     @_catch_unsafe_extension_error
     def process_info(self, info_dict):
         """Process a single resolved IE result. (Modifies it in-place)"""
+        from .downloader import FFmpegFD
 
         assert info_dict.get('_type', 'video') == 'video'
         original_infodict = info_dict
@@ -3654,6 +3904,8 @@ def ffmpeg_fixup(cndn, msg, cls):
                     ffmpeg_fixup(downloader == 'web_socket_fragment', 'Malformed duration detected', FFmpegFixupDurationPP)
 
                 fixup()
+                if self._journal and (video_id := self._make_archive_id(info_dict)):
+                    self._journal.record_downloaded(video_id, dl_filename)
                 try:
                     replace_info_dict(self.post_process(dl_filename, info_dict, files_to_move))
                 except PostProcessingError as err:
@@ -3703,8 +3955,20 @@ def download(self, url_list):
             raise SameFileError(outtmpl)
 
         for url in url_list:
-            self.__download_wrapper(self.extract_info)(
-                url, force_generic_extractor=self.params.get('force_generic_extractor', False))
+            if self._journal:
+                if self._journal.is_url_done(url):
+                    self.to_screen(f'[resume] Skipping {url}, since it has already been completed by this job')
+                    continue
+                self._journal.record_url(url)
+            # The return code is kept across URLs, so it is reset to tell whether this URL succeeded
+            retcode, self._download_retcode = self._download_retcode, 0
+            try:
+                self.__download_wrapper(self.extract_info)(
+                    url, force_generic_extractor=self.params.get('force_generic_extractor', False))
+                if self._journal and not self._download_retcode:
+                    self._journal.record_url_done(url)
+            finally:
+                self._download_retcode = self._download_retcode or retcode
 
         return self._download_retcode
 
@@ -3754,7 +4018,9 @@ def sanitize_info(info_dict, remove_private_keys=False):
             reject = lambda k, v: False
 
         def filter_fn(obj):
-            if isinstance(obj, dict):
+            if type(obj) in (str, int, float, bool) or obj is None:
+                return obj
+            elif isinstance(obj, collections.abc.Mapping):
                 return {k: filter_fn(v) for k, v in obj.items() if not reject(k, v)}
             elif isinstance(obj, (list, tuple, set, LazyList)):
                 return list(map(filter_fn, obj))
@@ -3801,7 +4067,8 @@ def run_pp(self, pp, infodict):
         if '__files_to_move' not in infodict:
             infodict['__files_to_move'] = {}
         try:
-            files_to_delete, infodict = pp.run(infodict)
+            with profile_phase(f'postprocess:{pp.PP_NAME}'):
+                files_to_delete, infodict = pp.run(infodict)
         except PostProcessingError as e:
             # Must be True and not 'only_download'
             if self.params.get('ignoreerrors') is True:
@@ -3858,11 +4125,8 @@ def _make_archive_id(self, info_dict):
             if not url:
                 return
             # Try to find matching extractor for the URL and take its ie_key
-            for ie_key, ie in self._ies.items():
-                if ie.suitable(url):
-                    extractor = ie_key
-                    break
-            else:
+            extractor, _ = self._find_suitable_ie(url)
+            if extractor is None:
                 return
         return make_archive_id(extractor, video_id)
 
@@ -4145,6 +4409,9 @@ def get_encoding(stream):
         if ffmpeg_features:
             exe_versions['ffmpeg'] += ' ({})'.format(','.join(sorted(ffmpeg_features)))
 
+        from .downloader.rtmp import rtmpdump_version
+        from .extractor.openload import PhantomJSwrapper
+
         exe_versions['rtmpdump'] = rtmpdump_version()
         exe_versions['phantomjs'] = PhantomJSwrapper._version()
         exe_str = ', '.join(
@@ -4211,9 +4478,19 @@ def proxies(self):
 
         return proxies
 
-    @functools.cached_property
+    @property
     def cookiejar(self):
+        """Cookiejar instance in use; the global one unless overridden with params_overlay"""
+        if self._cookiejar_override is not None:
+            return self._cookiejar_override
+        return self._global_cookiejar
+
+    @_synchronized_cached_property
+    def _global_cookiejar(self):
         """Global cookiejar instance"""
+        return self._load_cookiejar()
+
+    def _load_cookiejar(self):
         try:
             return load_cookies(
                 self.params.get('cookiefile'), self.params.get('cookiesfrombrowser'), self)
@@ -4292,6 +4569,9 @@ def urlopen(self, req):
         clean_proxies(proxies=req.proxies, headers=req.headers)
         clean_headers(req.headers)
 
+        if self._cookiejar_override is not None:
+            req.extensions.setdefault('cookiejar', self._cookiejar_override)
+
         try:
             return self._request_director.send(req)
         except NoSupportingHandlers as e:
@@ -4336,45 +4616,85 @@ def urlopen(self, req):
                     'Try using --legacy-server-connect', cause=e) from e
             raise
 
-    def build_request_director(self, handlers, preferences=None):
-        logger = _YDLLogger(self)
+    def _request_handler_params(self):
         headers = self.params['http_headers'].copy()
         proxies = self.proxies.copy()
         clean_headers(headers)
         clean_proxies(proxies, headers)
+        return {
+            'headers': headers,
+            'cookiejar': self._global_cookiejar,
+            'proxies': proxies,
+            'prefer_system_certs': 'no-certifi' in self.params['compat_opts'],
+            'verify': not self.params.get('nocheckcertificate'),
+            **traverse_obj(self.params, {
+                'verbose': 'debug_printtraffic',
+                'source_address': 'source_address',
+                'timeout': 'socket_timeout',
+                'legacy_ssl_support': 'legacyserverconnect',
+                'enable_file_urls': 'enable_file_urls',
+                'impersonate': 'impersonate',
+                'client_cert': {
+                    'client_certificate': 'client_certificate',
+                    'client_certificate_key': 'client_certificate_key',
+                    'client_certificate_password': 'client_certificate_password',
+                },
+            }),
+        }
 
-        director = RequestDirector(logger=logger, verbose=self.params.get('debug_printtraffic'))
+    def _add_request_handlers(self, director, handlers, preferences, logger):
+        params = self._request_handler_params()
         for handler in handlers:
-            director.add_handler(handler(
-                logger=logger,
-                headers=headers,
-                cookiejar=self.cookiejar,
-                proxies=proxies,
-                prefer_system_certs='no-certifi' in self.params['compat_opts'],
-                verify=not self.params.get('nocheckcertificate'),
-                **traverse_obj(self.params, {
-                    'verbose': 'debug_printtraffic',
-                    'source_address': 'source_address',
-                    'timeout': 'socket_timeout',
-                    'legacy_ssl_support': 'legacyserverconnect',
-                    'enable_file_urls': 'enable_file_urls',
-                    'impersonate': 'impersonate',
-                    'client_cert': {
-                        'client_certificate': 'client_certificate',
-                        'client_certificate_key': 'client_certificate_key',
-                        'client_certificate_password': 'client_certificate_password',
-                    },
-                }),
-            ))
+            director.add_handler(handler(logger=logger, **params))
         director.preferences.update(preferences or [])
         if 'prefer-legacy-http-handler' in self.params['compat_opts']:
             director.preferences.add(lambda rh, _: 500 if rh.RH_KEY == 'Urllib' else 0)
+
+    def build_request_director(self, handlers, preferences=None):
+        logger = _YDLLogger(self)
+
+        cache = None
+        if self.params.get('http_cache') and self.params.get('cachedir') is not False:
+            cache = HTTPCache(
+                os.path.join(get_cache_root(self.params.get('cachedir')), 'http'), logger=logger,
+                **traverse_obj(self.params, {
+                    'max_size': 'http_cache_max_size',
+                    'policies': 'http_cache_policies',
+                }))
+
+        director = RequestDirector(
+            logger=logger, verbose=self.params.get('debug_printtraffic'), cache=cache,
+            hedge_delay=self.params.get('hedge_delay'))
+        self._add_request_handlers(director, handlers, preferences, logger)
         return director
 
-    @functools.cached_property
+    @_synchronized_cached_property
     def _request_director(self):
+        _load_request_handlers()
         return self.build_request_director(_REQUEST_HANDLERS.values(), _RH_PREFERENCES)
 
+    def build_async_request_director(self, handlers=None, preferences=None):
+        """
+        Build an AsyncRequestDirector configured like the request director of this instance.
+        By default, all asynchronous and synchronous request handlers are available.
+        It should be closed with `await director.aclose()` in the event loop it was used in.
+        """
+        # asyncio and the async request handlers are only imported when used
+        from .networking.asynchronous import (
+            _ASYNC_REQUEST_HANDLERS,
+            AsyncRequestDirector,
+            _load_async_request_handlers,
+        )
+
+        logger = _YDLLogger(self)
+        director = AsyncRequestDirector(logger=logger, verbose=self.params.get('debug_printtraffic'))
+        if handlers is None:
+            _load_request_handlers()
+            _load_async_request_handlers()
+            handlers = [*_ASYNC_REQUEST_HANDLERS.values(), *_REQUEST_HANDLERS.values()]
+        self._add_request_handlers(director, handlers, _RH_PREFERENCES if preferences is None else preferences, logger)
+        return director
+
     def encode(self, s):
         if isinstance(s, bytes):
             return s  # Already encoded
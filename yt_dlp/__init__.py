@@ -12,14 +12,17 @@
 import optparse
 import os
 import re
+import time
 import traceback
 
+_IMPORT_START = time.perf_counter()  # For --profile-report
+
+from .cache import get_cache_root
 from .cookies import SUPPORTED_BROWSERS, SUPPORTED_KEYRINGS, CookieLoadError
-from .downloader.external import get_external_downloader
 from .extractor import list_extractor_classes
-from .extractor.adobepass import MSO_INFO
+from .networking.http_cache import POLICIES as HTTP_CACHE_POLICIES
 from .networking.impersonate import ImpersonateTarget
-from .globals import IN_CLI, plugin_dirs
+from .globals import IN_CLI, plugin_cache_dir, plugin_dirs, profiler
 from .options import parseOpts
 from .plugins import load_all_plugins as _load_all_plugins
 from .postprocessor import (
@@ -64,6 +67,7 @@
     write_string,
 
 )
+from .utils._profiling import Profiler
 from .utils._utils import _UnsafeExtensionError
 from .utils._jsruntime import (
     BunJsRuntime as _BunJsRuntime,
@@ -121,6 +125,8 @@ def print_extractor_information(opts, urls):
             ie.description(markdown=False, search_examples=_SEARCHES)
             for ie in list_extractor_classes(opts.age_limit) if ie.working() and ie.IE_DESC is not False)
     elif opts.ap_list_mso:
+        from .extractor.adobepass import MSO_INFO
+
         out = 'Supported TV Providers:\n{}\n'.format(render_table(
             ['mso', 'mso name'],
             [[mso_id, mso_info['name']] for mso_id, mso_info in MSO_INFO.items()]))
@@ -211,8 +217,11 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     validate(opts.password is None or opts.username is not None, 'account username', msg='{name} missing')
     validate(opts.ap_password is None or opts.ap_username is not None,
              'TV Provider account username', msg='{name} missing')
-    validate_in('TV Provider', opts.ap_mso, MSO_INFO,
-                'Unsupported {name} "{value}", use --ap-list-mso to get a list of supported TV Providers')
+    if opts.ap_mso is not None:
+        from .extractor.adobepass import MSO_INFO
+
+        validate_in('TV Provider', opts.ap_mso, MSO_INFO,
+                    'Unsupported {name} "{value}", use --ap-list-mso to get a list of supported TV Providers')
 
     # Numbers
     validate_positive('autonumber start', opts.autonumber_start)
@@ -236,6 +245,12 @@ def validate_minmax(min_val, max_val, min_name, max_name=None):
     else:
         validate_minmax(opts.sleep_interval, opts.max_sleep_interval, 'sleep interval')
 
+    if opts.hedge_delay is not None and opts.hedge_delay != 'auto':
+        hedge_delay = float_or_none(opts.hedge_delay)
+        validate(hedge_delay is not None, 'hedge delay', opts.hedge_delay)
+        validate_positive('hedge delay', hedge_delay)
+        opts.hedge_delay = hedge_delay
+
     if opts.wait_for_video is not None:
         min_wait, max_wait, *_ = map(parse_duration, [*opts.wait_for_video.split('-', 1), None])
         validate(min_wait is not None and not (max_wait is None and '-' in opts.wait_for_video),
@@ -320,6 +335,9 @@ def validate_bytes(name, value, strict_positive=False):
     opts.min_filesize = validate_bytes('min filesize', opts.min_filesize)
     opts.max_filesize = validate_bytes('max filesize', opts.max_filesize)
     opts.buffersize = validate_bytes('buffer size', opts.buffersize, True)
+    opts.http_cache_max_size = validate_bytes('HTTP cache max size', opts.http_cache_max_size, True)
+    for policy in opts.http_cache_policies.values():
+        validate_in('HTTP cache policy', policy, HTTP_CACHE_POLICIES)
     opts.http_chunk_size = validate_bytes('http chunk size', opts.http_chunk_size)
 
     # Output templates
@@ -470,6 +488,8 @@ def metadataparser_actions(f):
 
     if opts.download_archive is not None:
         opts.download_archive = expand_path(opts.download_archive)
+    if opts.resume_job is not None:
+        opts.resume_job = expand_path(opts.resume_job)
 
     if opts.ffmpeg_location is not None:
         opts.ffmpeg_location = expand_path(opts.ffmpeg_location)
@@ -486,6 +506,8 @@ def metadataparser_actions(f):
     for proto, path in opts.external_downloader.items():
         if path == 'native':
             continue
+        from .downloader.external import get_external_downloader
+
         ed = get_external_downloader(path)
         if ed is None:
             raise ValueError(
@@ -899,8 +921,12 @@ def parse_options(argv=None):
         'max_views': opts.max_views,
         'daterange': opts.date,
         'cachedir': opts.cachedir,
+        'http_cache': opts.http_cache,
+        'http_cache_max_size': opts.http_cache_max_size,
+        'http_cache_policies': opts.http_cache_policies,
         'age_limit': opts.age_limit,
         'download_archive': opts.download_archive,
+        'resume_job': opts.resume_job,
         'break_on_existing': opts.break_on_existing,
         'break_on_reject': opts.break_on_reject,
         'break_per_url': opts.break_per_url,
@@ -914,6 +940,7 @@ def parse_options(argv=None):
         'http_headers': opts.headers,
         'proxy': opts.proxy,
         'socket_timeout': opts.socket_timeout,
+        'hedge_delay': opts.hedge_delay,
         'bidi_workaround': opts.bidi_workaround,
         'debug_printtraffic': opts.debug_printtraffic,
         'default_search': opts.default_search,
@@ -965,7 +992,25 @@ def _real_main(argv=None):
     setproctitle('yt-dlp')
 
     parser, opts, all_urls, ydl_opts = parse_options(argv)
+    if not opts.profile_report:
+        return _run_main(argv, parser, opts, all_urls, ydl_opts)
 
+    profiler.value = Profiler(start=_IMPORT_START)
+    profiler.value.add(('startup', ), time.perf_counter() - _IMPORT_START, time.process_time())
+    try:
+        with profiler.value.phase('main'):
+            return _run_main(argv, parser, opts, all_urls, ydl_opts)
+    finally:
+        report_fn = expand_path(opts.profile_report)
+        # Replacing the extension would overwrite the report if it is already .folded
+        folded_fn = f'{report_fn}.folded'
+        profiler.value.write_report(report_fn, folded_fn)
+        profiler.value = None
+        if opts.verbose:
+            write_string(f'[debug] Profile report written to {report_fn!r} and {folded_fn!r}\n')
+
+
+def _run_main(argv, parser, opts, all_urls, ydl_opts):
     if print_extractor_information(opts, all_urls):
         return
 
@@ -977,6 +1022,8 @@ def _real_main(argv=None):
     # load all plugins into the global lookup
     plugin_dirs.value = opts.plugin_dirs
     if plugin_dirs.value:
+        if opts.cachedir is not False:
+            plugin_cache_dir.value = os.path.join(get_cache_root(opts.cachedir), 'plugins')
         _load_all_plugins()
 
     with YoutubeDL(ydl_opts) as ydl:
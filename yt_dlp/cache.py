@@ -10,16 +10,20 @@
 from .version import __version__
 
 
+def get_cache_root(cachedir=None):
+    """The cache directory for the `cachedir` parameter (see YoutubeDL)"""
+    if cachedir is None:
+        cache_root = os.getenv('XDG_CACHE_HOME', '~/.cache')
+        cachedir = os.path.join(cache_root, 'yt-dlp')
+    return expand_path(cachedir)
+
+
 class Cache:
     def __init__(self, ydl):
         self._ydl = ydl
 
     def _get_root_dir(self):
-        res = self._ydl.params.get('cachedir')
-        if res is None:
-            cache_root = os.getenv('XDG_CACHE_HOME', '~/.cache')
-            res = os.path.join(cache_root, 'yt-dlp')
-        return expand_path(res)
+        return get_cache_root(self._ydl.params.get('cachedir'))
 
     def _get_cache_fn(self, section, key, dtype):
         assert re.match(r'^[\w.-]+$', section), f'invalid section {section!r}'
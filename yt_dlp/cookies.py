@@ -20,11 +20,6 @@
 import urllib.request
 from enum import Enum, auto
 
-from .aes import (
-    aes_cbc_decrypt_bytes,
-    aes_gcm_decrypt_and_verify_bytes,
-    unpad_pkcs7,
-)
 from .dependencies import (
     _SECRETSTORAGE_UNAVAILABLE_REASON,
     secretstorage,
@@ -1042,6 +1037,8 @@ def pbkdf2_sha1(password, salt, iterations, key_length):
 
 
 def _decrypt_aes_cbc_multi(ciphertext, keys, logger, initialization_vector=b' ' * 16, hash_prefix=False):
+    from .aes import aes_cbc_decrypt_bytes, unpad_pkcs7
+
     for key in keys:
         plaintext = unpad_pkcs7(aes_cbc_decrypt_bytes(ciphertext, key, initialization_vector))
         try:
@@ -1055,6 +1052,8 @@ def _decrypt_aes_cbc_multi(ciphertext, keys, logger, initialization_vector=b' '
 
 
 def _decrypt_aes_gcm(ciphertext, key, nonce, authentication_tag, logger, hash_prefix=False):
+    from .aes import aes_gcm_decrypt_and_verify_bytes
+
     try:
         plaintext = aes_gcm_decrypt_and_verify_bytes(ciphertext, key, authentication_tag, nonce)
     except ValueError:
@@ -11,6 +11,15 @@
         brotli = None
 
 
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+
 try:
     import certifi
 except ImportError:
@@ -79,6 +88,11 @@
 except ImportError:
     curl_cffi = None
 
+try:
+    import h2
+except ImportError:
+    h2 = None
+
 from . import Cryptodome
 
 try:
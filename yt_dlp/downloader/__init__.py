@@ -1,7 +1,12 @@
+import importlib
+
 from ..utils import NO_DEFAULT, determine_protocol
 
 
 def get_suitable_downloader(info_dict, params={}, default=NO_DEFAULT, protocol=None, to_stdout=False):
+    from .dash import DashSegmentsFD
+    from .external import FFmpegFD
+
     info_dict['protocol'] = determine_protocol(info_dict)
     info_copy = info_dict.copy()
     info_copy['to_stdout'] = to_stdout
@@ -20,47 +25,59 @@ def get_suitable_downloader(info_dict, params={}, default=NO_DEFAULT, protocol=N
     return None
 
 
-# Some of these require get_suitable_downloader
-from .common import FileDownloader
-from .dash import DashSegmentsFD
-from .external import FFmpegFD, get_external_downloader
-from .f4m import F4mFD
-from .fc2 import FC2LiveFD
-from .hls import HlsFD
-from .http import HttpFD
-from .ism import IsmFD
-from .mhtml import MhtmlFD
-from .niconico import NiconicoLiveFD
-from .rtmp import RtmpFD
-from .rtsp import RtspFD
-from .websocket import WebSocketFragmentFD
-from .youtube_live_chat import YoutubeLiveChatFD
-from .bunnycdn import BunnyCdnFD
-from .soop import SoopVodFD
-
-PROTOCOL_MAP = {
-    'rtmp': RtmpFD,
-    'rtmpe': RtmpFD,
-    'rtmp_ffmpeg': FFmpegFD,
-    'm3u8_native': HlsFD,
-    'm3u8': FFmpegFD,
-    'mms': RtspFD,
-    'rtsp': RtspFD,
-    'f4m': F4mFD,
-    'http_dash_segments': DashSegmentsFD,
-    'http_dash_segments_generator': DashSegmentsFD,
-    'ism': IsmFD,
-    'mhtml': MhtmlFD,
-    'niconico_live': NiconicoLiveFD,
-    'fc2_live': FC2LiveFD,
-    'websocket_frag': WebSocketFragmentFD,
-    'youtube_live_chat': YoutubeLiveChatFD,
-    'youtube_live_chat_replay': YoutubeLiveChatFD,
-    'bunnycdn': BunnyCdnFD,
-    'soopvod': SoopVodFD,
+# The downloaders are only imported when they are used
+_DOWNLOADER_MODULES = {
+    'FileDownloader': 'common',
+    'DashSegmentsFD': 'dash',
+    'FFmpegFD': 'external',
+    'get_external_downloader': 'external',
+    'F4mFD': 'f4m',
+    'FC2LiveFD': 'fc2',
+    'HlsFD': 'hls',
+    'HttpFD': 'http',
+    'IsmFD': 'ism',
+    'MhtmlFD': 'mhtml',
+    'NiconicoLiveFD': 'niconico',
+    'RtmpFD': 'rtmp',
+    'RtspFD': 'rtsp',
+    'WebSocketFragmentFD': 'websocket',
+    'YoutubeLiveChatFD': 'youtube_live_chat',
+    'BunnyCdnFD': 'bunnycdn',
+    'SoopVodFD': 'soop',
+}
+
+_PROTOCOL_DOWNLOADERS = {
+    'rtmp': 'RtmpFD',
+    'rtmpe': 'RtmpFD',
+    'rtmp_ffmpeg': 'FFmpegFD',
+    'm3u8_native': 'HlsFD',
+    'm3u8': 'FFmpegFD',
+    'mms': 'RtspFD',
+    'rtsp': 'RtspFD',
+    'f4m': 'F4mFD',
+    'http_dash_segments': 'DashSegmentsFD',
+    'http_dash_segments_generator': 'DashSegmentsFD',
+    'ism': 'IsmFD',
+    'mhtml': 'MhtmlFD',
+    'niconico_live': 'NiconicoLiveFD',
+    'fc2_live': 'FC2LiveFD',
+    'websocket_frag': 'WebSocketFragmentFD',
+    'youtube_live_chat': 'YoutubeLiveChatFD',
+    'youtube_live_chat_replay': 'YoutubeLiveChatFD',
+    'bunnycdn': 'BunnyCdnFD',
+    'soopvod': 'SoopVodFD',
 }
 
 
+def __getattr__(name):
+    if name == 'PROTOCOL_MAP':
+        return {protocol: __getattr__(downloader) for protocol, downloader in _PROTOCOL_DOWNLOADERS.items()}
+    elif name not in _DOWNLOADER_MODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = globals()[name] = getattr(importlib.import_module(f'.{_DOWNLOADER_MODULES[name]}', __name__), name)
+    return value
+
+
 def shorten_protocol_name(proto, simplify=False):
     short_protocol_names = {
         'm3u8_native': 'm3u8',
@@ -86,7 +103,11 @@ def shorten_protocol_name(proto, simplify=False):
 
 def _get_suitable_downloader(info_dict, protocol, params, default):
     """Get the downloader class that can handle the info dict."""
+    from .external import FFmpegFD, get_external_downloader
+    from .hls import HlsFD
+
     if default is NO_DEFAULT:
+        from .http import HttpFD
         default = HttpFD
 
     if (info_dict.get('section_start') or info_dict.get('section_end')) and FFmpegFD.can_download(info_dict):
@@ -123,7 +144,7 @@ def _get_suitable_downloader(info_dict, protocol, params, default):
         elif params.get('hls_prefer_native') is False:
             return FFmpegFD
 
-    return PROTOCOL_MAP.get(protocol, default)
+    return __getattr__(_PROTOCOL_DOWNLOADERS[protocol]) if protocol in _PROTOCOL_DOWNLOADERS else default
 
 
 __all__ = [
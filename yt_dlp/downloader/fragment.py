@@ -8,7 +8,6 @@
 
 from .common import FileDownloader
 from .http import HttpFD
-from ..aes import aes_cbc_decrypt_bytes, unpad_pkcs7
 from ..networking import Request
 from ..networking.exceptions import HTTPError, IncompleteRead
 from ..utils import DownloadError, RetryManager, traverse_obj
@@ -116,6 +115,9 @@ def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_dat
             'request_data': request_data,
             'ctx_id': ctx.get('ctx_id'),
         }
+        if self.params.get('concurrent_fragment_downloads', 1) > 1:
+            # Concurrent fragments may then share a multiplexed connection to the host
+            fragment_info_dict['multiplex'] = True
         frag_resume_len = 0
         if ctx['dl'].params.get('continuedl', True):
             frag_resume_len = self.filesize_or_none(self.temp_name(fragment_filename))
@@ -339,6 +341,8 @@ def _prepare_external_frag_download(self, ctx):
         })
 
     def decrypter(self, info_dict):
+        from ..aes import aes_cbc_decrypt_bytes, unpad_pkcs7
+
         _key_cache = {}
 
         def _get_key(url):
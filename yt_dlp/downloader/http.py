@@ -24,10 +24,13 @@ class HttpFD(FileDownloader):
     def real_download(self, filename, info_dict):
         url = info_dict['url']
         request_data = info_dict.get('request_data', None)
-        request_extensions = {}
+        # Media is not worth keeping in the HTTP cache
+        request_extensions = {'http_cache': False}
         impersonate_target = self._get_impersonate_target(info_dict)
         if impersonate_target is not None:
             request_extensions['impersonate'] = impersonate_target
+        if info_dict.get('multiplex'):
+            request_extensions['multiplex'] = True
 
         class DownloadContext(dict):
             __getattr__ = dict.get
@@ -228,6 +231,8 @@ def download():
 
             byte_counter = 0 + ctx.resume_len
             block_size = ctx.block_size
+            # The blocks are read into the same buffer, which is only replaced when the block size outgrows it
+            buffer = memoryview(bytearray(block_size))
             start = time.time()
 
             # measure time over whole while-loop, so slow_down() and best_block_size() work together properly
@@ -246,9 +251,12 @@ def retry(e):
                 raise RetryDownload(e)
 
             while True:
+                read_size = block_size if not is_test else min(block_size, data_len - byte_counter)
+                if read_size > len(buffer):
+                    buffer = memoryview(bytearray(read_size))
                 try:
                     # Download and write
-                    data_block = ctx.data.read(block_size if not is_test else min(block_size, data_len - byte_counter))
+                    data_block = buffer[:ctx.data.readinto(buffer[:read_size])]
                 except TransportError as err:
                     retry(err)
 
@@ -6,11 +6,18 @@
 passthrough_module(__name__, '.extractors')
 del passthrough_module
 
+
+def _plugin_class_info(ie):
+    from ._dispatch import class_info
+    return class_info(ie)
+
+
 register_plugin_spec(PluginSpec(
     module_name='extractor',
     suffix='IE',
     destination=_extractors_context,
     plugin_destination=_plugin_ies_context,
+    class_info=_plugin_class_info,
 ))
 
 
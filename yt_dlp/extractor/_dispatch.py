@@ -0,0 +1,297 @@
+"""Index of extractors by the words that must appear in URLs they are suitable for
+
+Instead of calling every extractor's `suitable`, the URL is split into lowercase
+alphanumeric tokens and only the extractors indexed under one of these tokens
+(or whose URLs cannot be described by such words) are tried, in their original order
+"""
+import collections.abc
+import functools
+import re
+
+try:
+    from re import _parser as sre_parse  # Python >= 3.11
+except ImportError:
+    import sre_parse
+
+from .common import InfoExtractor
+from ..globals import LAZY_EXTRACTORS
+from ..utils import variadic
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Words that are present in too many URLs to be useful as keys
+_COMMON_WORDS = {
+    'http', 'https', 'www', 'm', 'com', 'net', 'org', 'tv', 'co', 'uk', 'de', 'fr', 'jp', 'ru',
+    'html', 'php', 'embed', 'video', 'videos', 'watch', 'v', 'player', 'play', 'id', 'live',
+}
+
+_ANCHORS_START = {sre_parse.AT_BEGINNING, sre_parse.AT_BEGINNING_STRING}
+_ANCHORS_END = {sre_parse.AT_END, sre_parse.AT_END_STRING}
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', None)} - {None}
+
+
+def _is_boundary(char):
+    """Whether the character always separates URL tokens"""
+    return char.isascii() and not char.isalnum()
+
+
+def _is_boundary_set(items):
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            if not _is_boundary(chr(av)):
+                return False
+        elif op is sre_parse.RANGE:
+            if not all(_is_boundary(chr(c)) for c in range(av[0], av[1] + 1)):
+                return False
+        elif not (op is sre_parse.CATEGORY and av is sre_parse.CATEGORY_SPACE):
+            return False
+    return True
+
+
+def _info(op, av):
+    """@returns (nullable, first_is_boundary, last_is_boundary) of the node"""
+    if op is sre_parse.LITERAL:
+        return (False, *[_is_boundary(chr(av))] * 2)
+    elif op is sre_parse.IN:
+        return (False, *[_is_boundary_set(av)] * 2)
+    elif op in (sre_parse.NOT_LITERAL, sre_parse.ANY):
+        return False, False, False
+    elif op in (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+        return True, True, True
+    elif op is sre_parse.SUBPATTERN:
+        return _sequence_info(av[-1])
+    elif op is getattr(sre_parse, 'ATOMIC_GROUP', None):
+        return _sequence_info(av)
+    elif op is sre_parse.BRANCH:
+        nullable, first, last = zip(*map(_sequence_info, av[1]))
+        return any(nullable), all(first), all(last)
+    elif op in _REPEATS:
+        nullable, first, last = _sequence_info(av[2])
+        return nullable or av[0] == 0, first, last
+    return True, False, False
+
+
+def _sequence_info(items):
+    infos = [_info(op, av) for op, av in items]
+    first = last = True
+    for nullable, first_boundary, _ in infos:
+        first = first and first_boundary
+        if not nullable:
+            break
+    for nullable, _, last_boundary in reversed(infos):
+        last = last and last_boundary
+        if not nullable:
+            break
+    return all(info[0] for info in infos), first, last
+
+
+def _is_bounded(elements, infos, index, step, outer):
+    """Whether the element at `index` is always preceded (step=-1) or followed (step=1) by a boundary"""
+    index += step
+    while 0 <= index < len(elements):
+        kind, value = elements[index]
+        if kind == 'node' and value[0] is sre_parse.AT and value[1] in (_ANCHORS_START if step < 0 else _ANCHORS_END):
+            return True
+        nullable, first_boundary, last_boundary = infos[index]
+        if not (last_boundary if step < 0 else first_boundary):
+            return False
+        if not nullable:
+            return True
+        index += step
+    return outer
+
+
+def _sequence_keys(items, left, right):
+    """Alternative sets of words, any of which always has a word that is a token of the match
+
+    @param left, right  Whether the match is always preceded/followed by a boundary or the end of the string
+    """
+    elements = []
+    for op, av in items:
+        if op is sre_parse.LITERAL and elements and elements[-1][0] == 'str':
+            elements[-1] = ('str', elements[-1][1] + chr(av))
+        else:
+            elements.append(('str', chr(av)) if op is sre_parse.LITERAL else ('node', (op, av)))
+    infos = [
+        (False, _is_boundary(value[0]), _is_boundary(value[-1])) if kind == 'str' else _info(*value)
+        for kind, value in elements]
+
+    candidates = []
+    for index, (kind, value) in enumerate(elements):
+        if infos[index][0]:
+            continue
+        left_bounded = _is_bounded(elements, infos, index, -1, left)
+        right_bounded = _is_bounded(elements, infos, index, 1, right)
+        if kind == 'node':
+            candidates.extend(_node_keys(*value, left_bounded, right_bounded))
+            continue
+        for mobj in _TOKEN_RE.finditer(''.join(c.lower() if c.isascii() else c for c in value)):
+            start, end = mobj.span()
+            # Non-ASCII characters never match ASCII URLs, and are not boundaries
+            if (start > 0 and not _is_boundary(value[start - 1])) or (end < len(value) and not _is_boundary(value[end])):
+                continue
+            if (start > 0 or left_bounded) and (end < len(value) or right_bounded):
+                candidates.append(frozenset((mobj.group(),)))
+    return candidates
+
+
+def _node_keys(op, av, left, right):
+    if op is sre_parse.SUBPATTERN:
+        return _sequence_keys(av[-1], left, right)
+    elif op is getattr(sre_parse, 'ATOMIC_GROUP', None):
+        return _sequence_keys(av, left, right)
+    elif op is sre_parse.BRANCH:
+        keys = set()
+        for alternative in av[1]:
+            candidates = _sequence_keys(alternative, left, right)
+            if not candidates:
+                return []
+            keys.update(min(candidates, key=_cost))
+        return [frozenset(keys)]
+    elif op in _REPEATS and av[0] > 0:
+        # Use the first repetition, which may be followed by another
+        _, first_boundary, _ = _sequence_info(av[2])
+        return _sequence_keys(av[2], left, right if av[1] == 1 else right and first_boundary)
+    return []
+
+
+def _cost(keys):
+    return sum(100 if key in _COMMON_WORDS or key.isdecimal() else 1 for key in keys), -min(map(len, keys))
+
+
+def url_keys(ie):
+    """Words, one of which is a token of every URL the extractor is suitable for
+
+    @param ie   An extractor class (not a lazy extractor)
+    @returns    A tuple of words; or None if they cannot be determined from _VALID_URL
+    """
+    if (ie.suitable.__func__ is not InfoExtractor.suitable.__func__
+            or ie._match_valid_url.__func__ is not InfoExtractor._match_valid_url.__func__):
+        return None
+    elif ie._VALID_URL is False:
+        return ()
+
+    keys = set()
+    for pattern in variadic(ie._VALID_URL):
+        if not isinstance(pattern, str):
+            return None
+        try:
+            candidates = _sequence_keys(sre_parse.parse(pattern), True, False)
+        except (re.error, RecursionError):
+            return None
+        if not candidates:
+            return None
+        keys.update(min(candidates, key=_cost))
+    return tuple(sorted(keys))
+
+
+@functools.cache
+def _lazy_lookup():
+    from . import import_extractors
+    import_extractors()
+    if not LAZY_EXTRACTORS.value:
+        return None
+    from .lazy_extractors import _CLASS_LOOKUP
+    return _CLASS_LOOKUP
+
+
+@functools.cache
+def _class_url_keys(ie):
+    lookup = _lazy_lookup()
+    if lookup and lookup.is_created(ie):
+        return lookup.info(ie.__name__)['url_keys']
+    elif not issubclass(ie, InfoExtractor):
+        return None
+    return url_keys(ie)
+
+
+def class_info(ie):
+    """The ie_key, IE_NAME, _ENABLED and url_keys of an extractor class"""
+    return {
+        'ie_key': ie.ie_key(),
+        'IE_NAME': ie.IE_NAME,
+        '_ENABLED': ie._ENABLED,
+        'url_keys': _class_url_keys(ie),
+    }
+
+
+def extractor_info(lookup, name):
+    """The ie_key, IE_NAME, _ENABLED and url_keys of an extractor in the lookup (see globals.extractors)
+
+    Lazy extractors and plugins are not loaded to get these, if the lookup has their info
+    """
+    info = lookup.info(name) if hasattr(lookup, 'info') else None
+    return class_info(lookup[name]) if info is None else info
+
+
+_Unresolved = collections.namedtuple('_Unresolved', ('lookup', 'name'))
+
+
+class ExtractorDict(collections.abc.MutableMapping):
+    """Ordered mapping of ie_key to extractor class or instance
+
+    Extractors added with `add_from_lookup` are only taken from their lookup,
+    which creates lazy extractor classes, when they are first accessed
+    """
+
+    def __init__(self):
+        self._ies = {}
+
+    def add_from_lookup(self, ie_key, lookup, name):
+        self._ies[ie_key] = _Unresolved(lookup, name)
+
+    def __getitem__(self, ie_key):
+        ie = self._ies[ie_key]
+        if isinstance(ie, _Unresolved):
+            ie = self._ies[ie_key] = ie.lookup[ie.name]
+        return ie
+
+    def __setitem__(self, ie_key, ie):
+        self._ies[ie_key] = ie
+
+    def __delitem__(self, ie_key):
+        del self._ies[ie_key]
+
+    def __contains__(self, ie_key):
+        return ie_key in self._ies
+
+    def __iter__(self):
+        return iter(self._ies)
+
+    def __len__(self):
+        return len(self._ies)
+
+    def url_keys(self, ie_key):
+        ie = self._ies[ie_key]
+        if isinstance(ie, _Unresolved):
+            return extractor_info(ie.lookup, ie.name)['url_keys']
+        return _class_url_keys(ie if isinstance(ie, type) else type(ie))
+
+
+class ExtractorIndex:
+    """Finds the extractors that may be suitable for a URL, in the order they were given"""
+
+    def __init__(self, ies):
+        """@param ies  ExtractorDict or mapping of ie_key to extractor class or instance"""
+        self._keys = list(ies)
+        self._always = []
+        self._index = collections.defaultdict(list)
+        for position, ie_key in enumerate(self._keys):
+            if isinstance(ies, ExtractorDict):
+                keys = ies.url_keys(ie_key)
+            else:
+                ie = ies[ie_key]
+                keys = _class_url_keys(ie if isinstance(ie, type) else type(ie))
+            if keys is None:
+                self._always.append(position)
+            for key in keys or ():
+                self._index[key].append(position)
+
+    def candidates(self, url):
+        """@returns the ie_keys of the extractors that may be suitable for the URL"""
+        if not url.isascii():
+            return list(self._keys)
+        positions = set(self._always)
+        for token in set(_TOKEN_RE.findall(url.lower())):
+            positions.update(self._index.get(token, ()))
+        return [self._keys[position] for position in sorted(positions)]
@@ -26,8 +26,6 @@
     urllib_req_to_req,
 )
 from ..cookies import LenientSimpleCookie
-from ..downloader.f4m import get_base_url, remove_encrypted_media
-from ..downloader.hls import HlsFD
 from ..globals import plugin_ies_overrides
 from ..networking import HEADRequest, Request
 from ..networking.exceptions import (
@@ -98,10 +96,30 @@
     xpath_text,
     xpath_with_ns,
 )
-from ..utils._utils import _request_dump_filename
+from ..utils._profiling import profiled, register_counters
+from ..utils._utils import _js_object_end, _request_dump_filename
 from ..utils.jslib import devalue
 
 
+@functools.lru_cache(maxsize=4096)
+def _compile_regex_cached(pattern, flags):
+    return re.compile(pattern, flags)
+
+
+def _compile_regex(pattern, flags=0):
+    """re.compile with a larger cache than that of the re module
+
+    The patterns built by the extractors at runtime (eg: with _og_regexes)
+    would otherwise keep evicting each other from re's cache
+    """
+    if isinstance(pattern, re.Pattern):
+        return re.compile(pattern, flags)
+    return _compile_regex_cached(pattern, flags)
+
+
+register_counters('regex_cache', lambda: _compile_regex_cached.cache_info()._asdict())
+
+
 class InfoExtractor:
     """Information Extractor class.
 
@@ -922,6 +940,7 @@ def _request_webpage(self, url_or_request, video_id, note=None, errnote=None, fa
                 self.report_warning(errmsg, video_id=video_id)
                 return False
 
+    @profiled('download_webpage')
     def _download_webpage_handle(self, url_or_request, video_id, note=None, errnote=None, fatal=True,
                                  encoding=None, data=None, headers={}, query={}, expected_status=None,
                                  impersonate=None, require_impersonation=False):
@@ -1319,10 +1338,10 @@ def _search_regex(self, pattern, string, name, default=NO_DEFAULT, fatal=True, f
         if string is None:
             mobj = None
         elif isinstance(pattern, (str, re.Pattern)):
-            mobj = re.search(pattern, string, flags)
+            mobj = _compile_regex(pattern, flags).search(string)
         else:
             for p in pattern:
-                mobj = re.search(p, string, flags)
+                mobj = _compile_regex(p, flags).search(string)
                 if mobj:
                     break
 
@@ -1353,6 +1372,12 @@ def _search_json(self, start_pattern, string, name, video_id, *, end_pattern='',
         else:
             fatal, has_default = False, True
 
+        if (contains_pattern == r'{(?s:.+)}' and string is not None and kwargs.keys() <= {'transform_source'}
+                and kwargs.get('transform_source') in (None, js_to_json)):
+            result = self._decode_json_in_place(start_pattern, string, end_pattern, kwargs.get('transform_source'))
+            if result is not NO_DEFAULT:
+                return result
+
         json_string = self._search_regex(
             rf'(?:{start_pattern})\s*(?P<json>{contains_pattern})\s*(?:{end_pattern})',
             string, name, group='json', fatal=fatal, default=None if has_default else NO_DEFAULT)
@@ -1371,6 +1396,26 @@ def _search_json(self, start_pattern, string, name, video_id, *, end_pattern='',
                     f'Unable to extract {_name} - Failed to parse JSON: {e}', video_id=video_id)
         return default
 
+    @staticmethod
+    def _decode_json_in_place(start_pattern, string, end_pattern, transform_source=None):
+        """
+        Decode the object that _search_json would find without copying the rest of the page,
+        and only passing the object to transform_source if it is not valid JSON.
+        Returns NO_DEFAULT if _search_json has to fall back to matching and decoding it as a whole
+        """
+        mobj = _compile_regex(rf'(?:{start_pattern})\s*(?={{)').search(string)
+        if not mobj or not _compile_regex(rf'}}\s*(?:{end_pattern})').search(string, mobj.end() + 2):
+            return NO_DEFAULT
+
+        decoder = json.JSONDecoder(strict=False)
+        with contextlib.suppress(ValueError):
+            return decoder.raw_decode(string, mobj.end())[0]
+        end = transform_source and _js_object_end(string, mobj.end())
+        if end:
+            with contextlib.suppress(ValueError):
+                return decoder.raw_decode(transform_source(string[mobj.end():end]))[0]
+        return NO_DEFAULT
+
     def _html_search_regex(self, pattern, string, name, default=NO_DEFAULT, fatal=True, flags=0, group=None):
         """
         Like _search_regex, but strips HTML tags and unescapes entities.
@@ -2048,6 +2093,8 @@ def _extract_f4m_formats(self, manifest_url, video_id, preference=None, quality=
     def _parse_f4m_formats(self, manifest, manifest_url, video_id, preference=None, quality=None, f4m_id=None,
                            transform_source=lambda s: fix_xml_ampersands(s).strip(),
                            fatal=True, m3u8_id=None):
+        from ..downloader.f4m import get_base_url, remove_encrypted_media
+
         if not isinstance(manifest, xml.etree.ElementTree.Element) and not fatal:
             return []
 
@@ -2223,6 +2270,8 @@ def _parse_m3u8_formats_and_subtitles(
             preference=None, quality=None, m3u8_id=None, live=False, note=None,
             errnote=None, fatal=True, data=None, headers={}, query={},
             video_id=None):
+        from ..downloader.hls import HlsFD
+
         formats, subtitles = [], {}
         has_drm = HlsFD._has_drm(m3u8_doc)
 
@@ -3,6 +3,7 @@
 
 from ..globals import LAZY_EXTRACTORS
 from ..globals import extractors as _extractors_context
+from ..plugins import LookupChain
 
 _CLASS_LOOKUP = None
 if os.environ.get('YTDLP_NO_LAZY_EXTRACTORS'):
@@ -30,10 +31,10 @@
         (('GenericIE', _extractors.GenericIE),),
     ))
 
-# We want to append to the main lookup
+# We want to append to the main lookup.
+# The lookups are chained, so that lazy extractors are only created when they are used
 _current = _extractors_context.value
-for name, ie in _CLASS_LOOKUP.items():
-    _current.setdefault(name, ie)
+_extractors_context.value = LookupChain(_current, _CLASS_LOOKUP) if _current else _CLASS_LOOKUP
 
 
 def __getattr__(name):
@@ -11,6 +11,7 @@
 import urllib.parse
 
 from ..common import InfoExtractor
+from ...networking import Request
 from ...networking.exceptions import HTTPError, network_exceptions
 from ...utils import (
     ExtractorError,
@@ -803,7 +804,10 @@ def _call_api(self, ep, query, video_id, fatal=True, headers=None,
         if headers:
             real_headers.update(headers)
         return self._download_json(
-            f'https://{self._select_api_hostname(api_hostname, default_client)}/youtubei/v1/{ep}',
+            Request(
+                f'https://{self._select_api_hostname(api_hostname, default_client)}/youtubei/v1/{ep}',
+                # These only read data, so a duplicate can be sent if they are slow
+                extensions={'hedge': True} if ep in ('player', 'next') else None),
             video_id=video_id, fatal=fatal, note=note, errnote=errnote,
             data=json.dumps(data).encode('utf8'), headers=real_headers,
             query=filter_dict({
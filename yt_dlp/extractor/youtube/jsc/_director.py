@@ -29,6 +29,7 @@
 from yt_dlp.extractor.youtube.pot.provider import (
     provider_bug_report_message,
 )
+from yt_dlp.utils._profiling import profiled
 
 if typing.TYPE_CHECKING:
     from collections.abc import Iterable
@@ -92,6 +93,7 @@ def _handle_error(self, e: Exception, provider: JsChallengeProvider, requests: l
                 f'         requests = {requests}\n'
                 f'         {provider_bug_report_message(provider, before="")}', cause=e)
 
+    @profiled('jsc_solve')
     def bulk_solve(self, requests: list[JsChallengeRequest]) -> list[tuple[JsChallengeRequest, JsChallengeResponse]]:
         """Solves multiple JS Challenges in bulk, returning a list of responses"""
         if not self.providers:
@@ -22,6 +22,7 @@ def __repr__(self, /):
 all_plugins_loaded = Indirect(False)
 plugin_specs = Indirect({})
 plugin_dirs = Indirect(['default'])
+plugin_cache_dir = Indirect(None)  # Where the plugin manifests are stored; `None` to always scan and import plugins
 
 plugin_ies = Indirect({})
 plugin_pps = Indirect({})
@@ -31,6 +32,7 @@ def __repr__(self, /):
 IN_CLI = Indirect(False)
 LAZY_EXTRACTORS = Indirect(None)  # `False`=force, `None`=disabled, `True`=enabled
 WINDOWS_VT_MODE = Indirect(False if os.name == 'nt' else None)
+profiler = Indirect(None)  # The active utils._profiling.Profiler, if any
 
 # JS Runtimes
 # If adding support for another runtime, register it here to allow `js_runtimes` option to accept it.
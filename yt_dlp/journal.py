@@ -0,0 +1,116 @@
+import errno
+import json
+import threading
+
+from .utils import locked_file
+
+
+class JobJournal:
+    """Append-only journal of a run, used to resume it after a crash
+
+    Each line of the journal file is a JSON object with one of the types:
+      - url:        `url` was started
+      - url_done:   All entries of `url` were processed
+      - entry:      Entry `index` of `playlist` was processed (downloaded or skipped)
+      - downloaded: Video `id` was downloaded to `filepath`, but not yet post-processed.
+                    Playlist entries of such videos are not recorded, so that they are processed again
+      - done:       Video `id` was downloaded and post-processed
+
+    A partially written last line (e.g. if the process was killed) is ignored.
+    The file is kept open and locked from the first record until the journal is closed
+    """
+
+    def __init__(self, ydl, filename):
+        self._ydl, self.filename = ydl, filename
+        self.urls_done = set()
+        self.done = set()
+        self.pending = {}
+        self._entries = {}
+        self._partial_line = False
+        self._file = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with locked_file(self.filename, 'r', encoding='utf-8') as f:
+                data = f.read()
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return
+
+        lines = data.splitlines()
+        self._partial_line = bool(data) and not data.endswith('\n')
+        for line in lines:
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                self._ydl.report_warning(f'Ignoring invalid line in job journal: {line!r}')
+
+        if lines:
+            self._ydl.to_screen(
+                f'[resume] Loaded job journal: {len(self.urls_done)} URLs and {len(self.done)} videos completed, '
+                f'{len(self.pending)} pending post-processing')
+
+    def _apply(self, record):
+        type_ = record['type']
+        if type_ == 'url_done':
+            self.urls_done.add(record['url'])
+        elif type_ == 'entry':
+            self._entries.setdefault(record['playlist'], set()).add(record['index'])
+        elif type_ == 'downloaded':
+            self.pending[record['id']] = record.get('filepath')
+        elif type_ == 'done':
+            self.done.add(record['id'])
+            self.pending.pop(record['id'], None)
+
+    def _write(self, type_, **data):
+        with self._lock:
+            if self._file is None:
+                self._file = locked_file(self.filename, 'a', encoding='utf-8').open()
+                if self._partial_line:
+                    # Terminate the line left by an interrupted write
+                    self._file.write('\n')
+                    self._partial_line = False
+            self._file.write(json.dumps({'type': type_, **data}) + '\n')
+            # Each record must survive a crash
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def is_url_done(self, url):
+        return url in self.urls_done
+
+    def is_entry_done(self, playlist, index):
+        return index in self._entries.get(playlist, ())
+
+    def is_done(self, video_id):
+        return video_id in self.done
+
+    def is_pending(self, video_id):
+        return video_id in self.pending
+
+    def record_url(self, url):
+        self._write('url', url=url)
+
+    def record_url_done(self, url):
+        self.urls_done.add(url)
+        self._write('url_done', url=url)
+
+    def record_entry(self, playlist, index):
+        self._entries.setdefault(playlist, set()).add(index)
+        self._write('entry', playlist=playlist, index=index)
+
+    def record_downloaded(self, video_id, filepath):
+        self.pending[video_id] = filepath
+        self._write('downloaded', id=video_id, filepath=filepath)
+
+    def record_done(self, video_id):
+        self.done.add(video_id)
+        self.pending.pop(video_id, None)
+        self._write('done', id=video_id)
@@ -1,4 +1,6 @@
 # flake8: noqa: F401
+import functools
+import importlib
 import warnings
 
 from .common import (
@@ -16,23 +18,22 @@
 from . import _urllib
 from ..utils import bug_reports_message
 
-try:
-    from . import _requests
-except ImportError:
-    pass
-except Exception as e:
-    warnings.warn(f'Failed to import "requests" request handler: {e}' + bug_reports_message())
+# Request handlers that need optional dependencies are only imported when a request director is built
+_OPTIONAL_REQUEST_HANDLERS = {
+    '_requests': 'requests',
+    '_websockets': 'websockets',
+    '_curlcffi': 'curl_cffi',
+    '_h2': 'h2',
+}
 
-try:
-    from . import _websockets
-except ImportError:
-    pass
-except Exception as e:
-    warnings.warn(f'Failed to import "websockets" request handler: {e}' + bug_reports_message())
 
-try:
-    from . import _curlcffi
-except ImportError:
-    pass
-except Exception as e:
-    warnings.warn(f'Failed to import "curl_cffi" request handler: {e}' + bug_reports_message())
+@functools.cache
+def _load_request_handlers():
+    """Import the optional request handlers, which register themselves in common._REQUEST_HANDLERS"""
+    for module, name in _OPTIONAL_REQUEST_HANDLERS.items():
+        try:
+            importlib.import_module(f'.{module}', __name__)
+        except ImportError:
+            pass
+        except Exception as e:
+            warnings.warn(f'Failed to import "{name}" request handler: {e}' + bug_reports_message())
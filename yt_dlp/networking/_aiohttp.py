@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import itertools
+import urllib.parse
+import urllib.request
+import urllib.response
+
+from ._helper import add_accept_encoding_header, get_redirect_method
+from .asynchronous import AsyncRequestHandler, AsyncResponse, register_async_rh
+from .common import Features, register_preference
+from .exceptions import (
+    CertificateVerifyError,
+    HTTPError,
+    ProxyError,
+    SSLError,
+    TransportError,
+    UnsupportedRequest,
+)
+from ..dependencies import brotli
+from ..utils import int_or_none
+from ..utils.networking import normalize_url, select_proxy
+
+# Not in dependencies, since it is slow to import and only used by the AsyncRequestDirector
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+if aiohttp is None:
+    raise ImportError('aiohttp is not installed')
+
+aiohttp_version = tuple(map(int_or_none, aiohttp.__version__.split('.')[:2]))
+if aiohttp_version < (3, 9):
+    raise ImportError(f'Only aiohttp >= 3.9 is supported (aiohttp {aiohttp.__version__} is installed)')
+
+import yarl  # noqa: E402  # a dependency of aiohttp
+
+# aiohttp decodes these itself
+SUPPORTED_ENCODINGS = ['gzip', 'deflate']
+
+if brotli is not None:
+    SUPPORTED_ENCODINGS.append('br')
+
+
+class AiohttpResponseAdapter(AsyncResponse):
+    def __init__(self, res: aiohttp.ClientResponse):
+        super().__init__(url=str(res.url), headers=res.headers, status=res.status, reason=res.reason)
+        self._res = res
+
+    async def _read(self, amt):
+        try:
+            data = await self._res.content.read(-1 if amt is None else amt)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+            # ClientPayloadError is raised for incomplete or malformed bodies
+            self.close()
+            raise TransportError(cause=e) from e
+        if self._res.content.at_eof():
+            self.close()
+        return data
+
+    def close(self):
+        if not self.closed:
+            # A fully read response can return its connection to the pool
+            if self._res.content.at_eof():
+                self._res.release()
+            else:
+                self._res.close()
+        super().close()
+
+
+@register_async_rh
+class AiohttpRH(AsyncRequestHandler):
+
+    """aiohttp RequestHandler
+    https://github.com/aio-libs/aiohttp
+
+    Sends requests asynchronously, for use with an AsyncRequestDirector.
+    A session with its own connection pool is used for each event loop.
+    """
+    _SUPPORTED_URL_SCHEMES = ('http', 'https')
+    _SUPPORTED_PROXY_SCHEMES = ('http',)
+    _SUPPORTED_FEATURES = (Features.NO_PROXY, Features.ALL_PROXY)
+    RH_NAME = 'aiohttp'
+    _MAX_REDIRECTS = 10
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sessions = {}
+
+    def _check_extensions(self, extensions):
+        super()._check_extensions(extensions)
+        extensions.pop('cookiejar', None)
+        extensions.pop('timeout', None)
+        extensions.pop('legacy_ssl', None)
+
+    def _validate(self, request):
+        super()._validate(request)
+        # aiohttp only accepts asynchronous iterables
+        if request.data is not None and not isinstance(request.data, (bytes, io.IOBase)):
+            raise UnsupportedRequest('Iterable request data is not supported')
+
+    def _get_session(self, legacy_ssl_support):
+        loop = asyncio.get_running_loop()
+        for key in [key for key in self._sessions if key[0].is_closed()]:
+            del self._sessions[key]
+        session = self._sessions.get((loop, legacy_ssl_support))
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=self._make_sslcontext(legacy_ssl_support=legacy_ssl_support),
+                local_addr=(self.source_address, 0) if self.source_address else None)
+            # Cookies are handled with the cookiejar of the request instead
+            session = self._sessions[(loop, legacy_ssl_support)] = aiohttp.ClientSession(
+                connector=connector, cookie_jar=aiohttp.DummyCookieJar(),
+                skip_auto_headers=('User-Agent',), trust_env=False)
+        return session
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        for key, session in list(self._sessions.items()):
+            # Sessions can only be closed from their own event loop
+            if key[0] is loop:
+                await session.close()
+                del self._sessions[key]
+        self.close()
+
+    def _prepare_headers(self, _, headers):
+        add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
+
+    async def _request(self, session, method, url, headers, data, cookiejar, timeout, proxy):
+        headers = dict(headers)
+        if 'Cookie' not in headers:
+            cookie_header = cookiejar.get_cookie_header(url)
+            if cookie_header:
+                headers['Cookie'] = cookie_header
+
+        res = await session.request(
+            method, yarl.URL(url, encoded=True), headers=headers, data=data, proxy=proxy,
+            allow_redirects=False, timeout=aiohttp.ClientTimeout(sock_connect=timeout, sock_read=timeout))
+        res = AiohttpResponseAdapter(res)
+        cookiejar.extract_cookies(
+            urllib.response.addinfourl(io.BytesIO(), res.headers, url), urllib.request.Request(url))
+        return res
+
+    async def _send(self, request):
+        session = self._get_session(request.extensions.get('legacy_ssl', self.legacy_ssl_support))
+        timeout = self._calculate_timeout(request)
+        cookiejar = self._get_cookiejar(request)
+        proxies = self._get_proxies(request)
+        method, url, data = request.method, request.url, request.data
+        headers = self._get_headers(request)
+
+        for redirect_count in itertools.count():
+            try:
+                res = await self._request(
+                    session, method, url, headers, data, cookiejar, timeout, select_proxy(url, proxies))
+            except aiohttp.ClientConnectorCertificateError as e:
+                raise CertificateVerifyError(cause=e) from e
+            except aiohttp.ClientSSLError as e:
+                raise SSLError(cause=e) from e
+            except (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError) as e:
+                raise ProxyError(cause=e) from e
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                raise TransportError(cause=e) from e
+
+            location = res.get_header('Location')
+            if res.status not in (301, 302, 303, 307, 308) or not location:
+                break
+            if redirect_count >= self._MAX_REDIRECTS:
+                raise HTTPError(res, redirect_loop=True)
+            res.close()
+
+            # See RedirectHandler in _urllib
+            remove_headers = ['Cookie']
+            new_method = get_redirect_method(method, res.status)
+            if new_method != method:
+                data = None
+                remove_headers.extend(['Content-Length', 'Content-Type'])
+            headers = {k: v for k, v in headers.items() if k.title() not in remove_headers}
+            method = new_method
+            # aiohttp already decodes headers as UTF-8
+            url = normalize_url(urllib.parse.urljoin(url, location))
+            if urllib.parse.urlparse(url).scheme not in self._SUPPORTED_URL_SCHEMES:
+                raise TransportError(f'Redirect to unsupported url: {url}')
+
+        if not 200 <= res.status < 300:
+            raise HTTPError(res)
+
+        return res
+
+
+@register_preference(AiohttpRH)
+def aiohttp_preference(rh, request):
+    # Prefer sending requests natively over running synchronous handlers in threads
+    return 150
@@ -0,0 +1,243 @@
+"""Incremental decoding of HTTP response bodies with a Content-Encoding"""
+from __future__ import annotations
+
+import io
+import zlib
+
+from ..dependencies import brotli, zstd
+
+# Upper bound on the output of a single decompression step, which keeps memory use bounded
+# regardless of the compression ratio where the decompressor supports it
+DECODE_CHUNK_SIZE = 64 * 1024
+
+SUPPORTED_ENCODINGS = ['gzip', 'deflate']
+CONTENT_DECODE_ERRORS = [zlib.error]
+
+if brotli:
+    SUPPORTED_ENCODINGS.append('br')
+    CONTENT_DECODE_ERRORS.append(brotli.error)
+
+if zstd:
+    SUPPORTED_ENCODINGS.append('zstd')
+    CONTENT_DECODE_ERRORS.append(zstd.ZstdError)
+
+
+class _ZlibDecoder:
+    def __init__(self, wbits):
+        self._obj = zlib.decompressobj(wbits)
+
+    def decompress(self, data):
+        # There may be junk added the end of the stream
+        # We ignore it by only ever decoding a single payload
+        while not self._obj.eof:
+            out = self._obj.decompress(data, DECODE_CHUNK_SIZE)
+            data = self._obj.unconsumed_tail
+            if out:
+                yield out
+            # A full chunk may mean there is more output pending
+            if not data and len(out) < DECODE_CHUNK_SIZE:
+                break
+
+    def flush(self):
+        if not self._obj.eof:
+            yield self._obj.flush()
+            # All input has been decoded without reaching the end of the stream
+            if not self._obj.eof:
+                raise zlib.error('incomplete or truncated stream')
+
+
+class _DeflateDecoder(_ZlibDecoder):
+    # "deflate" is meant to be zlib-wrapped, but some servers send raw deflate data
+    def __init__(self):
+        self._obj = None
+        self._head = b''
+
+    def decompress(self, data):
+        if self._obj is None:
+            self._head += data
+            if len(self._head) < 2:
+                return
+            data, self._head = self._head, None
+            # CMF and FLG of a zlib header: the compression method is 8 and it is a multiple of 31
+            is_zlib = data[0] & 0x0f == 8 and (data[0] << 8 | data[1]) % 31 == 0
+            super().__init__(zlib.MAX_WBITS if is_zlib else -zlib.MAX_WBITS)
+        yield from super().decompress(data)
+
+    def flush(self):
+        if self._obj is None:
+            if self._head:
+                raise zlib.error('incomplete deflate data')
+            return
+        yield from super().flush()
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._obj = brotli.Decompressor()
+        # brotli>=1.2 can limit the output of each step
+        self._can_limit = hasattr(self._obj, 'can_accept_more_data')
+
+    def decompress(self, data):
+        if not self._can_limit:
+            yield self._obj.process(data)
+            return
+        yield self._obj.process(data, output_buffer_limit=DECODE_CHUNK_SIZE)
+        while not self._obj.can_accept_more_data():
+            yield self._obj.process(b'', output_buffer_limit=DECODE_CHUNK_SIZE)
+
+    def flush(self):
+        if hasattr(self._obj, 'finish'):  # brotlicffi
+            yield self._obj.finish()
+            return
+        # Output may still be pending once all input has been processed
+        while self._can_limit and not self._obj.is_finished():
+            out = self._obj.process(b'', output_buffer_limit=DECODE_CHUNK_SIZE)
+            if not out:
+                break
+            yield out
+        if not self._obj.is_finished():
+            raise brotli.error('incomplete brotli data')
+
+
+class _ZstdDecoder:
+    def __init__(self):
+        self._obj = self._new_decompressor()
+
+    @staticmethod
+    def _new_decompressor():
+        if hasattr(zstd.ZstdDecompressor, 'decompressobj'):  # zstandard
+            return zstd.ZstdDecompressor().decompressobj()
+        return zstd.ZstdDecompressor()
+
+    def _decompress(self, data):
+        if isinstance(self._obj, zstd.ZstdDecompressor):
+            # compression.zstd decompressors limit their output like zlib
+            out = self._obj.decompress(data, DECODE_CHUNK_SIZE)
+            while out:
+                yield out
+                if self._obj.eof or self._obj.needs_input:
+                    break
+                out = self._obj.decompress(b'', DECODE_CHUNK_SIZE)
+        else:
+            yield self._obj.decompress(data)
+
+    def decompress(self, data):
+        while data:
+            if self._obj.eof:
+                # The content may consist of multiple frames
+                self._obj = self._new_decompressor()
+            yield from self._decompress(data)
+            data = self._obj.unused_data if self._obj.eof else b''
+
+    def flush(self):
+        if not self._obj.eof:
+            raise zstd.ZstdError('incomplete zstd data')
+        return ()
+
+
+_DECODERS = {
+    'gzip': lambda: _ZlibDecoder(zlib.MAX_WBITS | 16),
+    'x-gzip': lambda: _ZlibDecoder(zlib.MAX_WBITS | 16),
+    'deflate': _DeflateDecoder,
+    'br': brotli and _BrotliDecoder,
+    'zstd': zstd and _ZstdDecoder,
+}
+
+
+class ContentDecoder(io.RawIOBase):
+    """
+    Decodes a response body as it is read.
+
+    @param fp: file-like object with the encoded body. Closed once the body has been read.
+    @param encodings: content encodings in the order they were applied.
+
+    bytes_read and bytes_decoded are the number of encoded bytes read from fp and decoded bytes produced.
+    """
+
+    def __init__(self, fp, encodings):
+        self.fp = fp
+        self._decoders = [_DECODERS[encoding]() for encoding in reversed(encodings)]
+        self._pending = iter(())
+        self._buffer = memoryview(b'')
+        self._eof = False
+        self.bytes_read = 0
+        self.bytes_decoded = 0
+
+    def readable(self):
+        return True
+
+    def _decode(self, data):
+        # Lazily pipe data through the decoders, so that each only holds one chunk of output at a time
+        pieces = (data,) if data else ()
+        for decoder in self._decoders:
+            # An empty body (e.g. of a HEAD request) is not an incomplete one
+            pieces = _chain_decoder(decoder, pieces, finish=not data and self.bytes_read)
+        return pieces
+
+    def _fill_buffer(self):
+        while not self._buffer:
+            piece = next(self._pending, None)
+            if piece is not None:
+                self._buffer = memoryview(piece)
+                continue
+            if self._eof:
+                return False
+            data = self.fp.read(DECODE_CHUNK_SIZE)
+            self.bytes_read += len(data)
+            self._eof = not data
+            self._pending = iter(self._decode(data))
+        return True
+
+    def read(self, size=-1):
+        # io.RawIOBase.read does not accept None
+        return super().read(-1 if size is None else size)
+
+    def readinto(self, b):
+        with memoryview(b) as mv, mv.cast('B') as view:
+            n = 0
+            # Like http.client, only return less than requested at the end of the body
+            while n < len(view) and self._fill_buffer():
+                size = min(len(view) - n, len(self._buffer))
+                view[n:n + size] = self._buffer[:size]
+                self._buffer = self._buffer[size:]
+                n += size
+            self.bytes_decoded += n
+            if not n and len(view):
+                self.close()
+            return n
+
+    def readall(self):
+        chunks = []
+        while self._fill_buffer():
+            chunks.append(self._buffer)
+            self._buffer = memoryview(b'')
+        data = b''.join(chunks)
+        self.bytes_decoded += len(data)
+        self.close()
+        return data
+
+    def close(self):
+        if not self.closed:
+            self.fp.close()
+        super().close()
+
+
+def _chain_decoder(decoder, pieces, finish):
+    for piece in pieces:
+        if piece:
+            yield from decoder.decompress(piece)
+    if finish:
+        yield from decoder.flush()
+
+
+def get_content_decoder(fp, content_encoding):
+    """
+    Wrap fp in a ContentDecoder for the given Content-Encoding header value.
+    Returns None if there is nothing to decode, or an encoding is not supported.
+    """
+    # Content-Encoding header lists the encodings in order that they were applied [1].
+    # 1. https://datatracker.ietf.org/doc/html/rfc9110#name-content-encoding
+    encodings = [e for e in (e.strip().lower() for e in (content_encoding or '').split(',')) if e and e != 'identity']
+    if not encodings or not all(_DECODERS.get(encoding) for encoding in encodings):
+        return None
+    return ContentDecoder(fp, encodings)
@@ -45,42 +45,86 @@ class CurlCFFIResponseReader(io.IOBase):
     def __init__(self, response: curl_cffi.requests.Response):
         self._response = response
         self._iterator = response.iter_content()
-        self._buffer = b''
+        # Data is only ever removed from the front, which bytearray does without moving the rest
+        self._buffer = bytearray()
         self.bytes_read = 0
 
     def readable(self):
         return True
 
+    def _next_chunk(self):
+        chunk = next(self._iterator, None)
+        if chunk is None:
+            self._iterator = None
+        else:
+            self.bytes_read += len(chunk)
+        return chunk
+
+    def _close_if_exhausted(self):
+        # "free" the curl instance if the response is fully read.
+        # curl_cffi doesn't do this automatically and only allows one open response per thread
+        if not self._iterator and not self._buffer:
+            self.close()
+
     def read(self, size=None):
         exception_raised = True
         try:
-            while self._iterator and (size is None or len(self._buffer) < size):
-                chunk = next(self._iterator, None)
-                if chunk is None:
-                    self._iterator = None
-                    break
-                self._buffer += chunk
-                self.bytes_read += len(chunk)
-
-            if size is None:
-                size = len(self._buffer)
-            data = self._buffer[:size]
-            self._buffer = self._buffer[size:]
-
-            # "free" the curl instance if the response is fully read.
-            # curl_cffi doesn't do this automatically and only allows one open response per thread
-            if not self._iterator and not self._buffer:
-                self.close()
+            if size is None or size < 0:
+                chunks = [self._buffer]
+                while self._iterator:
+                    chunks.append(self._next_chunk() or b'')
+                self._buffer = bytearray()
+                data = b''.join(chunks)
+
+            else:
+                chunk = self._next_chunk() if size and not self._buffer and self._iterator else None
+                if chunk and len(chunk) >= size:
+                    # The chunk is large enough to serve the read by itself
+                    self._buffer += memoryview(chunk)[size:]
+                    data = chunk[:size]
+                else:
+                    self._buffer += chunk or b''
+                    while self._iterator and len(self._buffer) < size:
+                        self._buffer += self._next_chunk() or b''
+                    with memoryview(self._buffer) as view, view[:size] as part:
+                        data = part.tobytes()
+                    del self._buffer[:size]
+
+            self._close_if_exhausted()
             exception_raised = False
             return data
         finally:
             if exception_raised:
                 self.close()
 
+    def readinto(self, buffer):
+        exception_raised = True
+        try:
+            with memoryview(buffer) as mv, mv.cast('B') as view:
+                size = min(len(self._buffer), len(view))
+                with memoryview(self._buffer) as src, src[:size] as part:
+                    view[:size] = part
+                del self._buffer[:size]
+
+                # Copy the chunks straight into the given buffer, keeping only what does not fit
+                while self._iterator and size < len(view):
+                    chunk = self._next_chunk() or b''
+                    n = min(len(chunk), len(view) - size)
+                    view[size:size + n] = memoryview(chunk)[:n]
+                    self._buffer += memoryview(chunk)[n:]
+                    size += n
+
+            self._close_if_exhausted()
+            exception_raised = False
+            return size
+        finally:
+            if exception_raised:
+                self.close()
+
     def close(self):
         if not self.closed:
             self._response.close()
-            self._buffer = b''
+            self._buffer = bytearray()
         super().close()
 
 
@@ -96,8 +140,14 @@ def __init__(self, response: curl_cffi.requests.Response):
             reason=response.reason)
 
     def read(self, amt=None):
+        return self._read(self.fp.read, amt)
+
+    def readinto(self, b):
+        return self._read(self.fp.readinto, b)
+
+    def _read(self, read_func, arg):
         try:
-            res = self.fp.read(amt)
+            res = read_func(arg)
             if self.fp.closed:
                 self.close()
             return res
@@ -228,6 +278,11 @@ class CurlCFFIRH(ImpersonateRequestHandler, InstanceStoreMixin):
     def _create_instance(self, cookiejar=None):
         return curl_cffi.requests.Session(cookies=cookiejar)
 
+    def _evict_instance(self, session):
+        # A streamed response is still performed on the session's curl handle, which closing would free.
+        # The handle is freed when the session is garbage collected instead
+        pass
+
     def _check_extensions(self, extensions):
         super()._check_extensions(extensions)
         extensions.pop('impersonate', None)
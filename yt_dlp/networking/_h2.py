@@ -0,0 +1,575 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import io
+import itertools
+import queue
+import selectors
+import socket
+import ssl
+import threading
+import urllib.parse
+import urllib.request
+import urllib.response
+from email.message import Message
+
+from ._content_decoding import (
+    CONTENT_DECODE_ERRORS,
+    SUPPORTED_ENCODINGS,
+    ContentDecoder,
+    get_content_decoder,
+)
+from ._helper import (
+    InstanceStoreMixin,
+    add_accept_encoding_header,
+    create_connection,
+    get_redirect_method,
+)
+from .common import (
+    Features,
+    RequestHandler,
+    Response,
+    register_preference,
+    register_rh,
+)
+from .exceptions import (
+    CertificateVerifyError,
+    HTTPError,
+    IncompleteRead,
+    SSLError,
+    TransportError,
+    UnsupportedRequest,
+)
+from ..dependencies import h2
+from ..utils import int_or_none
+from ..utils.networking import HTTPHeaderDict, normalize_url
+
+if h2 is None:
+    raise ImportError('h2 is not installed')
+
+h2_version = tuple(map(int_or_none, h2.__version__.split('.')[:2]))
+if h2_version < (4, 0):
+    h2._yt_dlp__version = f'{h2.__version__} (unsupported)'
+    raise ImportError('Only h2>=4.0 is supported')
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+import h2.settings
+
+# Receive windows. Data is buffered until the response is read, so these also bound memory use per stream
+STREAM_WINDOW_SIZE = 4 * 1024 * 1024
+CONNECTION_WINDOW_SIZE = 16 * 1024 * 1024
+# Used until the server announces its own limit, and as an upper bound on it
+MAX_CONCURRENT_STREAMS = 100
+
+# Connection-specific header fields are not allowed in HTTP/2
+# https://datatracker.ietf.org/doc/html/rfc9113#section-8.2.2
+_CONNECTION_HEADERS = frozenset(('connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade', 'te'))
+
+
+def _iter_body(data):
+    if data is None:
+        return
+    if isinstance(data, bytes):
+        yield data
+    elif isinstance(data, io.IOBase):
+        yield from iter(lambda: data.read(1 << 16), b'')
+    else:
+        yield from data
+
+
+class H2Stream:
+    """One request/response exchange on a H2ClientConnection"""
+
+    def __init__(self, connection, stream_id):
+        self.connection = connection
+        self.stream_id = stream_id
+        # Receives h2 events for this stream, or an exception if the connection failed
+        self.events = queue.Queue()
+
+    def next_event(self, timeout):
+        try:
+            event = self.events.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError('timed out waiting for HTTP/2 stream') from None
+        if isinstance(event, Exception):
+            raise TransportError(cause=event) from event
+        if isinstance(event, h2.events.StreamReset):
+            raise TransportError(f'HTTP/2 stream reset by server (error code {event.error_code!r})')
+        return event
+
+    def close(self):
+        self.connection.close_stream(self)
+
+
+class H2ClientConnection:
+    """
+    A HTTP/2 connection shared between concurrent requests.
+
+    A background thread does all socket I/O: request threads only update the h2 state machine
+    under a lock and wake it up to send the resulting frames, so a TLS socket is never used from two threads.
+    """
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._lock = threading.Lock()
+        self._window_updated = threading.Condition(self._lock)
+        self._streams = {}
+        self._closing = False
+        self._error = None
+        # Set once no new streams may be opened, e.g. after the server sent GOAWAY
+        self._exhausted = False
+
+        self._conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=True, header_encoding=None))
+        self._conn.local_settings = h2.settings.Settings(client=True, initial_values={
+            h2.settings.SettingCodes.ENABLE_PUSH: 0,
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: STREAM_WINDOW_SIZE,
+        })
+        # Some servers reject the connection if this setting is sent
+        del self._conn.local_settings[h2.settings.SettingCodes.ENABLE_CONNECT_PROTOCOL]
+        self._conn.initiate_connection()
+        self._conn.increment_flow_control_window(CONNECTION_WINDOW_SIZE - self._conn.inbound_flow_control_window)
+
+        # The server's settings are awaited first, so that its stream limit is known before any requests
+        events = []
+        self._sock.sendall(self._conn.data_to_send())
+        while not any(isinstance(event, h2.events.RemoteSettingsChanged) for event in events):
+            data = self._sock.recv(1 << 16)
+            if not data:
+                raise ConnectionError('connection closed by server during HTTP/2 setup')
+            events.extend(self._conn.receive_data(data))
+
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_w.setblocking(False)
+        self._thread = threading.Thread(target=self._run, name='h2-connection', daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self):
+        return self._closing or self._error is not None
+
+    def _wakeup(self):
+        with contextlib.suppress(BlockingIOError, OSError):
+            self._wakeup_w.send(b'\0')
+
+    def open_stream(self, headers, end_stream):
+        """Start a request. Returns None if the connection cannot take another stream"""
+        with self._lock:
+            if (
+                self.closed or self._exhausted
+                or self._conn.open_outbound_streams >= min(
+                    self._conn.remote_settings.max_concurrent_streams, MAX_CONCURRENT_STREAMS)
+            ):
+                return None
+            try:
+                stream_id = self._conn.get_next_available_stream_id()
+            except h2.exceptions.NoAvailableStreamIDError:
+                self._exhausted = True
+                return None
+            stream = self._streams[stream_id] = H2Stream(self, stream_id)
+            self._conn.send_headers(stream_id, headers, end_stream=end_stream)
+        self._wakeup()
+        return stream
+
+    def send_body(self, stream, data, timeout):
+        for chunk in _iter_body(data):
+            view = memoryview(chunk).cast('B')
+            while view:
+                with self._window_updated:
+                    if self._error is not None:
+                        raise TransportError(cause=self._error) from self._error
+                    size = min(
+                        len(view), self._conn.max_outbound_frame_size,
+                        self._conn.local_flow_control_window(stream.stream_id))
+                    if size <= 0:
+                        if not self._window_updated.wait(timeout):
+                            raise TimeoutError('timed out waiting for HTTP/2 flow control window')
+                        continue
+                    self._conn.send_data(stream.stream_id, view[:size].tobytes())
+                self._wakeup()
+                view = view[size:]
+        with self._lock:
+            self._conn.end_stream(stream.stream_id)
+        self._wakeup()
+
+    def acknowledge(self, stream, size):
+        """Give flow control window for read data back to the server"""
+        if not size:
+            return
+        with self._lock:
+            if self._error is not None:
+                return
+            self._conn.acknowledge_received_data(size, stream.stream_id)
+        self._wakeup()
+
+    def close_stream(self, stream):
+        with self._lock:
+            if self.closed:
+                return
+            # Release the flow control window of any data that was not read
+            unread = 0
+            with contextlib.suppress(queue.Empty):
+                while True:
+                    event = stream.events.get_nowait()
+                    if isinstance(event, h2.events.DataReceived):
+                        unread += event.flow_controlled_length
+            with contextlib.suppress(h2.exceptions.H2Error):
+                if unread:
+                    self._conn.acknowledge_received_data(unread, stream.stream_id)
+                # Cancel the stream if the response has not ended yet
+                if self._streams.pop(stream.stream_id, None) is not None:
+                    self._conn.reset_stream(stream.stream_id, h2.errors.ErrorCodes.CANCEL)
+        self._wakeup()
+
+    def close(self):
+        with self._lock:
+            self._closing = True
+        self._wakeup()
+
+    def _flush(self):
+        with self._lock:
+            data = self._conn.data_to_send()
+        if data:
+            self._sock.sendall(data)
+
+    def _run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._sock, selectors.EVENT_READ)
+        selector.register(self._wakeup_r, selectors.EVENT_READ)
+        try:
+            while True:
+                self._flush()
+                if self._closing:
+                    with self._lock:
+                        self._conn.close_connection()
+                    self._flush()
+                    raise ConnectionError('connection closed')
+                # Decrypted data may already be buffered in the TLS socket
+                if not self._sock.pending():
+                    ready = {key.fileobj for key, _ in selector.select()}
+                    if self._wakeup_r in ready:
+                        self._wakeup_r.recv(1 << 12)
+                    if self._sock not in ready:
+                        continue
+                data = self._sock.recv(1 << 16)
+                if not data:
+                    raise ConnectionError('connection closed by server')
+                with self._lock:
+                    self._handle_events(self._conn.receive_data(data))
+        except Exception as e:
+            self._fail(e)
+        finally:
+            selector.close()
+            for sock in (self._sock, self._wakeup_r, self._wakeup_w):
+                sock.close()
+
+    def _handle_events(self, events):
+        for event in events:
+            if isinstance(event, (
+                h2.events.ResponseReceived, h2.events.DataReceived,
+                h2.events.StreamEnded, h2.events.StreamReset,
+            )):
+                stream = self._streams.get(event.stream_id)
+                if stream is not None:
+                    stream.events.put(event)
+                elif isinstance(event, h2.events.DataReceived):
+                    # The stream was already closed, nobody is going to read this
+                    self._conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                if isinstance(event, (h2.events.StreamEnded, h2.events.StreamReset)):
+                    self._streams.pop(event.stream_id, None)
+
+            elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+                self._window_updated.notify_all()
+
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self._exhausted = True
+                # Streams the server has not seen will never get a response
+                error = ConnectionError(f'connection terminated by server (error code {event.error_code!r})')
+                for stream_id in [i for i in self._streams if i > (event.last_stream_id or 0)]:
+                    self._streams.pop(stream_id).events.put(error)
+
+    def _fail(self, error):
+        with self._lock:
+            self._error = error
+            streams, self._streams = self._streams, {}
+            self._window_updated.notify_all()
+        for stream in streams.values():
+            stream.events.put(error)
+
+
+class H2ConnectionPool:
+    """Keeps one HTTP/2 connection per host, only opening another once the server's stream limit is reached"""
+
+    def __init__(self, ssl_context, source_address=None):
+        self._ssl_context = ssl_context
+        self._source_address = source_address
+        self._connections = collections.defaultdict(list)
+        self._host_locks = collections.defaultdict(threading.Lock)
+        # Hosts that did not negotiate HTTP/2, which are left to the other request handlers
+        self._http1_hosts = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self, host, port, timeout):
+        sock = create_connection(
+            (host, port), timeout=timeout,
+            source_address=(self._source_address, 0) if self._source_address else None)
+        try:
+            sock = self._ssl_context.wrap_socket(sock, server_hostname=host)
+            if sock.selected_alpn_protocol() != 'h2':
+                with self._lock:
+                    self._http1_hosts.add((host, port))
+                raise UnsupportedRequest(f'{host} does not support HTTP/2')
+            return H2ClientConnection(sock)
+        except BaseException:
+            sock.close()
+            raise
+
+    def open_stream(self, host, port, headers, end_stream, timeout):
+        key = (host, port)
+        with self._lock:
+            host_lock = self._host_locks[key]
+        # Only one connection to a host is set up at a time, so that concurrent requests share it
+        with host_lock:
+            with self._lock:
+                if key in self._http1_hosts:
+                    raise UnsupportedRequest(f'{host} does not support HTTP/2')
+                connections = self._connections[key] = [c for c in self._connections[key] if not c.closed]
+            for connection in connections:
+                stream = connection.open_stream(headers, end_stream)
+                if stream is not None:
+                    return stream
+
+            connection = self._connect(host, port, timeout)
+            with self._lock:
+                if self._closed:
+                    connection.close()
+                    raise TransportError('connection pool is closed')
+                self._connections[key].append(connection)
+            stream = connection.open_stream(headers, end_stream)
+            if stream is None:
+                raise TransportError(f'{host} did not accept a HTTP/2 stream')
+            return stream
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, collections.defaultdict(list)
+        for connection in connections.values():
+            for conn in connection:
+                conn.close()
+
+
+class H2ResponseReader(io.RawIOBase):
+    def __init__(self, stream: H2Stream, timeout, expected_length=None):
+        self._stream = stream
+        self._timeout = timeout
+        self._expected_length = expected_length
+        self._buffer = memoryview(b'')
+        self._eof = False
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    @property
+    def exhausted(self):
+        return self._eof and not self._buffer
+
+    def readinto(self, b):
+        with memoryview(b) as mv, mv.cast('B') as view:
+            while not self._buffer:
+                if self._eof or not view:
+                    return 0
+                event = self._stream.next_event(self._timeout)
+                if isinstance(event, h2.events.DataReceived):
+                    self._buffer = memoryview(event.data)
+                    self.bytes_read += len(event.data)
+                    self._stream.connection.acknowledge(self._stream, event.flow_controlled_length)
+                elif isinstance(event, h2.events.StreamEnded):
+                    self._eof = True
+                    self._stream.close()
+                    if self._expected_length is not None and self.bytes_read < self._expected_length:
+                        raise IncompleteRead(partial=self.bytes_read, expected=self._expected_length)
+            n = min(len(view), len(self._buffer))
+            view[:n] = self._buffer[:n]
+            self._buffer = self._buffer[n:]
+            return n
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+
+class H2ResponseAdapter(Response):
+    def __init__(self, reader: H2ResponseReader, url, headers, status):
+        decoder = get_content_decoder(reader, headers.get('Content-Encoding'))
+        super().__init__(
+            fp=decoder or io.BufferedReader(reader), url=url, headers=headers, status=status,
+            extensions={'content_decoder': decoder} if decoder else None)
+
+    def read(self, amt=None):
+        if self.closed:
+            return b''
+        return self._read(self.fp.read, amt)
+
+    def readinto(self, b):
+        if self.closed:
+            return 0
+        return self._read(self.fp.readinto, b)
+
+    def _read(self, read_func, arg):
+        try:
+            data = read_func(arg)
+            if self._fully_read():
+                self.close()
+            return data
+        except ssl.SSLError as e:
+            raise SSLError(cause=e) from e
+        except (OSError, h2.exceptions.H2Error, *CONTENT_DECODE_ERRORS) as e:
+            raise TransportError(cause=e) from e
+
+    def _fully_read(self):
+        if isinstance(self.fp, ContentDecoder):
+            # Decoded responses close themselves once fully read
+            return self.fp.closed
+        # Nothing is left to read if the stream ended and the buffered reader is empty
+        return self.fp.raw.exhausted and not self.fp.peek(1)
+
+
+@register_rh
+class H2RH(RequestHandler, InstanceStoreMixin):
+
+    """HTTP/2 RequestHandler
+    https://github.com/python-hyper/h2
+
+    Concurrent requests to a host are multiplexed as streams over a single connection.
+    This is only preferred for requests with the `multiplex` extension, such as fragment downloads.
+    Requests to hosts that do not negotiate HTTP/2 are left to the other request handlers.
+    """
+    _SUPPORTED_URL_SCHEMES = ('https',)
+    _SUPPORTED_PROXY_SCHEMES = ()
+    _SUPPORTED_FEATURES = (Features.NO_PROXY, Features.ALL_PROXY)
+    RH_NAME = 'h2'
+    _MAX_REDIRECTS = 10
+
+    def _check_extensions(self, extensions):
+        super()._check_extensions(extensions)
+        extensions.pop('cookiejar', None)
+        extensions.pop('timeout', None)
+        extensions.pop('legacy_ssl', None)
+
+    def _create_instance(self, legacy_ssl_support=None):
+        context = self._make_sslcontext(legacy_ssl_support=legacy_ssl_support)
+        context.set_alpn_protocols(['h2', 'http/1.1'])
+        return H2ConnectionPool(context, self.source_address)
+
+    def close(self):
+        self._clear_instances()
+
+    def _prepare_headers(self, _, headers):
+        add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
+
+    def _build_headers(self, method, url, headers, data):
+        parsed = urllib.parse.urlparse(url)
+        h2_headers = [
+            (':method', method),
+            (':scheme', 'https'),
+            (':authority', headers.pop('Host', None) or parsed.netloc),
+            (':path', (parsed.path or '/') + (f'?{parsed.query}' if parsed.query else '')),
+        ]
+        if isinstance(data, bytes) and 'Content-Length' not in headers:
+            headers['Content-Length'] = str(len(data))
+        h2_headers.extend(
+            (name.lower(), value) for name, value in headers.items() if name.lower() not in _CONNECTION_HEADERS)
+        return [(name.encode('latin-1'), value.encode('latin-1')) for name, value in h2_headers]
+
+    def _request(self, pool, method, url, headers, data, cookiejar, timeout):
+        headers = HTTPHeaderDict(headers)
+        if 'Cookie' not in headers:
+            cookie_header = cookiejar.get_cookie_header(url)
+            if cookie_header:
+                headers['Cookie'] = cookie_header
+
+        parsed = urllib.parse.urlparse(url)
+        stream = pool.open_stream(
+            parsed.hostname, parsed.port or 443, self._build_headers(method, url, headers, data),
+            end_stream=data is None, timeout=timeout)
+        try:
+            if data is not None:
+                stream.connection.send_body(stream, data, timeout)
+            event = stream.next_event(timeout)
+            while not isinstance(event, h2.events.ResponseReceived):
+                # A response without headers cannot be used
+                event = stream.next_event(timeout)
+        except BaseException:
+            stream.close()
+            raise
+
+        status, res_headers = None, Message()
+        for name, value in event.headers:
+            name, value = name.decode('latin-1'), value.decode('latin-1')
+            if name == ':status':
+                status = int(value)
+            elif not name.startswith(':'):
+                res_headers.add_header(name, value)
+
+        expected_length = None
+        if method != 'HEAD' and status not in (204, 304):
+            expected_length = int_or_none(res_headers.get('Content-Length'))
+        res = H2ResponseAdapter(
+            H2ResponseReader(stream, timeout, expected_length), url=url, headers=res_headers, status=status)
+        cookiejar.extract_cookies(
+            urllib.response.addinfourl(io.BytesIO(), res.headers, url), urllib.request.Request(url))
+        return res
+
+    def _send(self, request):
+        pool = self._get_instance(legacy_ssl_support=request.extensions.get('legacy_ssl'))
+        timeout = self._calculate_timeout(request)
+        cookiejar = self._get_cookiejar(request)
+        method, url, data = request.method, request.url, request.data
+        headers = self._get_headers(request)
+
+        for redirect_count in itertools.count():
+            try:
+                res = self._request(pool, method, url, headers, data, cookiejar, timeout)
+            except ssl.SSLCertVerificationError as e:
+                raise CertificateVerifyError(cause=e) from e
+            except ssl.SSLError as e:
+                raise SSLError(cause=e) from e
+            except (OSError, h2.exceptions.H2Error) as e:
+                raise TransportError(cause=e) from e
+
+            location = res.get_header('Location')
+            if res.status not in (301, 302, 303, 307, 308) or not location:
+                break
+            if redirect_count >= self._MAX_REDIRECTS:
+                raise HTTPError(res, redirect_loop=True)
+            res.close()
+
+            # See RedirectHandler in _urllib
+            remove_headers = ['Cookie']
+            new_method = get_redirect_method(method, res.status)
+            if new_method != method:
+                data = None
+                remove_headers.extend(['Content-Length', 'Content-Type'])
+            headers = {k: v for k, v in headers.items() if k.title() not in remove_headers}
+            method = new_method
+            url = normalize_url(urllib.parse.urljoin(url, location.encode('latin-1').decode()))
+            if urllib.parse.urlparse(url).scheme != 'https':
+                raise TransportError(f'Redirect to unsupported url: {url}')
+
+        if not 200 <= res.status < 300:
+            raise HTTPError(res)
+
+        return res
+
+
+@register_preference(H2RH)
+def h2_preference(rh, request):
+    return 200 if request.extensions.get('multiplex') else -200
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import collections
 import contextlib
 import functools
+import itertools
 import os
+import queue
 import socket
 import ssl
 import sys
+import threading
+import time
 import typing
 import urllib.parse
 import urllib.request
@@ -154,9 +159,41 @@ def make_ssl_context(
     return context
 
 
+class _UnhashableValue:
+    # Only ever equal to an equal value, as it was before instances were looked up by hash
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, _UnhashableValue) and self.value == other.value
+
+    def __hash__(self):
+        return 0
+
+
+def _make_instance_key(value):
+    if isinstance(value, dict):
+        return dict, frozenset((k, _make_instance_key(v)) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        return type(value), tuple(map(_make_instance_key, value))
+    elif isinstance(value, (set, frozenset)):
+        return frozenset, frozenset(map(_make_instance_key, value))
+    try:
+        hash(value)
+    except TypeError:
+        return _UnhashableValue(value)
+    return value
+
+
 class InstanceStoreMixin:
+    # The least recently used instances are evicted once there are more than _MAX_INSTANCES,
+    # or when they have not been used for _INSTANCE_IDLE_TIMEOUT seconds
+    _MAX_INSTANCES = 16
+    _INSTANCE_IDLE_TIMEOUT = 600
+
     def __init__(self, **kwargs):
-        self.__instances = []
+        self.__instances = collections.OrderedDict()
+        self.__lock = threading.Lock()
         super().__init__(**kwargs)  # So that both MRO works
 
     @staticmethod
@@ -164,22 +201,40 @@ def _create_instance(**kwargs):
         raise NotImplementedError
 
     def _get_instance(self, **kwargs):
-        for key, instance in self.__instances:
-            if key == kwargs:
-                return instance
-
-        instance = self._create_instance(**kwargs)
-        self.__instances.append((kwargs, instance))
+        key = _make_instance_key(kwargs)
+        now = time.monotonic()
+        with self.__lock:
+            instance, _ = self.__instances.pop(key, (None, None))
+            if instance is None:
+                instance = self._create_instance(**kwargs)
+            self.__instances[key] = instance, now
+
+            evicted = []
+            while len(self.__instances) > 1:
+                oldest_key, (oldest, last_used) = next(iter(self.__instances.items()))
+                if len(self.__instances) <= self._MAX_INSTANCES and now - last_used < self._INSTANCE_IDLE_TIMEOUT:
+                    break
+                del self.__instances[oldest_key]
+                evicted.append(oldest)
+
+        for evicted_instance in evicted:
+            self._evict_instance(evicted_instance)
         return instance
 
     def _close_instance(self, instance):
         if callable(getattr(instance, 'close', None)):
             instance.close()
 
+    def _evict_instance(self, instance):
+        # Responses may still be reading from an evicted instance.
+        # Override this if closing the instance would break them
+        self._close_instance(instance)
+
     def _clear_instances(self):
-        for _, instance in self.__instances:
+        with self.__lock:
+            instances, self.__instances = self.__instances, collections.OrderedDict()
+        for instance, _ in instances.values():
             self._close_instance(instance)
-        self.__instances.clear()
 
 
 def add_accept_encoding_header(headers: HTTPHeaderDict, supported_encodings: Iterable[str]):
@@ -232,6 +287,100 @@ def create_socks_proxy_socket(dest_addr, proxy_args, proxy_ip_addr, timeout, sou
         raise
 
 
+# getaddrinfo() does not tell the TTL of the records, so the results are kept for a fixed time
+DNS_CACHE_TTL = 60
+DNS_CACHE_SIZE = 256
+_dns_cache = collections.OrderedDict()
+_dns_cache_lock = threading.Lock()
+
+
+def cached_getaddrinfo(host, port):
+    key = (host, port)
+    with _dns_cache_lock:
+        expires, ip_addrs = _dns_cache.get(key, (0, None))
+        if expires > time.monotonic():
+            _dns_cache.move_to_end(key)
+            return ip_addrs
+
+    ip_addrs = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    with _dns_cache_lock:
+        _dns_cache[key] = (time.monotonic() + DNS_CACHE_TTL, ip_addrs)
+        _dns_cache.move_to_end(key)
+        while len(_dns_cache) > DNS_CACHE_SIZE:
+            _dns_cache.popitem(last=False)
+    return ip_addrs
+
+
+def _evict_getaddrinfo(host, port):
+    with _dns_cache_lock:
+        _dns_cache.pop((host, port), None)
+
+
+# The "Connection Attempt Delay" recommended by RFC 8305
+CONNECTION_ATTEMPT_DELAY = 0.25
+
+
+def _interleave_address_families(ip_addrs):
+    # Alternate between the address families, starting with the family of the first address (RFC 8305, Section 4)
+    families = {}
+    for ip_addr in ip_addrs:
+        families.setdefault(ip_addr[0], []).append(ip_addr)
+    return [ip_addr for ip_addr in itertools.chain.from_iterable(
+        itertools.zip_longest(*families.values())) if ip_addr is not None]
+
+
+def _connect_staggered(ip_addrs, timeout, source_address, create_socket_func):
+    """Connect to the first address that accepts the connection
+
+    An attempt for the next address is started when the previous attempt fails or has not
+    succeeded within CONNECTION_ATTEMPT_DELAY, without stopping the attempts already running
+    """
+    results = queue.Queue()
+    lock = threading.Lock()
+    done = False
+
+    def attempt(ip_addr):
+        try:
+            result = create_socket_func(ip_addr, timeout, source_address), None
+        except Exception as e:
+            result = None, e
+        with lock:
+            if not done:
+                results.put(result)
+            elif result[0] is not None:
+                result[0].close()
+
+    remaining = collections.deque(ip_addrs)
+    pending = 0
+    while True:
+        if remaining:
+            threading.Thread(target=attempt, args=(remaining.popleft(),), daemon=True).start()
+            pending += 1
+        try:
+            sock, err = results.get(timeout=CONNECTION_ATTEMPT_DELAY if remaining else None)
+        except queue.Empty:
+            continue
+        pending -= 1
+
+        if sock is not None:
+            with lock:
+                done = True
+            # Close the sockets of attempts that have also succeeded by now
+            while not results.empty():
+                other_sock, _ = results.get()
+                if other_sock is not None:
+                    other_sock.close()
+            return sock
+
+        if not pending and not remaining:
+            try:
+                raise err
+            finally:
+                # Explicitly break __traceback__ reference cycle
+                # https://bugs.python.org/issue36820
+                err = None
+
+
 def create_connection(
     address,
     timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
@@ -243,7 +392,7 @@ def create_connection(
     # This filters the addresses based on the given source_address.
     # Based on: https://github.com/python/cpython/blob/main/Lib/socket.py#L810
     host, port = address
-    ip_addrs = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    ip_addrs = cached_getaddrinfo(host, port)
     if not ip_addrs:
         raise OSError('getaddrinfo returns an empty list')
     if source_address is not None:
@@ -254,20 +403,14 @@ def create_connection(
                 f'No remote IPv{4 if af == socket.AF_INET else 6} addresses available for connect. '
                 f'Can\'t use "{source_address[0]}" as source address')
 
-    err = None
-    for ip_addr in ip_addrs:
-        try:
-            sock = _create_socket_func(ip_addr, timeout, source_address)
-            # Explicitly break __traceback__ reference cycle
-            # https://bugs.python.org/issue36820
-            err = None
-            return sock
-        except OSError as e:
-            err = e
-
     try:
-        raise err
-    finally:
-        # Explicitly break __traceback__ reference cycle
-        # https://bugs.python.org/issue36820
-        err = None
+        if len(ip_addrs) == 1:
+            return _create_socket_func(ip_addrs[0], timeout, source_address)
+        # Race the connections to the addresses (Happy Eyeballs, RFC 8305),
+        # so that an unreachable address does not hold up the connection for the whole timeout
+        return _connect_staggered(
+            _interleave_address_families(ip_addrs), timeout, source_address, _create_socket_func)
+    except OSError:
+        # The addresses may have changed
+        _evict_getaddrinfo(host, port)
+        raise
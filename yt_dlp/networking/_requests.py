@@ -6,7 +6,7 @@
 import re
 import warnings
 
-from ..dependencies import brotli, requests, urllib3
+from ..dependencies import requests, urllib3
 from ..utils import bug_reports_message, int_or_none, variadic
 from ..utils.networking import normalize_url, select_proxy
 
@@ -56,15 +56,14 @@
     SSLError,
     TransportError,
 )
+from ._content_decoding import (
+    CONTENT_DECODE_ERRORS,
+    SUPPORTED_ENCODINGS,
+    ContentDecoder,
+    get_content_decoder,
+)
 from ..socks import ProxyError as SocksProxyError
 
-SUPPORTED_ENCODINGS = [
-    'gzip', 'deflate',
-]
-
-if brotli is not None:
-    SUPPORTED_ENCODINGS.append('br')
-
 '''
 Override urllib3's behavior to not convert lower-case percent-encoded characters
 to upper-case during url normalization process.
@@ -113,13 +112,19 @@ def subn(self, repl, string, *args, **kwargs):
 
 class RequestsResponseAdapter(Response):
     def __init__(self, res: requests.models.Response):
+        # Decode the content ourselves, so that it is streamed in bounded chunks for every encoding
+        res.raw.decode_content = False
+        decoder = get_content_decoder(res.raw, res.headers.get('Content-Encoding'))
         super().__init__(
-            fp=res.raw, headers=res.headers, url=res.url,
-            status=res.status_code, reason=res.reason)
+            fp=decoder or res.raw, headers=res.headers, url=res.url,
+            status=res.status_code, reason=res.reason,
+            extensions={'content_decoder': decoder} if decoder else None)
 
         self._requests_response = res
 
     def _real_read(self, amt: int | None = None) -> bytes:
+        if isinstance(self.fp, ContentDecoder):
+            return self.fp.read(amt)
         # Work around issue with `.read(amt)` then `.read()`
         # See: https://github.com/urllib3/urllib3/issues/3636
         if amt is None:
@@ -129,9 +134,24 @@ def _real_read(self, amt: int | None = None) -> bytes:
         # Interact with urllib3 response directly.
         return self.fp.read(amt, decode_content=True)
 
+    def _real_readinto(self, b) -> int:
+        if isinstance(self.fp, ContentDecoder):
+            return self.fp.readinto(b)
+        # urllib3 only decodes the content in read()
+        with memoryview(b) as mv, mv.cast('B') as view:
+            data = self.fp.read(len(view), decode_content=True)
+            view[:len(data)] = data
+        return len(data)
+
     def read(self, amt: int | None = None):
+        return self._read(self._real_read, amt)
+
+    def readinto(self, b):
+        return self._read(self._real_readinto, b)
+
+    def _read(self, read_func, arg):
         try:
-            data = self._real_read(amt)
+            data = read_func(arg)
             if self.fp.closed:
                 self.close()
             return data
@@ -156,6 +176,9 @@ def read(self, amt: int | None = None):
             # catch-all for any other urllib3 response exceptions
             raise TransportError(cause=e) from e
 
+        except tuple(CONTENT_DECODE_ERRORS) as e:
+            raise TransportError(cause=e) from e
+
 
 class RequestsHTTPAdapter(requests.adapters.HTTPAdapter):
     def __init__(self, ssl_context=None, proxy_ssl_context=None, source_address=None, **kwargs):
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import collections
 import functools
 import http.client
 import io
+import select
+import socket
 import ssl
+import threading
+import time
 import urllib.error
 import urllib.parse
 import urllib.request
 import urllib.response
-import zlib
 from urllib.request import (
     DataHandler,
     FileHandler,
@@ -19,6 +23,12 @@
     UnknownHandler,
 )
 
+from ._content_decoding import (
+    CONTENT_DECODE_ERRORS,
+    SUPPORTED_ENCODINGS,
+    ContentDecoder,
+    get_content_decoder,
+)
 from ._helper import (
     InstanceStoreMixin,
     add_accept_encoding_header,
@@ -37,18 +47,10 @@
     SSLError,
     TransportError,
 )
-from ..dependencies import brotli
 from ..socks import ProxyError as SocksProxyError
 from ..utils import update_url_query
 from ..utils.networking import normalize_url, select_proxy
 
-SUPPORTED_ENCODINGS = ['gzip', 'deflate']
-CONTENT_DECODE_ERRORS = [zlib.error, OSError]
-
-if brotli:
-    SUPPORTED_ENCODINGS.append('br')
-    CONTENT_DECODE_ERRORS.append(brotli.error)
-
 
 def _create_http_connection(http_class, source_address, *args, **kwargs):
     hc = http_class(*args, **kwargs)
@@ -62,12 +64,95 @@ def _create_http_connection(http_class, source_address, *args, **kwargs):
     return hc
 
 
+class _PooledHTTPResponse(http.client.HTTPResponse):
+    """HTTPResponse that hands its connection back to the pool once the body has been read"""
+    _release_conn = None
+    _closing = False
+
+    def close(self):
+        self._closing = True
+        super().close()
+
+    def _close_conn(self):
+        super()._close_conn()
+        release_conn, self._release_conn = self._release_conn, None
+        if release_conn:
+            # When closed early, the rest of the body is still pending on the connection.
+            # A chunked body is only fully read when the last chunk was read
+            release_conn(self.length == 0 or (self.chunked and not self._closing))
+
+
+def _is_connection_dropped(sock):
+    # An idle connection has nothing to read unless the server has closed it
+    try:
+        if hasattr(select, 'poll'):
+            poller = select.poll()
+            poller.register(sock, select.POLLIN)
+            return bool(poller.poll(0))
+        return bool(select.select([sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+class HTTPConnectionPool:
+    """Idle keep-alive connections, keyed by where they are connected to
+
+    Only up to MAX_IDLE_PER_HOST connections are kept for each key,
+    and a connection is closed once it has been idle for IDLE_TIMEOUT seconds.
+    """
+    MAX_IDLE_PER_HOST = 10
+    IDLE_TIMEOUT = 15
+
+    def __init__(self):
+        self._idle = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                # The most recently used connection is the least likely to have been closed by the server
+                conn, released = idle.pop()
+                if time.monotonic() - released < self.IDLE_TIMEOUT and not _is_connection_dropped(conn.sock):
+                    return conn
+                conn.close()
+        return None
+
+    def release(self, key, conn):
+        if not conn.sock:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._closed:
+                conn.close()
+                return
+            for idle_key, idle in list(self._idle.items()):
+                while idle and now - idle[0][1] >= self.IDLE_TIMEOUT:
+                    idle.popleft()[0].close()
+                if not idle and idle_key != key:
+                    del self._idle[idle_key]
+            idle = self._idle[key]
+            if len(idle) >= self.MAX_IDLE_PER_HOST:
+                idle.popleft()[0].close()
+            idle.append((conn, now))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, collections.defaultdict(collections.deque)
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+
 class HTTPHandler(urllib.request.AbstractHTTPHandler):
     """Handler for HTTP requests and responses.
 
     This class, when installed with an OpenerDirector, automatically adds
-    the standard headers to every HTTP request and handles gzipped, deflated and
-    brotli responses from web servers.
+    the standard headers to every HTTP request and decodes gzipped, deflated,
+    brotli and zstd responses from web servers as they are read. Connections
+    are kept alive and reused for later requests to the same host.
 
     Part of this code was copied from:
 
@@ -81,6 +166,7 @@ def __init__(self, context=None, source_address=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._source_address = source_address
         self._context = context
+        self._pool = HTTPConnectionPool()
 
     @staticmethod
     def _make_conn_class(base, req):
@@ -91,39 +177,88 @@ def _make_conn_class(base, req):
         return conn_class
 
     def http_open(self, req):
-        conn_class = self._make_conn_class(http.client.HTTPConnection, req)
-        return self.do_open(functools.partial(
-            _create_http_connection, conn_class, self._source_address), req)
+        return self._open(http.client.HTTPConnection, req)
 
     def https_open(self, req):
-        conn_class = self._make_conn_class(http.client.HTTPSConnection, req)
-        return self.do_open(
-            functools.partial(
-                _create_http_connection, conn_class, self._source_address),
-            req, context=self._context)
+        return self._open(http.client.HTTPSConnection, req, context=self._context)
 
-    @staticmethod
-    def deflate(data):
-        if not data:
-            return data
+    def _open(self, base, req, **http_conn_args):
+        socks_proxy = req.headers.get('Ytdl-socks-proxy')
+        conn_class = self._make_conn_class(base, req)
+        return self.do_open(
+            functools.partial(_create_http_connection, conn_class, self._source_address),
+            req, pool_key=(base, socks_proxy), **http_conn_args)
+
+    def do_open(self, http_class, req, pool_key=None, **http_conn_args):
+        """Return an HTTPResponse for the request, reusing an idle connection if there is one
+
+        Based on AbstractHTTPHandler.do_open from CPython, which closes the connection after each request.
+        """
+        host = req.host
+        if not host:
+            raise urllib.error.URLError('no host given')
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items() if k not in headers})
+        headers = {name.title(): val for name, val in headers.items()}
+
+        tunnel_headers = {}
+        if req._tunnel_host and 'Proxy-Authorization' in headers:
+            # Proxy-Authorization should not be sent to origin server
+            tunnel_headers['Proxy-Authorization'] = headers.pop('Proxy-Authorization')
+        key = (pool_key, host, req._tunnel_host, tuple(tunnel_headers.items()))
+
+        conn = self._pool.acquire(key)
+        if conn is not None:
+            timeout = req.timeout
+            if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+                timeout = socket.getdefaulttimeout()
+            conn.sock.settimeout(timeout)
+            try:
+                return self._request(conn, req, headers, key)
+            except (urllib.error.URLError, ConnectionError) as e:
+                # The server may have closed the connection just as it was reused.
+                # The request can only be sent again if its data has not been consumed
+                reason = e.reason if isinstance(e, urllib.error.URLError) else e
+                if not isinstance(reason, (ConnectionResetError, BrokenPipeError)):
+                    raise
+                if req.data is not None and not isinstance(req.data, bytes):
+                    raise
+
+        conn = http_class(host, timeout=req.timeout, **http_conn_args)
+        conn.set_debuglevel(self._debuglevel)
+        if req._tunnel_host:
+            conn.set_tunnel(req._tunnel_host, headers=tunnel_headers)
+        return self._request(conn, req, headers, key)
+
+    def _request(self, conn, req, headers, key):
+        conn.response_class = _PooledHTTPResponse
         try:
-            return zlib.decompress(data, -zlib.MAX_WBITS)
-        except zlib.error:
-            return zlib.decompress(data)
-
-    @staticmethod
-    def brotli(data):
-        if not data:
-            return data
-        return brotli.decompress(data)
-
-    @staticmethod
-    def gz(data):
-        # There may be junk added the end of the file
-        # We ignore it by only ever decoding a single gzip payload
-        if not data:
-            return data
-        return zlib.decompress(data, wbits=zlib.MAX_WBITS | 16)
+            try:
+                conn.request(req.get_method(), req.selector, req.data, headers,
+                             encode_chunked=req.has_header('Transfer-encoding'))
+            except OSError as err:  # timeout error
+                raise urllib.error.URLError(err)
+            r = conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+        if not r.will_close:
+            def release_conn(reusable):
+                if reusable:
+                    self._pool.release(key, conn)
+                else:
+                    conn.close()
+            r._release_conn = release_conn
+
+        r.url = req.get_full_url()
+        # urllib clients expect the response to have the reason in .msg
+        r.msg = r.reason
+        return r
+
+    def close(self):
+        self._pool.close()
 
     def http_request(self, req):
         # According to RFC 3986, URLs can not contain non-ASCII characters, however this is not
@@ -146,20 +281,10 @@ def http_request(self, req):
     def http_response(self, req, resp):
         old_resp = resp
 
-        # Content-Encoding header lists the encodings in order that they were applied [1].
-        # To decompress, we simply do the reverse.
-        # [1]: https://datatracker.ietf.org/doc/html/rfc9110#name-content-encoding
-        decoded_response = None
-        for encoding in (e.strip() for e in reversed(resp.headers.get('Content-encoding', '').split(','))):
-            if encoding == 'gzip':
-                decoded_response = self.gz(decoded_response or resp.read())
-            elif encoding == 'deflate':
-                decoded_response = self.deflate(decoded_response or resp.read())
-            elif encoding == 'br' and brotli:
-                decoded_response = self.brotli(decoded_response or resp.read())
-
-        if decoded_response is not None:
-            resp = urllib.request.addinfourl(io.BytesIO(decoded_response), old_resp.headers, old_resp.url, old_resp.code)
+        # The body is decoded as it is read
+        decoder = get_content_decoder(resp, resp.headers.get('Content-encoding'))
+        if decoder is not None:
+            resp = urllib.request.addinfourl(decoder, old_resp.headers, old_resp.url, old_resp.code)
             resp.msg = old_resp.msg
         # Percent-encode redirect URL of Location HTTP header to satisfy RFC 3986 (see
         # https://github.com/ytdl-org/youtube-dl/issues/6457).
@@ -300,37 +425,56 @@ def __init__(self, res: http.client.HTTPResponse | urllib.response.addinfourl):
         # HTTPResponse: .getcode() was deprecated, .status always existed [2]
         # 1. https://docs.python.org/3/library/urllib.request.html#urllib.response.addinfourl.getcode
         # 2. https://docs.python.org/3.10/library/http.client.html#http.client.HTTPResponse.status
+        decoder = getattr(res, 'fp', None)
         super().__init__(
             fp=res, headers=res.headers, url=res.url,
-            status=getattr(res, 'status', None) or res.getcode(), reason=getattr(res, 'reason', None))
+            status=getattr(res, 'status', None) or res.getcode(), reason=getattr(res, 'reason', None),
+            extensions={'content_decoder': decoder} if isinstance(decoder, ContentDecoder) else None)
 
     def read(self, amt=None):
         if self.closed:
             return b''
         try:
             data = self.fp.read(amt)
-            underlying = getattr(self.fp, 'fp', None)
-            if isinstance(self.fp, http.client.HTTPResponse) and underlying is None:
-                # http.client.HTTPResponse automatically closes itself when fully read
-                self.close()
-            elif isinstance(self.fp, urllib.response.addinfourl) and underlying is not None:
-                # urllib's addinfourl does not close the underlying fp automatically when fully read
-                if isinstance(underlying, io.BytesIO):
-                    # data URLs or in-memory responses (e.g. gzip/deflate/brotli decoded)
-                    if underlying.tell() >= len(underlying.getbuffer()):
-                        self.close()
-                elif isinstance(underlying, io.BufferedReader) and amt is None:
-                    # file URLs.
-                    # XXX: this will not mark the response as closed if it was fully read with amt.
-                    self.close()
-            elif underlying is not None and underlying.closed:
-                # Catch-all for any cases where underlying file is closed
-                self.close()
+            self._close_if_fully_read(amt is None)
             return data
         except Exception as e:
             handle_response_read_exceptions(e)
             raise e
 
+    def readinto(self, b):
+        if self.closed:
+            return 0
+        try:
+            n = self.fp.readinto(b)
+            self._close_if_fully_read(not n and len(b))
+            return n
+        except Exception as e:
+            handle_response_read_exceptions(e)
+            raise e
+
+    def _close_if_fully_read(self, at_eof):
+        underlying = getattr(self.fp, 'fp', None)
+        if isinstance(self.fp, http.client.HTTPResponse) and underlying is None:
+            # http.client.HTTPResponse automatically closes itself when fully read
+            self.close()
+        elif isinstance(self.fp, urllib.response.addinfourl) and underlying is not None:
+            # urllib's addinfourl does not close the underlying fp automatically when fully read
+            if isinstance(underlying, io.BytesIO):
+                # data URLs
+                if underlying.tell() >= len(underlying.getbuffer()):
+                    self.close()
+            elif isinstance(underlying, io.BufferedReader) and at_eof:
+                # file URLs.
+                # XXX: this will not mark the response as closed if it was fully read with amt.
+                self.close()
+            elif underlying.closed:
+                # e.g. decoded responses, which close themselves when fully read
+                self.close()
+        elif underlying is not None and underlying.closed:
+            # Catch-all for any cases where underlying file is closed
+            self.close()
+
 
 def handle_sslerror(e: ssl.SSLError):
     if not isinstance(e, ssl.SSLError):
@@ -398,6 +542,13 @@ def _create_instance(self, proxies, cookiejar, legacy_ssl_support=None):
         opener.addheaders = []
         return opener
 
+    def _close_instance(self, opener):
+        for handler in opener.handlers:
+            handler.close()
+
+    def close(self):
+        self._clear_instances()
+
     def _prepare_headers(self, _, headers):
         add_accept_encoding_header(headers, SUPPORTED_ENCODINGS)
 
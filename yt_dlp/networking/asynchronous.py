@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import functools
+import importlib
+import warnings
+from email.message import Message
+from http import HTTPStatus
+
+from .common import Request, RequestDirector, RequestHandler, Response
+from .exceptions import (
+    HTTPError,
+    NoSupportingHandlers,
+    RequestError,
+    UnsupportedRequest,
+)
+from ..utils import bug_reports_message, error_to_str
+
+
+class AsyncResponse(abc.ABC):
+    """
+    Base class for responses of asynchronous request handlers.
+
+    Counterpart of Response with a body that is read with `await response.read()`.
+    Closing is not awaited, so that an HTTPError can close its response.
+
+    @param url: URL that this is a response of.
+    @param headers: response headers.
+    @param status: Response HTTP status code. Default is 200 OK.
+    @param reason: HTTP status reason. Will use built-in reasons based on status code if not provided.
+    @param extensions: Dictionary of handler-specific response extensions.
+    """
+
+    def __init__(self, url, headers, status=200, reason=None, extensions=None):
+        self.headers = Message()
+        for name, value in headers.items():
+            self.headers.add_header(name, value)
+        self.status = status
+        self.url = url
+        try:
+            self.reason = reason or HTTPStatus(status).phrase
+        except ValueError:
+            self.reason = None
+        self.extensions = extensions or {}
+        self.closed = False
+
+    async def read(self, amt: int | None = None) -> bytes:
+        if self.closed:
+            return b''
+        return await self._read(amt)
+
+    @abc.abstractmethod
+    async def _read(self, amt: int | None) -> bytes:
+        """Read up to amt bytes of the body, or all of it if amt is None. Redefine in subclasses."""
+
+    def close(self):
+        self.closed = True
+
+    get_header = Response.get_header
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+
+class SyncResponseAdapter(AsyncResponse):
+    """AsyncResponse for a Response of a synchronous RequestHandler, which is read in a thread"""
+
+    def __init__(self, response: Response):
+        super().__init__(
+            url=response.url, headers=response.headers, status=response.status,
+            reason=response.reason, extensions=response.extensions)
+        self.response = response
+
+    async def _read(self, amt):
+        data = await asyncio.to_thread(self.response.read, amt)
+        if self.response.closed:
+            self.closed = True
+        return data
+
+    def close(self):
+        self.response.close()
+        super().close()
+
+
+class AsyncRequestHandler(RequestHandler):
+    """
+    Request handler that sends requests asynchronously, for use with an AsyncRequestDirector.
+
+    Concrete subclasses need to redefine the `async def _send(request)` method,
+    which handles the underlying request logic and returns an AsyncResponse.
+    Otherwise, these are configured and validate requests like a RequestHandler.
+
+    Async request handlers should be registered with register_async_rh.
+    """
+
+    async def send(self, request: Request) -> AsyncResponse:
+        if not isinstance(request, Request):
+            raise TypeError('Expected an instance of Request')
+        try:
+            return await self._send(request)
+        except RequestError as e:
+            if e.handler is None:
+                e.handler = self
+            raise
+
+    @abc.abstractmethod
+    async def _send(self, request: Request):
+        """Handle a request from start to finish. Redefine in subclasses."""
+
+    async def aclose(self):
+        """Close the handler. Subclasses with resources that are closed asynchronously should redefine this."""
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+
+class AsyncRequestDirector:
+    """
+    Asynchronous counterpart of RequestDirector.
+
+    Requests are sent with `await director.send(request)`, so many requests can be
+    in flight concurrently on a single event loop.
+
+    Handlers may be AsyncRequestHandlers, or synchronous RequestHandlers, which send
+    requests and read responses in a thread. Responses are always an AsyncResponse,
+    and so is the response of an HTTPError.
+
+    Preference functions are used as with RequestDirector.
+    The cache and hedging of RequestDirector are not available,
+    so the `http_cache` and `hedge` extensions are ignored.
+
+    @param logger: Logger instance.
+    @param verbose: Print debug request information to stdout.
+    """
+
+    def __init__(self, logger, verbose=False):
+        self.handlers: dict[str, RequestHandler] = {}
+        self.preferences = set()
+        self.logger = logger
+        self.verbose = verbose
+
+    async def aclose(self):
+        for handler in self.handlers.values():
+            if isinstance(handler, AsyncRequestHandler):
+                await handler.aclose()
+            else:
+                handler.close()
+        self.handlers.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    add_handler = RequestDirector.add_handler
+    _get_handlers = RequestDirector._get_handlers
+    _print_verbose = RequestDirector._print_verbose
+
+    @staticmethod
+    async def _send_sync(handler: RequestHandler, request: Request) -> AsyncResponse:
+        try:
+            return SyncResponseAdapter(await asyncio.to_thread(handler.send, request))
+        except HTTPError as e:
+            e.response = SyncResponseAdapter(e.response)
+            raise
+
+    async def send(self, request: Request) -> AsyncResponse:
+        """
+        Passes a request onto a suitable RequestHandler
+        """
+        if not self.handlers:
+            raise RequestError('No request handlers configured')
+
+        assert isinstance(request, Request)
+
+        if any(extension in request.extensions for extension in RequestDirector._DIRECTOR_EXTENSIONS):
+            request = request.copy()
+            for extension in RequestDirector._DIRECTOR_EXTENSIONS:
+                request.extensions.pop(extension, None)
+
+        unexpected_errors = []
+        unsupported_errors = []
+        for handler in self._get_handlers(request):
+            self._print_verbose(f'Checking if "{handler.RH_NAME}" supports this request.')
+            try:
+                handler.validate(request)
+            except UnsupportedRequest as e:
+                self._print_verbose(
+                    f'"{handler.RH_NAME}" cannot handle this request (reason: {error_to_str(e)})')
+                unsupported_errors.append(e)
+                continue
+
+            self._print_verbose(f'Sending request via "{handler.RH_NAME}"')
+            try:
+                if isinstance(handler, AsyncRequestHandler):
+                    response = await handler.send(request)
+                else:
+                    response = await self._send_sync(handler, request)
+            except UnsupportedRequest as e:
+                self._print_verbose(
+                    f'"{handler.RH_NAME}" cannot handle this request (reason: {error_to_str(e)})')
+                unsupported_errors.append(e)
+                continue
+            except RequestError:
+                raise
+            except Exception as e:
+                self.logger.error(
+                    f'[{handler.RH_NAME}] Unexpected error: {error_to_str(e)}{bug_reports_message()}',
+                    is_error=False)
+                unexpected_errors.append(e)
+                continue
+
+            assert isinstance(response, AsyncResponse)
+            return response
+
+        raise NoSupportingHandlers(unsupported_errors, unexpected_errors)
+
+
+_ASYNC_REQUEST_HANDLERS = {}
+
+# Only imported when an AsyncRequestDirector is built, since they are not used otherwise
+_OPTIONAL_ASYNC_REQUEST_HANDLERS = {
+    '_aiohttp': 'aiohttp',
+}
+
+
+@functools.cache
+def _load_async_request_handlers():
+    """Import the optional async request handlers, which register themselves in _ASYNC_REQUEST_HANDLERS"""
+    for module, name in _OPTIONAL_ASYNC_REQUEST_HANDLERS.items():
+        try:
+            importlib.import_module(f'.{module}', __package__)
+        except ImportError:
+            pass
+        except Exception as e:
+            warnings.warn(f'Failed to import "{name}" request handler: {e}' + bug_reports_message())
+
+
+def register_async_rh(handler):
+    """Register an AsyncRequestHandler class"""
+    assert issubclass(handler, AsyncRequestHandler), f'{handler} must be a subclass of AsyncRequestHandler'
+    assert handler.RH_KEY not in _ASYNC_REQUEST_HANDLERS, f'RequestHandler {handler.RH_KEY} already registered'
+    _ASYNC_REQUEST_HANDLERS[handler.RH_KEY] = handler
+    return handler
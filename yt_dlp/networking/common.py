@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import abc
+import collections
 import copy
 import enum
 import functools
 import io
+import queue
+import threading
+import time
 import typing
 import urllib.parse
 import urllib.request
@@ -16,6 +20,7 @@
 
 from ._helper import make_ssl_context, wrap_request_errors
 from .exceptions import (
+    HTTPError,
     NoSupportingHandlers,
     RequestError,
     TransportError,
@@ -59,13 +64,39 @@ class RequestDirector:
 
     @param logger: Logger instance.
     @param verbose: Print debug request information to stdout.
+    @param cache: HTTPCache instance (see http_cache), to cache responses in the filesystem.
+    @param hedge_delay: Seconds to wait for a response to a request with the `hedge` extension
+        before sending a duplicate of it, or "auto" to use the 95th percentile of recent latencies.
+        The first successful response is used, and the other is closed. None to disable hedging.
+    @param hedge_ratio: Maximum ratio of duplicate requests to requests with the `hedge` extension.
+
+    The following extensions are handled by the RequestDirector,
+    and are removed before a request is passed onto a RequestHandler:
+    - http_cache: False to not use the cache for this request.
+    - hedge: True if the request is idempotent and may be hedged. Only requests
+       without data or with bytes data can be hedged, since the data is sent twice.
     """
 
-    def __init__(self, logger, verbose=False):
+    _DIRECTOR_EXTENSIONS = ('http_cache', 'hedge')
+    # Used for automatic hedge delays
+    _HEDGE_PERCENTILE = 0.95
+    _HEDGE_MIN_SAMPLES = 10
+    _HEDGE_FALLBACK_DELAY = 1.0
+
+    def __init__(
+            self, logger, verbose=False, cache: HTTPCache | None = None,
+            hedge_delay: float | str | None = None, hedge_ratio: float = 0.1):
         self.handlers: dict[str, RequestHandler] = {}
         self.preferences: set[Preference] = set()
         self.logger = logger  # TODO(Grub4k): default logger
         self.verbose = verbose
+        self.cache = cache
+        self.hedge_delay = hedge_delay
+        self.hedge_ratio = hedge_ratio
+        self._hedge_lock = threading.Lock()
+        self._hedge_latencies = collections.deque(maxlen=100)
+        self._hedgeable_requests = 0
+        self._hedged_requests = 0
 
     def close(self):
         for handler in self.handlers.values():
@@ -100,6 +131,134 @@ def send(self, request: Request) -> Response:
 
         assert isinstance(request, Request)
 
+        extensions = {}
+        if any(extension in request.extensions for extension in self._DIRECTOR_EXTENSIONS):
+            request = request.copy()
+            extensions = {
+                extension: request.extensions.pop(extension)
+                for extension in self._DIRECTOR_EXTENSIONS if extension in request.extensions}
+
+        send = self._send
+        if (
+            extensions.get('hedge') and self.hedge_delay is not None
+            and isinstance(request.data, (bytes, NoneType))
+        ):
+            send = self._send_hedged
+
+        if self.cache is not None and extensions.get('http_cache', True):
+            response = self.cache.send(request, send, headers=self._get_sent_headers(request))
+            if 'http_cache' in response.extensions:
+                self._print_verbose(f'Response from HTTP cache ({response.extensions["http_cache"]})')
+            return response
+        return send(request)
+
+    def _get_sent_headers(self, request: Request) -> HTTPHeaderDict:
+        """
+        Headers that the preferred handler would send for a request, including the Cookie header.
+        These are merged by the handlers, so the cache needs them to tell apart responses.
+        """
+        for handler in self._get_handlers(request):
+            try:
+                handler.validate(request)
+            except UnsupportedRequest:
+                continue
+            headers = handler._merge_headers(request.headers)
+            if 'Cookie' not in headers:
+                cookie_header = handler._get_cookiejar(request).get_cookie_header(request.url)
+                if cookie_header:
+                    headers['Cookie'] = cookie_header
+            return headers
+        return request.headers
+
+    def _get_hedge_delay(self):
+        if self.hedge_delay != 'auto':
+            return self.hedge_delay
+        with self._hedge_lock:
+            latencies = sorted(self._hedge_latencies)
+        if len(latencies) < self._HEDGE_MIN_SAMPLES:
+            return self._HEDGE_FALLBACK_DELAY
+        return latencies[min(int(len(latencies) * self._HEDGE_PERCENTILE), len(latencies) - 1)]
+
+    def _take_hedge(self):
+        """Whether another duplicate request can be sent without exceeding hedge_ratio"""
+        with self._hedge_lock:
+            # Always allow one, so that hedging works from the first request
+            if self._hedged_requests >= max(1, int(self._hedgeable_requests * self.hedge_ratio)):
+                return False
+            self._hedged_requests += 1
+            return True
+
+    def _send_hedged(self, request: Request) -> Response:
+        results = queue.Queue()
+        lock = threading.Lock()
+        finished = False
+
+        def send(req):
+            # Each request is timed from its own start, so that the hedge delay is not included
+            start = time.monotonic()
+            try:
+                result = self._send(req), None, time.monotonic() - start
+            except Exception as e:
+                result = None, e, None
+            with lock:
+                if not finished:
+                    results.put(result)
+                    return
+            # The other request won
+            self._close_result(result)
+
+        with self._hedge_lock:
+            self._hedgeable_requests += 1
+        delay = self._get_hedge_delay()
+        threading.Thread(target=send, args=(request,), daemon=True).start()
+        pending = 1
+        try:
+            result = results.get(timeout=delay)
+        except queue.Empty:
+            if self._take_hedge():
+                self._print_verbose(f'No response after {delay:.2f}s, sending a duplicate request')
+                threading.Thread(target=send, args=(request.copy(),), daemon=True).start()
+                pending += 1
+            result = results.get()
+
+        errors = []
+        while True:
+            pending -= 1
+            response, error, latency = result
+            if error is None or not pending:
+                break
+            errors.append(error)
+            result = results.get()
+
+        with lock:
+            finished = True
+        # A response that was received at the same time is not used
+        while not results.empty():
+            self._close_result(results.get())
+
+        if response is None:
+            # The first error is raised
+            errors.append(error)
+            error = errors.pop(0)
+        for other_error in errors:
+            # Responses of HTTP errors that are not raised would otherwise be left open
+            if isinstance(other_error, HTTPError):
+                other_error.close()
+        if response is None:
+            raise error
+        with self._hedge_lock:
+            self._hedge_latencies.append(latency)
+        return response
+
+    @staticmethod
+    def _close_result(result):
+        response, error, _ = result
+        if response is not None:
+            response.close()
+        elif isinstance(error, HTTPError):
+            error.close()
+
+    def _send(self, request: Request) -> Response:
         unexpected_errors = []
         unsupported_errors = []
         for handler in self._get_handlers(request):
@@ -115,6 +274,11 @@ def send(self, request: Request) -> Response:
             self._print_verbose(f'Sending request via "{handler.RH_NAME}"')
             try:
                 response = handler.send(request)
+            except UnsupportedRequest as e:
+                self._print_verbose(
+                    f'"{handler.RH_NAME}" cannot handle this request (reason: {error_to_str(e)})')
+                unsupported_errors.append(e)
+                continue
             except RequestError:
                 raise
             except Exception as e:
@@ -165,7 +329,8 @@ class RequestHandler(abc.ABC):
     Any other exception raised will be treated as a handler issue.
 
     If a Request is not supported by the handler, an UnsupportedRequest
-    should be raised with a reason.
+    should be raised with a reason. It may also be raised from _send() if this is only
+    found out while sending, as long as no part of the request has been sent yet.
 
     By default, some checks are done on the request in _validate() based on the following class variables:
     - `_SUPPORTED_URL_SCHEMES`: a tuple of supported url schemes.
@@ -207,7 +372,9 @@ class RequestHandler(abc.ABC):
     - `timeout`: socket timeout to use for this request.
     - `legacy_ssl`: Enable legacy SSL options for this request. See legacy_ssl_support.
     - `keep_header_casing`: Keep the casing of headers when sending the request.
-    To enable these, add extensions.pop('<extension>', None) to _check_extensions
+    - `multiplex`: Hint that this is one of many concurrent requests to the same host (e.g. fragments),
+        which a handler may send over a shared connection. This is accepted by all handlers.
+    To enable the others, add extensions.pop('<extension>', None) to _check_extensions
 
     Apart from the url protocol, proxies dict may contain the following keys:
     - `all`: proxy to use for all protocols. Used as a fallback if no proxy is set for a specific protocol.
@@ -336,6 +503,9 @@ def _check_extensions(self, extensions):
         assert isinstance(extensions.get('timeout'), (float, int, NoneType))
         assert isinstance(extensions.get('legacy_ssl'), (bool, NoneType))
         assert isinstance(extensions.get('keep_header_casing'), (bool, NoneType))
+        assert isinstance(extensions.get('multiplex'), (bool, NoneType))
+        # Only a hint, which handlers that do not multiplex requests can ignore
+        extensions.pop('multiplex', None)
 
     def _validate(self, request):
         self._check_url_scheme(request)
@@ -523,6 +693,10 @@ class Response(io.IOBase):
     @param status: Response HTTP status code. Default is 200 OK.
     @param reason: HTTP status reason. Will use built-in reasons based on status code if not provided.
     @param extensions: Dictionary of handler-specific response extensions.
+
+    The following response extensions are defined:
+    - content_decoder: the ContentDecoder of a response body that is decoded as it is read.
+       Its bytes_read and bytes_decoded are the number of encoded and decoded bytes read so far.
     """
 
     def __init__(
@@ -561,6 +735,13 @@ def read(self, amt: int | None = None) -> bytes:
         except Exception as e:
             raise TransportError(cause=e) from e
 
+    def readinto(self, b) -> int:
+        # Subclasses should redefine this method to read into the buffer without the intermediate bytes
+        with memoryview(b) as mv, mv.cast('B') as view:
+            data = self.read(len(view))
+            view[:len(data)] = data
+        return len(data)
+
     def close(self):
         if not self.fp.closed:
             self.fp.close()
@@ -602,6 +783,8 @@ def getheader(self, name, default=None):
 
 
 if typing.TYPE_CHECKING:
+    from .http_cache import HTTPCache
+
     RequestData = bytes | Iterable[bytes] | typing.IO | None
     Preference = typing.Callable[[RequestHandler, Request], int]
 
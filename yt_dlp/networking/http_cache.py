@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import contextlib
+import email.utils
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import typing
+import urllib.parse
+from email.message import Message
+
+from .common import Request, Response
+from .exceptions import HTTPError
+from ..utils import int_or_none, write_json_file
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from ..utils._utils import _YDLLogger
+
+POLICIES = ('cache', 'revalidate', 'bypass')
+
+# Requests with these headers are left to the caller
+_UNCACHEABLE_REQUEST_HEADERS = (
+    'Authorization', 'Range', 'If-Match', 'If-None-Match', 'If-Modified-Since', 'If-Unmodified-Since', 'If-Range')
+
+# Credentials that are part of the cache key, so that responses are only served for the same ones
+_KEYED_HEADERS = ('Authorization', 'Cookie')
+
+# Headers that do not apply to the decoded body that is stored
+_UNSTORED_HEADERS = ('Content-Encoding', 'Content-Length', 'Transfer-Encoding', 'Connection', 'Set-Cookie')
+
+# Headers that may be updated by a 304 Not Modified response
+_UPDATED_HEADERS = ('Cache-Control', 'Date', 'ETag', 'Expires', 'Last-Modified', 'Age')
+
+
+def _parse_cache_control(value):
+    directives = {}
+    for directive in (value or '').split(','):
+        name, _, value = directive.partition('=')
+        if name.strip():
+            directives[name.strip().lower()] = value.strip().strip('"') or True
+    return directives
+
+
+def _parse_http_date(value):
+    with contextlib.suppress(TypeError, ValueError, IndexError):
+        return email.utils.parsedate_to_datetime(value).timestamp()
+
+
+def _get_all(headers: Message, name):
+    return ', '.join(headers.get_all(name) or [])
+
+
+def _expiry_time(headers: Message, now):
+    """Time until which a response is fresh, according to its headers (RFC 9111 section 4.2)"""
+    cache_control = _parse_cache_control(_get_all(headers, 'Cache-Control'))
+    if 'no-cache' in cache_control:
+        return now
+    age = int_or_none(headers.get('Age')) or 0
+    lifetime = int_or_none(cache_control.get('max-age'))
+    if lifetime is None:
+        expires = _parse_http_date(headers.get('Expires'))
+        if expires is None:
+            # Without explicit freshness, responses are always revalidated
+            return now
+        lifetime = expires - (_parse_http_date(headers.get('Date')) or now)
+    return now + lifetime - age
+
+
+def _message_from_pairs(pairs):
+    headers = Message()
+    for name, value in pairs:
+        headers.add_header(name, value)
+    return headers
+
+
+class HTTPCache:
+    """
+    Filesystem cache of HTTP responses for a RequestDirector.
+
+    Responses are stored with their ETag, Last-Modified and Cache-Control metadata.
+    Fresh responses are served from disk without a request. Stale ones are revalidated
+    with a conditional request, and served from disk if the server replies 304 Not Modified.
+    Only successful responses to GET requests are stored, once their body has been fully read.
+
+    @param directory: Directory to store the responses in.
+    @param max_size: Maximum total size of the stored responses in bytes.
+        The least recently used responses are evicted first.
+        Responses larger than a tenth of this are not stored.
+    @param policies: Dictionary of hostname to policy, which also applies to subdomains:
+        - cache: obey the caching headers of responses (default)
+        - revalidate: revalidate stored responses even when they are fresh
+        - bypass: do not cache responses
+    @param cookies: Whether to cache responses to requests with cookies.
+        These are only served to requests with the same cookies.
+    @param logger: Logger instance.
+
+    Requests with the `http_cache` extension set to False are never cached.
+    Responses from the cache have the `http_cache` extension set to "hit" or "revalidated".
+    """
+
+    def __init__(
+            self, directory, max_size=100 * 1024 * 1024, policies=None, cookies=False,
+            logger: _YDLLogger | None = None):
+        self.directory = directory
+        self.max_size = max_size
+        self.policies = {host.lower(): policy for host, policy in (policies or {}).items()}
+        assert all(policy in POLICIES for policy in self.policies.values()), 'invalid HTTP cache policy'
+        self.cookies = cookies
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    @property
+    def max_entry_size(self):
+        return self.max_size // 10
+
+    def _get_policy(self, url):
+        parts = (urllib.parse.urlparse(url).hostname or '').lower().split('.')
+        for i in range(len(parts)):
+            policy = self.policies.get('.'.join(parts[i:]))
+            if policy:
+                return policy
+        return 'cache'
+
+    def _paths(self, url, headers):
+        key = hashlib.sha256('\n'.join([
+            url, *(f'{name}: {headers[name]}' for name in _KEYED_HEADERS if name in headers),
+        ]).encode()).hexdigest()
+        path = os.path.join(self.directory, key)
+        return f'{path}.json', f'{path}.body'
+
+    def _warn(self, message):
+        if self.logger:
+            self.logger.warning(f'HTTP cache: {message}')
+
+    def _is_cacheable_request(self, request: Request, headers):
+        return (
+            request.method == 'GET' and request.data is None
+            and urllib.parse.urlparse(request.url).scheme in ('http', 'https')
+            and not any(header in headers for header in _UNCACHEABLE_REQUEST_HEADERS)
+            and (self.cookies or 'Cookie' not in headers)
+            and 'no-store' not in _parse_cache_control(headers.get('Cache-Control')))
+
+    def send(self, request: Request, send: Callable[[Request], Response], headers=None) -> Response:
+        """
+        Send a request with `send`, using the cache where possible
+
+        @param headers: All headers that are sent with the request, including those that
+            the request handler adds, such as its default headers and the Cookie header.
+            Defaults to the headers of the request.
+        """
+        if headers is None:
+            headers = request.headers
+        policy = self._get_policy(request.url)
+        if policy == 'bypass' or not self._is_cacheable_request(request, headers):
+            return send(request)
+
+        meta_path, body_path = self._paths(request.url, headers)
+        meta, body = self._load(meta_path, body_path, headers)
+        if meta is None:
+            return self._cache_response(send(request), headers, meta_path, body_path)
+
+        if (policy != 'revalidate' and meta['expires'] > time.time()
+                and 'no-cache' not in _parse_cache_control(headers.get('Cache-Control'))):
+            self._touch(meta_path)
+            return self._cached_response(meta, body, 'hit')
+
+        conditional_request = request.copy()
+        stored_headers = _message_from_pairs(meta['headers'])
+        if stored_headers.get('ETag'):
+            conditional_request.headers['If-None-Match'] = stored_headers['ETag']
+        if stored_headers.get('Last-Modified'):
+            conditional_request.headers['If-Modified-Since'] = stored_headers['Last-Modified']
+        try:
+            response = send(conditional_request)
+        except HTTPError as e:
+            if e.status != 304:
+                raise
+            e.close()
+            self._revalidate(meta, meta_path, e.response.headers)
+            return self._cached_response(meta, body, 'revalidated')
+        return self._cache_response(response, headers, meta_path, body_path)
+
+    def _load(self, meta_path, body_path, headers):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        # The body may be replaced by another process while the metadata is read
+        if len(body) != meta.get('size'):
+            return None, None
+        if any(headers.get(name) != value for name, value in meta.get('vary', {}).items()):
+            return None, None
+        return meta, body
+
+    def _touch(self, meta_path):
+        # The modification time of the metadata is used to evict the least recently used responses
+        with contextlib.suppress(OSError):
+            os.utime(meta_path)
+
+    def _revalidate(self, meta, meta_path, new_headers):
+        headers = _message_from_pairs(meta['headers'])
+        for name in _UPDATED_HEADERS:
+            if name in new_headers:
+                del headers[name]
+                for value in new_headers.get_all(name):
+                    headers.add_header(name, value)
+        meta['headers'] = list(headers.items())
+        meta['expires'] = _expiry_time(headers, time.time())
+        try:
+            write_json_file(meta, meta_path)
+        except OSError as e:
+            self._warn(f'unable to update {meta_path}: {e}')
+
+    @staticmethod
+    def _cached_response(meta, body, state):
+        return Response(
+            io.BytesIO(body), url=meta['url'], headers=_message_from_pairs(meta['headers']),
+            status=meta['status'], reason=meta.get('reason'), extensions={'http_cache': state})
+
+    def _cache_response(self, response: Response, request_headers, meta_path, body_path):
+        headers = response.headers
+        cache_control = _parse_cache_control(_get_all(headers, 'Cache-Control'))
+        vary = [name.strip() for name in _get_all(headers, 'Vary').split(',') if name.strip()]
+        now = time.time()
+        expires = _expiry_time(headers, now)
+        if (
+            response.status != 200
+            or 'no-store' in cache_control
+            or any(name == '*' or name.lower() == 'cookie' for name in vary)
+            or (expires <= now and not headers.get('ETag') and not headers.get('Last-Modified'))
+            or (int_or_none(headers.get('Content-Length')) or 0) > self.max_entry_size
+        ):
+            return response
+
+        meta = {
+            'url': response.url,
+            'status': response.status,
+            'reason': response.reason,
+            'headers': [(name, value) for name, value in headers.items() if name.title() not in _UNSTORED_HEADERS],
+            # The body is stored decoded, so the Accept-Encoding of the request does not matter
+            'vary': {
+                name: request_headers.get(name)
+                for name in vary if name.lower() != 'accept-encoding'
+            },
+            'expires': expires,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            writer = _CacheWriter(self, meta, meta_path, body_path)
+        except OSError as e:
+            self._warn(f'unable to write to {self.directory}: {e}')
+            return response
+        return _CachingResponse(response, writer)
+
+    def _commit(self, meta, meta_path, body_path, temp_path, size):
+        meta['size'] = size
+        meta['headers'].append(('Content-Length', str(size)))
+        with self._lock:
+            try:
+                os.replace(temp_path, body_path)
+                write_json_file(meta, meta_path)
+            except OSError as e:
+                self._warn(f'unable to store {body_path}: {e}')
+                with contextlib.suppress(OSError):
+                    os.remove(temp_path)
+                return
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        with contextlib.suppress(OSError), os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                meta_path = entry.path
+                body_path = f'{meta_path[:-len(".json")]}.body'
+                with contextlib.suppress(OSError):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size + os.path.getsize(body_path), meta_path, body_path))
+
+        total_size = sum(size for _, size, _, _ in entries)
+        for _, size, meta_path, body_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(meta_path)
+                os.remove(body_path)
+            total_size -= size
+
+
+class _CacheWriter:
+    """Writes a response body to a temporary file, which is stored in the cache once complete"""
+
+    def __init__(self, cache: HTTPCache, meta, meta_path, body_path):
+        self._cache = cache
+        self._meta = meta
+        self._meta_path = meta_path
+        self._body_path = body_path
+        self._file = tempfile.NamedTemporaryFile(
+            dir=cache.directory, prefix=f'{os.path.basename(body_path)}.', suffix='.tmp', delete=False)
+        self._size = 0
+
+    def write(self, data):
+        if self._file is None:
+            return
+        self._size += len(data)
+        if self._size > self._cache.max_entry_size:
+            self.abort()
+            return
+        try:
+            self._file.write(data)
+        except OSError as e:
+            self._cache._warn(f'unable to write {self._file.name}: {e}')
+            self.abort()
+
+    def commit(self):
+        if self._file is None:
+            return
+        file, self._file = self._file, None
+        try:
+            file.close()
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(file.name)
+            return
+        self._cache._commit(self._meta, self._meta_path, self._body_path, file.name, self._size)
+
+    def abort(self):
+        if self._file is None:
+            return
+        file, self._file = self._file, None
+        with contextlib.suppress(OSError):
+            file.close()
+            os.remove(file.name)
+
+
+class _CachingResponse(Response):
+    """Response that is stored in the cache once it has been fully read"""
+
+    def __init__(self, response: Response, writer: _CacheWriter):
+        super().__init__(
+            fp=response, url=response.url, headers=response.headers,
+            status=response.status, reason=response.reason, extensions=response.extensions)
+        self._writer = writer
+
+    def read(self, amt: int | None = None) -> bytes:
+        if self.closed:
+            return b''
+        data = self._read(self.fp.read, amt)
+        self._update(data, complete=amt is None or (amt > 0 and not data))
+        return data
+
+    def readinto(self, b) -> int:
+        if self.closed:
+            return 0
+        with memoryview(b) as mv, mv.cast('B') as view:
+            n = self._read(self.fp.readinto, view)
+            self._update(view[:n], complete=len(view) > 0 and not n)
+        return n
+
+    def _read(self, read_func, arg):
+        try:
+            return read_func(arg)
+        except BaseException:
+            self._writer.abort()
+            raise
+
+    def _update(self, data, complete):
+        self._writer.write(data)
+        # Handler responses are closed once they have been fully read
+        if complete or self.fp.closed:
+            self._writer.commit()
+            self.close()
+
+    def close(self):
+        # A response that was not fully read is not stored
+        self._writer.abort()
+        return super().close()
@@ -10,16 +10,6 @@
 
 from .compat import compat_expanduser
 from .cookies import SUPPORTED_BROWSERS, SUPPORTED_KEYRINGS
-from .downloader.external import list_external_downloaders
-from .postprocessor import (
-    FFmpegExtractAudioPP,
-    FFmpegMergerPP,
-    FFmpegSubtitlesConvertorPP,
-    FFmpegThumbnailsConvertorPP,
-    FFmpegVideoRemuxerPP,
-    SponsorBlockPP,
-)
-from .postprocessor.modify_chapters import DEFAULT_SPONSORBLOCK_CHAPTER_TITLE
 from .update import UPDATE_SOURCES, detect_variant, is_non_updateable
 from .utils import (
     OUTTMPL_TYPES,
@@ -245,6 +235,18 @@ def format_option_help(self, formatter=None):
 
 
 def create_parser():
+    # Only imported when the parser is built, since they are not needed by the embedding API
+    from .downloader.external import list_external_downloaders
+    from .postprocessor import (
+        FFmpegExtractAudioPP,
+        FFmpegMergerPP,
+        FFmpegSubtitlesConvertorPP,
+        FFmpegThumbnailsConvertorPP,
+        FFmpegVideoRemuxerPP,
+        SponsorBlockPP,
+    )
+    from .postprocessor.modify_chapters import DEFAULT_SPONSORBLOCK_CHAPTER_TITLE
+
     def _list_from_options_callback(option, opt_str, value, parser, append=True, delim=',', process=str.strip):
         # append can be True, False or -1 (prepend)
         current = list(getattr(parser.values, option.dest)) if append else []
@@ -615,6 +617,18 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--socket-timeout',
         dest='socket_timeout', type=float, default=None, metavar='SECONDS',
         help='Time to wait before giving up, in seconds')
+    network.add_option(
+        '--hedge-requests',
+        dest='hedge_delay', default=None, metavar='SECONDS',
+        help=(
+            'Send a duplicate of latency-sensitive requests (such as YouTube API calls) '
+            'if there is no response after SECONDS, and use whichever response arrives first. '
+            'Use "auto" to wait for the 95th percentile of recent response times. '
+            'At most 10% more requests are sent'))
+    network.add_option(
+        '--no-hedge-requests',
+        action='store_const', const=None, dest='hedge_delay',
+        help='Do not send duplicate requests (default)')
     network.add_option(
         '--source-address',
         metavar='IP', dest='source_address', default=None,
@@ -785,6 +799,13 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--no-download-archive',
         dest='download_archive', action='store_const', const=None,
         help='Do not use archive file (default)')
+    selection.add_option(
+        '--resume-job', metavar='FILE',
+        dest='resume_job', default=None,
+        help=(
+            'Record the progress of the run in a journal FILE. If FILE exists, continue the run it records, '
+            'skipping URLs, playlist items and videos that were already completed. '
+            'The same URLs and options should be used when resuming'))
     selection.add_option(
         '--max-downloads',
         dest='max_downloads', metavar='NUMBER', type=int, default=None,
@@ -1378,6 +1399,13 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--print-traffic',
         dest='debug_printtraffic', action='store_true', default=False,
         help='Display sent and read HTTP traffic')
+    verbosity.add_option(
+        '--profile-report', metavar='FILE',
+        dest='profile_report', default=None,
+        help=(
+            'Write the wall and CPU time spent in each phase of the run (startup, extractor matching, '
+            'webpage downloads, JS challenge solving, format selection, downloading, each postprocessor) '
+            'to FILE as JSON, and as folded stacks for flame graph tools to FILE.folded'))
 
     filesystem = optparse.OptionGroup(parser, 'Filesystem Options')
     filesystem.add_option(
@@ -1571,6 +1599,32 @@ def _preset_alias_callback(option, opt_str, value, parser):
         '--rm-cache-dir',
         action='store_true', dest='rm_cachedir',
         help='Delete all filesystem cache files')
+    filesystem.add_option(
+        '--http-cache',
+        action='store_true', dest='http_cache', default=False,
+        help=(
+            'Cache HTTP responses such as webpages, manifests and API responses in the cache directory, '
+            'and revalidate them with conditional requests. Media downloads are not cached'))
+    filesystem.add_option(
+        '--no-http-cache',
+        action='store_false', dest='http_cache',
+        help='Do not cache HTTP responses (default)')
+    filesystem.add_option(
+        '--http-cache-max-size',
+        metavar='SIZE', dest='http_cache_max_size', default=None,
+        help='Maximum size of the HTTP cache, e.g. 50M. By default 100M')
+    filesystem.add_option(
+        '--http-cache-policy',
+        metavar='HOST:POLICY', dest='http_cache_policies', default={}, type='str',
+        action='callback', callback=_dict_from_options_callback,
+        callback_kwargs={
+            'allowed_keys': r'[\w.-]+',
+            'process': lambda val: val.strip().lower(),
+        }, help=(
+            'HTTP cache policy for a host and its subdomains. '
+            'POLICY is one of "cache" (obey the caching headers of responses; default), '
+            '"revalidate" (always check with the server that cached responses are up to date) '
+            'or "bypass" (do not cache responses). Can be used multiple times'))
 
     thumbnail = optparse.OptionGroup(parser, 'Thumbnail Options')
     thumbnail.add_option(
@@ -1,3 +1,4 @@
+import collections.abc
 import contextlib
 import dataclasses
 import functools
@@ -7,15 +8,18 @@
 import importlib.util
 import inspect
 import itertools
+import json
 import os
 import pkgutil
 import sys
 import traceback
+import typing
 from pathlib import Path
 from zipfile import ZipFile
 
 from .globals import (
     Indirect,
+    plugin_cache_dir,
     plugin_dirs,
     all_plugins_loaded,
     plugin_specs,
@@ -25,10 +29,11 @@
     get_executable_path,
     get_system_config_dirs,
     get_user_config_dirs,
-    merge_dicts,
     orderedSet,
+    write_json_file,
     write_string,
 )
+from .version import __version__
 
 PACKAGE_NAME = 'yt_dlp_plugins'
 COMPAT_PACKAGE_NAME = 'ytdlp_plugins'
@@ -42,6 +47,7 @@
 __all__ = [
     'COMPAT_PACKAGE_NAME',
     'PACKAGE_NAME',
+    'LookupChain',
     'PluginSpec',
     'directories',
     'load_all_plugins',
@@ -56,6 +62,80 @@ class PluginSpec:
     suffix: str
     destination: Indirect
     plugin_destination: Indirect
+    # Returns the JSON-serializable info of a plugin class that is stored in the plugin manifest,
+    # and given by the `info` method of the lookup before the class is imported
+    class_info: typing.Callable[[type], typing.Any] | None = None
+
+
+class LookupChain(collections.abc.MutableMapping):
+    """Mapping that looks up names in each of the given lookups in turn
+
+    Unlike merging the lookups, the values are not accessed, so that
+    lazy extractors and plugins are only loaded when they are used.
+    Values that are set are added before the lookups
+    """
+
+    def __init__(self, *lookups):
+        self.maps = [{}, *lookups]
+
+    def __getitem__(self, name):
+        for lookup in self.maps:
+            if name in lookup:
+                return lookup[name]
+        raise KeyError(name)
+
+    def __setitem__(self, name, value):
+        self.maps[0][name] = value
+
+    def __delitem__(self, name):
+        del self.maps[0][name]
+
+    def __contains__(self, name):
+        return any(name in lookup for lookup in self.maps)
+
+    def __iter__(self):
+        return iter(dict.fromkeys(itertools.chain.from_iterable(self.maps)))
+
+    def __len__(self):
+        return len(dict.fromkeys(itertools.chain.from_iterable(self.maps)))
+
+    def info(self, name):
+        """The info of the named class from the lookup that has it, if it provides one"""
+        for lookup in self.maps:
+            if name in lookup:
+                return lookup.info(name) if hasattr(lookup, 'info') else None
+        raise KeyError(name)
+
+
+class LazyPluginClasses(collections.abc.Mapping):
+    """Mapping of the plugin classes in a manifest, whose modules are imported when a class is first accessed
+
+    @param classes  {name: (module name, info)} of the classes, in the order they were loaded
+    @param loaded   {name: class} of the classes whose modules are already imported
+    """
+
+    def __init__(self, classes, loaded):
+        self._classes = classes
+        self._loaded = loaded
+
+    def __getitem__(self, name):
+        cls = self._loaded.get(name)
+        if cls is None:
+            module_name, _ = self._classes[name]
+            cls = self._loaded[name] = getattr(importlib.import_module(module_name), name)
+        return cls
+
+    def __contains__(self, name):
+        return name in self._classes
+
+    def __iter__(self):
+        return iter(self._classes)
+
+    def __len__(self):
+        return len(self._classes)
+
+    def info(self, name):
+        return self._classes[name][1]
 
 
 class PluginLoader(importlib.abc.Loader):
@@ -113,6 +193,13 @@ def candidate_plugin_paths(candidate):
     yield from candidate_path.iterdir()
 
 
+def candidate_locations():
+    return orderedSet(itertools.chain.from_iterable(
+        default_plugin_paths() if candidate == 'default' else candidate_plugin_paths(candidate)
+        for candidate in plugin_dirs.value
+    ), lazy=True)
+
+
 class PluginFinder(importlib.abc.MetaPathFinder):
     """
     This class provides one or multiple namespace packages.
@@ -128,13 +215,8 @@ def __init__(self, *packages):
                 for name in packages))
 
     def search_locations(self, fullname):
-        candidate_locations = itertools.chain.from_iterable(
-            default_plugin_paths() if candidate == 'default' else candidate_plugin_paths(candidate)
-            for candidate in plugin_dirs.value
-        )
-
         parts = Path(*fullname.split('.'))
-        for path in orderedSet(candidate_locations, lazy=True):
+        for path in candidate_locations():
             candidate = path / parts
             try:
                 if candidate.is_dir():
@@ -191,26 +273,129 @@ def get_regular_classes(module, module_name, suffix):
     ))
 
 
+def _file_stats(location):
+    """[path, mtime, size] of the files in the location
+
+    Directory mtimes are not used, since they change when bytecode caches are written
+    """
+    if not location.is_dir():
+        stat = location.stat()
+        yield [str(location), stat.st_mtime_ns, stat.st_size]
+        return
+    yield [str(location)]
+    for root, dirs, files in os.walk(location):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for file in sorted(files):
+            stat = os.stat(os.path.join(root, file))
+            yield [os.path.join(root, file), stat.st_mtime_ns, stat.st_size]
+
+
+def _plugin_fingerprint(plugin_spec):
+    """What the discovered plugins depend on; the plugins are rescanned when this changes
+
+    This is the mtimes and sizes of the plugin locations and the files in them.
+    Zip archives are not opened, so any archive that can contain plugins is included
+    """
+    parts = Path(PACKAGE_NAME, plugin_spec.module_name)
+    fingerprint = [[__version__, sys.implementation.cache_tag, plugin_dirs.value]]
+    for path in candidate_locations():
+        candidate = path / parts
+        try:
+            if candidate.is_dir():
+                fingerprint.extend(_file_stats(candidate))
+            elif path.suffix in ('.zip', '.egg', '.whl') and path.is_file():
+                fingerprint.extend(_file_stats(path))
+        except OSError:
+            pass
+    return fingerprint
+
+
+def _load_manifest(filename, fingerprint):
+    with contextlib.suppress(OSError, ValueError):
+        with open(filename, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('fingerprint') == fingerprint:
+            return manifest['modules']
+    return None
+
+
+def _store_manifest(filename, fingerprint, modules):
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        write_json_file({'fingerprint': fingerprint, 'modules': modules}, filename)
+    except Exception as e:
+        write_string(f'WARNING: Could not write plugin manifest {filename}: {e}\n')
+
+
+def _import_plugin_module(module_name, finder=None):
+    try:
+        if not finder:
+            return importlib.import_module(module_name)
+        spec = finder.find_spec(module_name)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    except Exception:
+        write_string(
+            f'Error while importing module {module_name!r}\n{traceback.format_exc(limit=-1)}',
+        )
+        return None
+    return module
+
+
+def _is_override(module, module_name):
+    return any(
+        inspect.isclass(obj) and obj.__module__.startswith(module_name)
+        and getattr(obj, 'PLUGIN_NAME', None) is not None
+        for obj in vars(module).values())
+
+
 def load_plugins(plugin_spec: PluginSpec):
+    """Load the plugins of the type, and add their classes to the lookups of the plugin spec
+
+    If plugin_cache_dir is set, the plugins that were found are stored in a manifest there.
+    While the plugin files are unchanged, the plugins are then registered from the manifest,
+    and each plugin module is only imported when one of its classes is accessed.
+    Modules that have no classes, override existing classes, or could not be imported
+    are still imported each time
+    """
     name, suffix = plugin_spec.module_name, plugin_spec.suffix
     regular_classes = {}
     if os.environ.get('YTDLP_NO_PLUGINS') or not plugin_dirs.value:
         return regular_classes
 
-    for finder, module_name, _ in iter_modules(name):
-        if any(x.startswith('_') for x in module_name.split('.')):
-            continue
-        try:
-            spec = finder.find_spec(module_name)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-        except Exception:
-            write_string(
-                f'Error while importing module {module_name!r}\n{traceback.format_exc(limit=-1)}',
-            )
-            continue
-        regular_classes.update(get_regular_classes(module, module_name, suffix))
+    manifest_file = modules = None
+    if plugin_cache_dir.value:
+        manifest_file = os.path.join(plugin_cache_dir.value, f'{name}.json')
+        fingerprint = _plugin_fingerprint(plugin_spec)
+        modules = _load_manifest(manifest_file, fingerprint)
+
+    lazy_classes = None
+    if modules is not None:
+        lazy_classes = {}
+        for module_name, module_info in modules.items():
+            if module_info['eager']:
+                module = _import_plugin_module(module_name)
+                if module:
+                    regular_classes.update(get_regular_classes(module, module_name, suffix))
+            lazy_classes.update(
+                (cls_name, (module_name, info)) for cls_name, info in module_info['classes'].items())
+    else:
+        modules = {}
+        for finder, module_name, _ in iter_modules(name):
+            if any(x.startswith('_') for x in module_name.split('.')):
+                continue
+            module = _import_plugin_module(module_name, finder)
+            classes = dict(get_regular_classes(module, module_name, suffix)) if module else {}
+            regular_classes.update(classes)
+            modules[module_name] = {
+                'eager': not classes or _is_override(module, module_name),
+                'classes': {
+                    cls_name: plugin_spec.class_info and plugin_spec.class_info(cls)
+                    for cls_name, cls in classes.items()},
+            }
+        if manifest_file:
+            _store_manifest(manifest_file, fingerprint, modules)
 
     # Compat: old plugin system using __init__.py
     # Note: plugins imported this way do not show up in directories()
@@ -224,12 +409,19 @@ def load_plugins(plugin_spec: PluginSpec):
             plugins = importlib.util.module_from_spec(spec)
             sys.modules[spec.name] = plugins
             spec.loader.exec_module(plugins)
-            regular_classes.update(get_regular_classes(plugins, spec.name, suffix))
+            compat_classes = get_regular_classes(plugins, spec.name, suffix)
+            regular_classes.update(compat_classes)
+            if lazy_classes is not None:
+                lazy_classes.update((cls_name, (spec.name, None)) for cls_name, _ in compat_classes)
+
+    if lazy_classes is not None:
+        regular_classes = LazyPluginClasses(lazy_classes, regular_classes)
 
     # Add the classes into the global plugin lookup for that type
     plugin_spec.plugin_destination.value = regular_classes
-    # We want to prepend to the main lookup for that type
-    plugin_spec.destination.value = merge_dicts(regular_classes, plugin_spec.destination.value)
+    if regular_classes:
+        # We want to prepend to the main lookup for that type
+        plugin_spec.destination.value = LookupChain(regular_classes, plugin_spec.destination.value)
 
     return regular_classes
 
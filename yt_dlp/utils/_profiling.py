@@ -0,0 +1,121 @@
+"""Aggregating phase profiler used by --profile-report"""
+import collections
+import contextlib
+import functools
+import json
+import threading
+import time
+
+from ..globals import profiler as _active_profiler
+
+_counters = {}
+
+
+def register_counters(name, func):
+    """Include the dict returned by func() in the "counters" of the profile reports"""
+    _counters[name] = func
+
+
+class Profiler:
+    """Aggregates wall and CPU time of nested phases
+
+    Timings are aggregated per stack of phase names, separately for each thread.
+    CPU time is the time spent by the thread that ran the phase
+    """
+
+    def __init__(self, start=None):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = collections.defaultdict(lambda: [0, 0.0, 0.0])  # stack: [calls, wall, cpu]
+        self._start = time.perf_counter() if start is None else start
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(name)
+        key = tuple(stack)
+        start_wall, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(key, time.perf_counter() - start_wall, time.thread_time() - start_cpu)
+            stack.pop()
+
+    def add(self, stack, wall, cpu, calls=1):
+        with self._lock:
+            stats = self._stats[tuple(stack)]
+            stats[0] += calls
+            stats[1] += wall
+            stats[2] += cpu
+
+    def _self_times(self):
+        with self._lock:
+            stats = {stack: list(values) for stack, values in self._stats.items()}
+        self_times = {stack: [wall, cpu] for stack, (_, wall, cpu) in stats.items()}
+        for stack, (_, wall, cpu) in stats.items():
+            parent = self_times.get(stack[:-1])
+            if parent:
+                parent[0] -= wall
+                parent[1] -= cpu
+        return stats, self_times
+
+    def report(self):
+        stats, self_times = self._self_times()
+        phases = collections.defaultdict(lambda: {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+        for stack, (calls, wall, cpu) in stats.items():
+            if stack[-1] in stack[:-1]:  # Recursive phase; already counted by the outer call
+                continue
+            phase = phases[stack[-1]]
+            phase['calls'] += calls
+            phase['wall'] += wall
+            phase['cpu'] += cpu
+
+        return {
+            'wall': time.perf_counter() - self._start,
+            'cpu': time.process_time(),
+            'phases': dict(sorted(phases.items(), key=lambda kv: -kv[1]['wall'])),
+            'counters': {name: func() for name, func in _counters.items()},
+            'stacks': [{
+                'stack': list(stack),
+                'calls': calls,
+                'wall': wall,
+                'cpu': cpu,
+                'self_wall': max(self_times[stack][0], 0),
+                'self_cpu': max(self_times[stack][1], 0),
+            } for stack, (calls, wall, cpu) in sorted(stats.items())],
+        }
+
+    def folded_stacks(self):
+        """Self wall time of each stack in microseconds, in the "folded" format used by flame graph tools"""
+        _, self_times = self._self_times()
+        return ''.join(
+            f'{";".join(stack)} {round(wall * 1e6)}\n'
+            for stack, (wall, _) in sorted(self_times.items()) if wall > 0)
+
+    def write_report(self, filename, folded_filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(folded_filename, 'w', encoding='utf-8') as f:
+            f.write(self.folded_stacks())
+
+
+def profile_phase(name):
+    """Context manager timing a phase with the active profiler, if any"""
+    if _active_profiler.value is None:
+        return contextlib.nullcontext()
+    return _active_profiler.value.phase(name)
+
+
+def profiled(name):
+    """Decorator timing each call of the function as a phase"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_profiler.value is None:
+                return func(*args, **kwargs)
+            with _active_profiler.value.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -339,14 +339,16 @@ def get_element_html_by_attribute(attribute, value, html, **kargs):
 
 def get_elements_by_class(class_name, html, **kargs):
     """Return the content of all tags with the specified class in the passed HTML document as a list"""
-    return get_elements_by_attribute(
-        'class', rf'[^\'"]*(?<=[\'"\s]){re.escape(class_name)}(?=[\'"\s])[^\'"]*',
-        html, escape_value=False)
+    return [content for content, _ in _get_elements_text_and_html_by_class(class_name, html)]
 
 
 def get_elements_html_by_class(class_name, html):
     """Return the html of all tags with the specified class in the passed HTML document as a list"""
-    return get_elements_html_by_attribute(
+    return [whole for _, whole in _get_elements_text_and_html_by_class(class_name, html)]
+
+
+def _get_elements_text_and_html_by_class(class_name, html):
+    return get_elements_text_and_html_by_attribute(
         'class', rf'[^\'"]*(?<=[\'"\s]){re.escape(class_name)}(?=[\'"\s])[^\'"]*',
         html, escape_value=False)
 
@@ -371,6 +373,7 @@ def get_elements_text_and_html_by_attribute(attribute, value, html, *, tag=r'[\w
 
     quote = '' if re.match(r'''[\s"'`=<>]''', value) else '?'
 
+    literal = value if escape_value else None
     value = re.escape(value) if escape_value else value
 
     partial_element_re = rf'''(?x)
@@ -379,13 +382,72 @@ def get_elements_text_and_html_by_attribute(attribute, value, html, *, tag=r'[\w
          \s{re.escape(attribute)}\s*=\s*(?P<_q>['"]{quote})(?-x:{value})(?P=_q)
         '''
 
-    for m in re.finditer(partial_element_re, html):
-        content, whole = get_element_text_and_html_by_tag(m.group('tag'), html[m.start():])
+    index = None
+    if len(html) >= _HTMLTagIndex.MIN_SIZE:
+        index = _html_tag_index(html)
+        elements = index.elements.get(partial_element_re)
+        if elements is not None:
+            yield from elements
+            return
+        matches = index.finditer(partial_element_re, attribute, literal)
+    else:
+        matches = re.finditer(partial_element_re, html)
 
-        yield (
+    elements = []
+    for m in matches:
+        content, whole = _get_element_text_and_html_by_tag(m.group('tag'), html, m.start())
+        elements.append((
             unescapeHTML(re.sub(r'^(?P<q>["\'])(?P<content>.*)(?P=q)$', r'\g<content>', content, flags=re.DOTALL)),
             whole,
-        )
+        ))
+        yield elements[-1]
+
+    if index is not None:
+        index.elements[partial_element_re] = elements
+
+
+class _HTMLTagIndex:
+    """
+    Positions of the start tags of an HTML document by the names of their attributes,
+    so that repeated element lookups do not have to scan the whole document
+    """
+    MIN_SIZE = 16 * 1024  # Smaller documents are faster to search than to index
+
+    def __init__(self, html):
+        self.html = html
+        self.elements = {}  # Cached results of get_elements_text_and_html_by_attribute
+        self._tags = {}  # attribute name: [(start, end), ...]
+
+    def tags_with_attribute(self, attribute):
+        """Spans of the start tags (up to the end of their attributes) that have the attribute"""
+        tags = self._tags.get(attribute)
+        if tags is None:
+            # Each '<' is tried, as in get_elements_text_and_html_by_attribute, even if it is in a quoted value
+            tags = self._tags[attribute] = [(mobj.start(), mobj.end(1)) for mobj in re.finditer(rf'''(?x)
+                <(?=([^\s>"']*
+                    (?:\s(?:[^>"']|"[^"]*"|'[^']*')*)?
+                    \s{re.escape(attribute)}\s*=
+                    (?:[^>"']|"[^"]*"|'[^']*')*))
+                ''', self.html)]
+        return tags
+
+    def finditer(self, pattern, attribute, literal=None):
+        """Equivalent to re.finditer for a pattern matching a start tag with the given attribute"""
+        pattern = re.compile(pattern)
+        last_end = 0
+        for start, end in self.tags_with_attribute(attribute):
+            # An unquoted value may extend past the end of the tag
+            if start < last_end or literal and self.html.find(literal, start, end + len(literal) + 1) == -1:
+                continue
+            mobj = pattern.match(self.html, start)
+            if mobj:
+                last_end = mobj.end()
+                yield mobj
+
+
+@functools.lru_cache(maxsize=4)
+def _html_tag_index(html):
+    return _HTMLTagIndex(html)
 
 
 class HTMLBreakOnClosingTagParser(html.parser.HTMLParser):
@@ -436,17 +498,22 @@ def get_element_text_and_html_by_tag(tag, html):
     For the first element with the specified tag in the passed HTML document
     return its' content (text) and the whole element (html)
     """
-    def find_or_raise(haystack, needle, exc):
+    return _get_element_text_and_html_by_tag(tag, html)
+
+
+def _get_element_text_and_html_by_tag(tag, html, start=0):
+    # Searches from `start` instead of slicing, since the html may be a large document
+    def find_or_raise(needle, start, exc):
         try:
-            return haystack.index(needle)
+            return html.index(needle, start)
         except ValueError:
             raise exc
     closing_tag = f'</{tag}>'
     whole_start = find_or_raise(
-        html, f'<{tag}', compat_HTMLParseError(f'opening {tag} tag not found'))
+        f'<{tag}', start, compat_HTMLParseError(f'opening {tag} tag not found'))
     content_start = find_or_raise(
-        html[whole_start:], '>', compat_HTMLParseError(f'malformed opening {tag} tag'))
-    content_start += whole_start + 1
+        '>', whole_start, compat_HTMLParseError(f'malformed opening {tag} tag'))
+    content_start += 1
     with HTMLBreakOnClosingTagParser() as parser:
         parser.feed(html[whole_start:content_start])
         if not parser.tagstack or parser.tagstack[0] != tag:
@@ -454,15 +521,13 @@ def find_or_raise(haystack, needle, exc):
         offset = content_start
         while offset < len(html):
             next_closing_tag_start = find_or_raise(
-                html[offset:], closing_tag,
-                compat_HTMLParseError(f'closing {tag} tag not found'))
+                closing_tag, offset, compat_HTMLParseError(f'closing {tag} tag not found'))
             next_closing_tag_end = next_closing_tag_start + len(closing_tag)
             try:
-                parser.feed(html[offset:offset + next_closing_tag_end])
-                offset += next_closing_tag_end
+                parser.feed(html[offset:next_closing_tag_end])
+                offset = next_closing_tag_end
             except HTMLBreakOnClosingTagParser.HTMLBreakOnClosingTagException:
-                return html[content_start:offset + next_closing_tag_start], \
-                    html[whole_start:offset + next_closing_tag_end]
+                return html[content_start:next_closing_tag_start], html[whole_start:next_closing_tag_end]
         raise compat_HTMLParseError('unexpected end of html')
 
 
@@ -2313,6 +2378,66 @@ def __str__(self):
         return repr(self.exhaust())
 
 
+class CopyOnWriteDict(collections.abc.MutableMapping):
+    """Mutable view of a mapping that records changes in an overlay
+    Reads fall through to the base mapping, which is never modified.
+    Note that values are shared with the base, so nested objects must not be modified in-place"""
+
+    def __init__(self, base, /, *, hidden=()):
+        self._base = base
+        self._overlay = {}
+        self._deleted = {key for key in hidden if key in base}
+
+    def __getitem__(self, key):
+        if key in self._overlay:
+            return self._overlay[key]
+        elif key in self._deleted:
+            raise KeyError(key)
+        return self._base[key]
+
+    def __setitem__(self, key, value):
+        self._deleted.discard(key)
+        self._overlay[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._overlay.pop(key, None)
+        if key in self._base:
+            self._deleted.add(key)
+
+    def __contains__(self, key):
+        return key in self._overlay or (key not in self._deleted and key in self._base)
+
+    def __iter__(self):
+        # Keep the order of a copied dict: existing keys first, then new ones
+        for key in self._base:
+            if key not in self._deleted:
+                yield key
+        for key in self._overlay:
+            if key not in self._base:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get(self, key, default=None):
+        # Faster than the MutableMapping implementation, which goes through __getitem__ and KeyError
+        if key in self._overlay:
+            return self._overlay[key]
+        elif key in self._deleted:
+            return default
+        return self._base.get(key, default)
+
+    def copy(self):
+        new = type(self)(self._base)
+        new._overlay, new._deleted = self._overlay.copy(), self._deleted.copy()
+        return new
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class PagedList:
 
     class IndexError(IndexError):  # noqa: A001
@@ -2773,6 +2898,26 @@ def strip_jsonp(code):
         r'\g<callback_data>', code)
 
 
+_JS_OBJECT_TOKEN_RE = re.compile(r'''(?sx)
+    "(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|`(?:[^`\\]|\\.)*`|
+    /\*.*?\*/|//[^\n]*|
+    [{}\[\]]''')
+
+
+def _js_object_end(code, start):
+    """Index after the end of the JavaScript object or array at code[start], or None if it is not closed"""
+    depth = 0
+    for mobj in _JS_OBJECT_TOKEN_RE.finditer(code, start):
+        token = mobj.group()
+        if token in ('{', '['):
+            depth += 1
+        elif token in ('}', ']'):
+            depth -= 1
+            if not depth:
+                return mobj.end()
+    return None
+
+
 def js_to_json(code, vars={}, *, strict=False):
     # vars is a dict of var, val pairs to substitute
     STRING_QUOTES = '\'"`'
@@ -2780,9 +2925,10 @@ def js_to_json(code, vars={}, *, strict=False):
     COMMENT_RE = r'/\*(?:(?!\*/).)*?\*/|//[^\n]*\n'
     SKIP_RE = fr'\s*(?:{COMMENT_RE})?\s*'
     INTEGER_TABLE = (
-        (fr'(?s)^(0[xX][0-9a-fA-F]+){SKIP_RE}:?$', 16),
-        (fr'(?s)^(0+[0-7]+){SKIP_RE}:?$', 8),
+        (re.compile(fr'(?s)^(0[xX][0-9a-fA-F]+){SKIP_RE}:?$'), 16),
+        (re.compile(fr'(?s)^(0+[0-7]+){SKIP_RE}:?$'), 8),
     )
+    ESCAPE_RE = re.compile(r'(?s)(")|\\(.)')
 
     def process_escape(match):
         JSON_PASSTHROUGH_ESCAPES = R'"\bfnrtu'
@@ -2800,8 +2946,7 @@ def template_substitute(match):
                 return json.loads(evaluated)
         return evaluated
 
-    def fix_kv(m):
-        v = m.group(0)
+    def fix_kv(v):
         if v in ('true', 'false', 'null'):
             return v
         elif v in ('undefined', 'void 0'):
@@ -2811,11 +2956,11 @@ def fix_kv(m):
 
         if v[0] in STRING_QUOTES:
             v = re.sub(r'(?s)\${([^}]+)}', template_substitute, v[1:-1]) if v[0] == '`' else v[1:-1]
-            escaped = re.sub(r'(?s)(")|\\(.)', process_escape, v)
+            escaped = ESCAPE_RE.sub(process_escape, v)
             return f'"{escaped}"'
 
-        for regex, base in INTEGER_TABLE:
-            im = re.match(regex, v)
+        for regex, base in INTEGER_TABLE if v[0] == '0' else ():
+            im = regex.match(v)
             if im:
                 i = int(im.group(1), base)
                 return f'"{i}":' if v.endswith(':') else str(i)
@@ -2837,22 +2982,45 @@ def fix_kv(m):
     def create_map(mobj):
         return json.dumps(dict(json.loads(js_to_json(mobj.group(1) or '[]', vars=vars))))
 
-    code = re.sub(r'(?:new\s+)?Array\((.*?)\)', r'[\g<1>]', code)
-    code = re.sub(r'new Map\((\[.*?\])?\)', create_map, code)
-    if not strict:
+    # The substring checks skip a scan of the whole code for constructs that are not there
+    if 'Array(' in code:
+        code = re.sub(r'(?:new\s+)?Array\((.*?)\)', r'[\g<1>]', code)
+    if 'new Map(' in code:
+        code = re.sub(r'new Map\((\[.*?\])?\)', create_map, code)
+    if not strict and 'new ' in code:
         code = re.sub(rf'new Date\(({STRING_RE})\)', r'\g<1>', code)
         code = re.sub(r'new \w+\((.*?)\)', lambda m: json.dumps(m.group(0)), code)
+    if not strict and 'parseInt(' in code:
         code = re.sub(r'parseInt\([^\d]+(\d+)[^\d]+\)', r'\1', code)
+    if not strict and '(function(' in code:
         code = re.sub(r'\(function\([^)]*\)\s*\{[^}]*\}\s*\)\s*\(\s*(["\'][^)]*["\'])\s*\)', r'\1', code)
 
+    def fix_tokens(m):
+        token = m.group('token')
+        return m.group('unchanged') + (m.group('char') if token is None else fix_kv(token))
+
+    # Each match is a run of tokens that fix_kv would leave unchanged, followed by
+    # one token to fix (or a character to keep), so that the callback is not called for every token
     return re.sub(rf'''(?sx)
-        {STRING_RE}|
-        {COMMENT_RE}|,(?={SKIP_RE}[\]}}])|
-        void\s0|(?:(?<![0-9])[eE]|[a-df-zA-DF-Z_$])[.a-zA-Z_$0-9]*|
-        \b(?:0[xX][0-9a-fA-F]+|(?<!\.)0+[0-7]+)(?:{SKIP_RE}:)?|
-        [0-9]+(?={SKIP_RE}:)|
-        !+
-        ''', fix_kv, code)
+        (?P<unchanged>(?:
+            [^"'`/,a-zA-Z0-9_$!]+|
+            "(?:[^"\\]|\\["\\bfnrtu])*"|
+            (?:true|false|null)(?![.a-zA-Z_$0-9])|
+            (?=(?P<number>[1-9][0-9]*))(?P=number)(?!{SKIP_RE}:)|
+            0(?![0-9xX])(?!{SKIP_RE}:)|
+            (?<=[0-9])[eE]|
+            ,(?!{SKIP_RE}[\]}}])|
+            /(?![/*])
+        )*)
+        (?:(?P<token>
+            {STRING_RE}|
+            {COMMENT_RE}|,(?={SKIP_RE}[\]}}])|
+            void\s0|(?:(?<![0-9])[eE]|[a-df-zA-DF-Z_$])[.a-zA-Z_$0-9]*|
+            \b(?:0[xX][0-9a-fA-F]+|(?<!\.)0+[0-7]+)(?:{SKIP_RE}:)?|
+            [0-9]+(?={SKIP_RE}:)|
+            !+
+        )|(?P<char>.))
+        ''', fix_tokens, code)
 
 
 def qualities(quality_ids):
@@ -3240,7 +3408,9 @@ def filter_using_list(row, filter_array):
     return '\n'.join(''.join(row).rstrip() for row in table)
 
 
-def _match_one(filter_part, dct, incomplete):
+@functools.lru_cache(maxsize=1024)
+def _compile_match_one(filter_part):
+    """ Compile a single filter part into a predicate: `(dct, incomplete) -> bool` """
     # TODO: Generalize code with YoutubeDL._build_format_filter
     STRING_OPERATORS = {
         '*=': operator.contains,
@@ -3257,10 +3427,8 @@ def _match_one(filter_part, dct, incomplete):
         '=': operator.eq,
     }
 
-    if isinstance(incomplete, bool):
-        is_incomplete = lambda _: incomplete
-    else:
-        is_incomplete = lambda k: k in incomplete
+    def is_incomplete(key, incomplete):
+        return incomplete if isinstance(incomplete, bool) else key in incomplete
 
     operator_rex = re.compile(r'''(?x)
         (?P<key>[a-z_]+)
@@ -3273,6 +3441,7 @@ def _match_one(filter_part, dct, incomplete):
     m = operator_rex.fullmatch(filter_part.strip())
     if m:
         m = m.groupdict()
+        key, none_inclusive = m['key'], m['none_inclusive']
         unnegated_op = COMPARISON_OPERATORS[m['op']]
         if m['negation']:
             op = lambda attr, value: not unnegated_op(attr, value)
@@ -3281,9 +3450,9 @@ def _match_one(filter_part, dct, incomplete):
         comparison_value = m['quotedstrval'] or m['strval']
         if m['quote']:
             comparison_value = comparison_value.replace(r'\{}'.format(m['quote']), m['quote'])
-        actual_value = dct.get(m['key'])
-        numeric_comparison = None
-        if isinstance(actual_value, (int, float)):
+
+        @functools.cache
+        def get_numeric_comparison():
             # If the original field is a string and matching comparisonvalue is
             # a number we should respect the origin of the original field
             # and process comparison value as a string (see
@@ -3296,11 +3465,19 @@ def _match_one(filter_part, dct, incomplete):
                     numeric_comparison = parse_filesize(f'{comparison_value}B')
                 if numeric_comparison is None:
                     numeric_comparison = parse_duration(comparison_value)
-        if numeric_comparison is not None and m['op'] in STRING_OPERATORS:
-            raise ValueError('Operator {} only supports string values!'.format(m['op']))
-        if actual_value is None:
-            return is_incomplete(m['key']) or m['none_inclusive']
-        return op(actual_value, comparison_value if numeric_comparison is None else numeric_comparison)
+            if numeric_comparison is not None and m['op'] in STRING_OPERATORS:
+                raise ValueError('Operator {} only supports string values!'.format(m['op']))
+            return numeric_comparison
+
+        def compare(dct, incomplete):
+            actual_value = dct.get(key)
+            numeric_comparison = None
+            if isinstance(actual_value, (int, float)):
+                numeric_comparison = get_numeric_comparison()
+            if actual_value is None:
+                return is_incomplete(key, incomplete) or none_inclusive
+            return op(actual_value, comparison_value if numeric_comparison is None else numeric_comparison)
+        return compare
 
     UNARY_OPERATORS = {
         '': lambda v: (v is True) if isinstance(v, bool) else (v is not None),
@@ -3311,15 +3488,27 @@ def _match_one(filter_part, dct, incomplete):
         '''.format('|'.join(map(re.escape, UNARY_OPERATORS.keys()))))
     m = operator_rex.fullmatch(filter_part.strip())
     if m:
-        op = UNARY_OPERATORS[m.group('op')]
-        actual_value = dct.get(m.group('key'))
-        if is_incomplete(m.group('key')) and actual_value is None:
-            return True
-        return op(actual_value)
+        op, key = UNARY_OPERATORS[m.group('op')], m.group('key')
+
+        def check(dct, incomplete):
+            actual_value = dct.get(key)
+            if is_incomplete(key, incomplete) and actual_value is None:
+                return True
+            return op(actual_value)
+        return check
 
     raise ValueError(f'Invalid filter part {filter_part!r}')
 
 
+def _match_one(filter_part, dct, incomplete):
+    return _compile_match_one(filter_part)(dct, incomplete)
+
+
+@functools.lru_cache(maxsize=256)
+def _split_match_str(filter_str):
+    return tuple(filter_part.replace(r'\&', '&') for filter_part in re.split(r'(?<!\\)&', filter_str))
+
+
 def match_str(filter_str, dct, incomplete=False):
     """ Filter a dictionary with a simple string syntax.
     @returns           Whether the filter passes
@@ -3327,9 +3516,11 @@ def match_str(filter_str, dct, incomplete=False):
                        Can be True/False to indicate all/none of the keys may be missing.
                        All conditions on incomplete keys pass if the key is missing
     """
+    # Each part is compiled only when first reached, so that invalid parts
+    # after a failing condition still do not raise
     return all(
-        _match_one(filter_part.replace(r'\&', '&'), dct, incomplete)
-        for filter_part in re.split(r'(?<!\\)&', filter_str))
+        _compile_match_one(filter_part)(dct, incomplete)
+        for filter_part in _split_match_str(filter_str))
 
 
 def match_filter_func(filters, breaking_filters=None):
@@ -3343,6 +3534,7 @@ def match_filter_func(filters, breaking_filters=None):
     interactive = '-' in filters
     if interactive:
         filters.remove('-')
+    filter_str = ') | ('.join(map(str.strip, filters))
 
     @function_with_repr.set_repr(repr_)
     def _match_func(info_dict, incomplete=False):
@@ -3354,8 +3546,8 @@ def _match_func(info_dict, incomplete=False):
             return NO_DEFAULT if interactive and not incomplete else None
         else:
             video_title = info_dict.get('title') or info_dict.get('id') or 'entry'
-            filter_str = ') | ('.join(map(str.strip, filters))
             return f'{video_title} does not pass filter ({filter_str}), skipping ..'
+
     return _match_func
 
 